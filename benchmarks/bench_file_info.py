@@ -0,0 +1,98 @@
+"""Measure how DBI file-info substream parsing scales with the number of source file names.
+
+The time per name should stay constant as the substream grows.
+The legacy column parses the same substream with BytesIO and read_str, which copies the rest of the buffer for every name.
+
+Usage (from the repository root): python -m benchmarks.bench_file_info [--counts 10000 100000 400000] [--legacy-max 50000]
+"""
+from typing import List
+from io import BytesIO
+import argparse
+import struct
+import time
+
+from pdblib import DBIStream
+from pdblib._struct import Struct
+
+
+def build_dbi_stream(name_count: int) -> bytes:
+    """Build a DBI stream whose only populated substream is the file info substream."""
+    # Each module can reference at most 0xFFFF files.
+    counts = []
+    remaining = name_count
+    while remaining:
+        counts.append(min(remaining, 0xFFFF))
+        remaining -= counts[-1]
+    names = []
+    offsets = []
+    size = 0
+    for i in range(name_count):
+        name = f"d:\\build\\src\\module{i // 1000}\\source_file_{i}.cpp\0".encode()
+        offsets.append(size)
+        names.append(name)
+        size += len(name)
+    file_info = b"".join((
+        struct.pack("<HH", len(counts), name_count & 0xFFFF),
+        struct.pack(f"<{len(counts)}H", *range(len(counts))),
+        struct.pack(f"<{len(counts)}H", *counts),
+        struct.pack(f"<{name_count}I", *offsets),
+        *names,
+    ))
+    section_contributions = struct.pack("<I", 4046371373)
+    section_map = struct.pack("<HH", 0, 0)
+    header = struct.pack(
+        "<iIIHHHHHHiiiiiIiiHHI",
+        -1, 19990903, 1, 0xFFFF, 0, 0xFFFF, 0, 0xFFFF, 0,
+        0, len(section_contributions), len(section_map), len(file_info), 0, 0, 0, 0, 0, 0x8664, 0,
+    )
+    return header + section_contributions + section_map + file_info
+
+
+def read_str(f: BytesIO) -> bytes:
+    """The null terminated string reader pdblib used before the Reader was introduced."""
+    s = f.getvalue()[f.tell():].split(b"\x00", 1)[0]
+    f.seek(len(s) + 1, 1)
+    return s
+
+
+def legacy_parse_names(buffer: bytes) -> List[bytes]:
+    """Parse the file names the way pdblib did before the Reader was introduced."""
+    f = BytesIO(buffer)
+    f.seek(64 + 4 + 4)
+    num_modules, _ = Struct("<HH").read(f)
+    counts = Struct(f"<{num_modules * 2}H").read(f)[num_modules:]
+    f.seek(4 * sum(counts), 1)
+    return [read_str(f) for _ in range(sum(counts))]
+
+
+def best_of(repeat: int, func, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 50_000, 100_000, 200_000, 400_000])
+    parser.add_argument("--legacy-max", type=int, default=50_000, help="Skip the legacy parser above this many names.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'names':>10} {'bytes':>12} {'seconds':>10} {'ns/name':>10} {'legacy s':>10} {'legacy ns/name':>15}")
+    for count in args.counts:
+        buffer = build_dbi_stream(count)
+        dbi = DBIStream.from_bytes(buffer)
+        assert len(dbi.file_info.NamesBuffer) == count
+        seconds = best_of(args.repeat, DBIStream.from_bytes, buffer)
+        row = f"{count:>10} {len(buffer):>12} {seconds:>10.4f} {seconds / count * 1e9:>10.1f}"
+        if count <= args.legacy_max:
+            legacy = best_of(1, legacy_parse_names, buffer)
+            row += f" {legacy:>10.4f} {legacy / count * 1e9:>15.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
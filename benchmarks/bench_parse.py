@@ -0,0 +1,166 @@
+"""Measure parse() wall time, peak memory and per-stream throughput on synthetic PDB files.
+
+Each file is parsed in a fresh process so that the peak resident set size of one parse can be measured.
+The per-stream rows load the file lazily and time the first access of each attribute.
+Results can be written as JSON to compare runs.
+
+Usage (from the repository root): python -m benchmarks.bench_parse [--sizes small medium] [--block-sizes 512 4096] [--json out.json]
+"""
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pdblib
+from pdblib._pdb import StreamAttributes
+
+from .synth import generate
+
+try:
+    import resource
+except ImportError:
+    # Peak memory is not measured on Windows.
+    resource = None
+
+# The generate arguments of each file size.
+Sizes = {
+    "small": dict(n_modules=20, n_symbols=200, n_files=10, n_types=200),
+    "medium": dict(n_modules=200, n_symbols=500, n_files=50, n_types=2000),
+    "large": dict(n_modules=1000, n_symbols=1000, n_files=200, n_types=10000),
+}
+
+
+def peak_rss() -> Optional[int]:
+    """The peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes and macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def stream_indexes(pdb: pdblib.PDB7, name: str) -> List[int]:
+    """Get the streams read when a load profile stream is parsed."""
+    dbi_header = pdb.dbi_steam.header
+    if name == "zero":
+        return [0]
+    if name == "info":
+        return [1]
+    if name in ("tpi", "ipi"):
+        stream = pdb.tpi_stream if name == "tpi" else pdb.ipi_stream
+        hash_stream_index = stream.header.HashStreamIndex
+        return [2 if name == "tpi" else 4] + ([hash_stream_index] if hash_stream_index != 0xFFFF else [])
+    if name == "dbi":
+        return [3]
+    if name == "modules":
+        return [module.ModuleSymStream for module in pdb.dbi_steam.modules if module.ModuleSymStream != -1]
+    if name == "symbols":
+        return [dbi_header.SymRecordStream]
+    if name == "globals":
+        return [dbi_header.GlobalStreamIndex] if dbi_header.GlobalStreamIndex != 0xFFFF else []
+    if name == "publics":
+        return [dbi_header.PublicStreamIndex] if dbi_header.PublicStreamIndex != 0xFFFF else []
+    if name == "section_headers":
+        stream_index = pdb.dbi_steam.optional_dbg_header.SectionHdr
+        return [stream_index] if stream_index != -1 else []
+    if name == "names":
+        stream_index = pdb.info_stream.named_streams.get("/names")
+        return [stream_index] if stream_index is not None else []
+    raise ValueError(name)
+
+
+def write_file(path: str, **kwargs):
+    with open(path, "wb") as f:
+        f.write(generate(**kwargs))
+
+
+def measure(path: str, repeat: int) -> dict:
+    """Parse a file and return the timings. Run in a new process."""
+    rss_before = peak_rss()
+    start = time.perf_counter()
+    pdblib.parse(path)
+    times = [time.perf_counter() - start]
+    rss_after = peak_rss()
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        pdblib.parse(path)
+        times.append(time.perf_counter() - start)
+
+    # Time each stream on its own. Streams are parsed in the order of StreamAttributes.
+    streams = {}
+    pdb = pdblib.parse(path, lazy=True)
+    for name, attribute in StreamAttributes.items():
+        start = time.perf_counter()
+        getattr(pdb, attribute)
+        streams[name] = {"seconds": time.perf_counter() - start}
+    for name, result in streams.items():
+        result["bytes"] = sum(max(pdb.msf.stream_sizes[index], 0) for index in stream_indexes(pdb, name))
+
+    return {
+        "seconds": min(times),
+        "peak_rss": rss_after,
+        "parse_rss": None if rss_after is None else rss_after - rss_before,
+        "streams": streams,
+    }
+
+
+def megabytes_per_second(size: int, seconds: float) -> float:
+    return size / seconds / 1e6 if seconds else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(Sizes), default=["small", "medium"])
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[4096])
+    parser.add_argument("--shuffle", action="store_true", help="Write the blocks in a random order.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--streams", action="store_true", help="Print the throughput of each stream.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    # Files are written and parsed in new interpreters.
+    # A new process starts with the peak memory of its parent so this process must stay small.
+    context = multiprocessing.get_context("spawn")
+    print(f"{'file':>16} {'MB':>8} {'seconds':>10} {'MB/s':>8} {'peak RSS MB':>12} {'parse RSS MB':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            for block_size in args.block_sizes:
+                label = f"{size}-{block_size}"
+                path = os.path.join(directory, f"{label}.pdb")
+                try:
+                    with ProcessPoolExecutor(1, mp_context=context) as executor:
+                        executor.submit(write_file, path, block_size=block_size, shuffle=args.shuffle, **Sizes[size]).result()
+                except ValueError as e:
+                    print(f"{label:>16} skipped: {e}")
+                    continue
+                file_size = os.path.getsize(path)
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    result = executor.submit(measure, path, args.repeat).result()
+                result["file_size"] = file_size
+                results[label] = result
+                peak = "n/a" if result["peak_rss"] is None else f"{result['peak_rss'] / 1e6:.1f}"
+                parse = "n/a" if result["parse_rss"] is None else f"{result['parse_rss'] / 1e6:.1f}"
+                print(
+                    f"{label:>16} {file_size / 1e6:>8.2f} {result['seconds']:>10.4f} "
+                    f"{megabytes_per_second(file_size, result['seconds']):>8.1f} {peak:>12} {parse:>13}"
+                )
+                if args.streams:
+                    for name, stream in result["streams"].items():
+                        print(
+                            f"{'':>16} {name:>16} {stream['bytes'] / 1e6:>8.2f} MB {stream['seconds']:>10.4f} s "
+                            f"{megabytes_per_second(stream['bytes'], stream['seconds']):>8.1f} MB/s"
+                        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
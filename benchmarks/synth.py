@@ -0,0 +1,502 @@
+"""Write synthetic PDB files for benchmarking.
+
+The files contain every stream pdblib parses:
+modules with procedure symbols and C13 line information, the global, public and symbol record streams,
+the DBI substreams including a file info substream with n_modules * n_files names, section headers,
+the /names string table and optionally TPI and IPI type records with their hash streams.
+
+Usage (from the repository root): python -m benchmarks.synth out.pdb [--modules 100] [--symbols 1000] [--types 0]
+"""
+from typing import Dict, List, Sequence, Tuple, Iterable, Optional
+from math import ceil
+import argparse
+import random
+import struct
+import zlib
+
+from pdblib._msf import PDB7Header
+from pdblib._hash import hash_string_v1, hash_string_v2
+
+# Blocks 0 to 3 hold the superblock, the two free block maps and the block map.
+FirstDataBlock = 4
+BlockMapBlock = 3
+TypeHashBuckets = 0x3FFFF
+GSIHashBuckets = 4096
+TypeIndexBegin = 0x1000
+
+S_END = 0x0006
+S_PUB32 = 0x110E
+S_LPROC32 = 0x110F
+S_GPROC32 = 0x1110
+S_PROCREF = 0x1125
+S_LPROCREF = 0x1127
+LF_POINTER = 0x1002
+LF_PROCEDURE = 0x1008
+LF_ARGLIST = 0x1201
+LF_FIELDLIST = 0x1203
+LF_ENUMERATE = 0x1502
+LF_MEMBER = 0x150D
+LF_STRUCTURE = 0x1505
+LF_ENUM = 0x1507
+LF_FUNC_ID = 0x1601
+LF_STRING_ID = 0x1605
+ForwardReference = 0x80
+Scoped = 0x100
+HasUniqueName = 0x200
+
+
+def align(data: bytes, alignment: int = 4) -> bytes:
+    return data + bytes(-len(data) % alignment)
+
+
+def build_msf(streams: Sequence[bytes], block_size: int = 4096, shuffle: bool = False, seed: int = 0) -> bytes:
+    """Lay out streams in a multi-stream file.
+
+    If shuffle is True the blocks are written in a random order so that no stream is contiguous.
+    """
+    rng = random.Random(seed)
+    block_counts = [ceil(len(stream) / block_size) for stream in streams]
+    directory_size = 4 + 4 * len(streams) + 4 * sum(block_counts)
+    directory_block_count = ceil(directory_size / block_size)
+    if directory_block_count > block_size // 4:
+        raise ValueError(f"The stream directory does not fit in one block map block of {block_size} bytes.")
+    data_block_count = sum(block_counts) + directory_block_count
+    indexes = list(range(FirstDataBlock, FirstDataBlock + data_block_count))
+    if shuffle:
+        rng.shuffle(indexes)
+    free_blocks = iter(indexes)
+    block_count = FirstDataBlock + data_block_count
+
+    blocks: Dict[int, bytes] = {}
+    stream_blocks = []
+    for stream, count in zip(streams, block_counts):
+        stream_block_list = [next(free_blocks) for _ in range(count)]
+        stream_blocks.append(stream_block_list)
+        for index, block in enumerate(stream_block_list):
+            blocks[block] = stream[index * block_size:(index + 1) * block_size]
+
+    directory = bytearray(struct.pack("<I", len(streams)))
+    directory += struct.pack(f"<{len(streams)}I", *[len(stream) for stream in streams])
+    for stream_block_list in stream_blocks:
+        directory += struct.pack(f"<{len(stream_block_list)}I", *stream_block_list)
+    directory_blocks = [next(free_blocks) for _ in range(directory_block_count)]
+    for index, block in enumerate(directory_blocks):
+        blocks[block] = directory[index * block_size:(index + 1) * block_size]
+    blocks[BlockMapBlock] = struct.pack(f"<{len(directory_blocks)}I", *directory_blocks)
+    blocks[0] = PDB7Header + struct.pack("<IIIIII", block_size, 1, block_count, len(directory), 0, BlockMapBlock)
+
+    return b"".join(blocks.get(index, b"").ljust(block_size, b"\0") for index in range(block_count))
+
+
+def symbol_record(kind: int, payload: bytes) -> bytes:
+    record = align(struct.pack("<H", kind) + payload + b"\0\0")[:-2]
+    return struct.pack("<H", len(record)) + record
+
+
+def public_symbol(flags: int, offset: int, segment: int, name: bytes) -> bytes:
+    return symbol_record(S_PUB32, struct.pack("<IIH", flags, offset, segment) + name + b"\0")
+
+
+def procedure_symbol(kind: int, offset: int, segment: int, length: int, name: bytes, type_index: int = 0) -> bytes:
+    return symbol_record(
+        kind,
+        struct.pack("<IIIIIIIIHB", 0, 0, 0, length, 0, length, type_index, offset, segment, 0) + name + b"\0",
+    )
+
+
+def procedure_reference(kind: int, symbol_offset: int, module: int, name: bytes) -> bytes:
+    return symbol_record(kind, struct.pack("<IIH", 0, symbol_offset, module) + name + b"\0")
+
+
+def hash_table(pairs: Sequence[Tuple[int, int]]) -> bytes:
+    """Serialise a hash table in the format read by read_hash_table."""
+    capacity = max(1, len(pairs) * 2)
+    words = ceil(capacity / 32)
+    present = [0] * words
+    for index in range(len(pairs)):
+        present[index // 32] |= 1 << (index % 32)
+    data = struct.pack("<II", len(pairs), capacity)
+    data += struct.pack(f"<I{words}I", words, *present)
+    data += struct.pack("<I", 0)  # The deleted bit vector
+    for key, value in pairs:
+        data += struct.pack("<II", key, value)
+    return data
+
+
+def info_stream(named_streams: Dict[str, int], guid: int = 0x1234, age: int = 1, timestamp: int = 0x5F000000) -> bytes:
+    names = b""
+    pairs = []
+    for name, stream_index in named_streams.items():
+        pairs.append((len(names), stream_index))
+        names += name.encode() + b"\0"
+    data = struct.pack("<IIIQQ", 20000404, timestamp, age, guid & (2 ** 64 - 1), guid >> 64)
+    data += struct.pack("<I", len(names)) + names
+    data += hash_table(pairs)
+    data += struct.pack("<I", 0)  # niMac
+    data += struct.pack("<I", 20140508)  # VC140 feature code
+    return data
+
+
+def names_stream(strings: Iterable[bytes], version: int = 1) -> Tuple[bytes, Dict[bytes, int]]:
+    """Build a /names string table. Returns the stream and the offset of each string."""
+    buffer = bytearray(b"\0")
+    offsets = {}
+    for string in strings:
+        if string not in offsets:
+            offsets[string] = len(buffer)
+            buffer += string + b"\0"
+    bucket_count = max(1, len(offsets) * 3 // 2 + 1)
+    buckets = [0] * bucket_count
+    hash_string = hash_string_v1 if version == 1 else hash_string_v2
+    for string, offset in offsets.items():
+        index = hash_string(string) % bucket_count
+        while buckets[index]:
+            index = (index + 1) % bucket_count
+        buckets[index] = offset
+    data = struct.pack("<III", 0xEFFEEFFE, version, len(buffer)) + buffer
+    data += struct.pack(f"<I{bucket_count}I", bucket_count, *buckets) + struct.pack("<I", len(offsets))
+    return data, offsets
+
+
+def type_record(kind: int, data: bytes) -> bytes:
+    data = struct.pack("<H", kind) + data
+    pad = -(len(data) + 2) % 4
+    data += bytes(0xF0 + pad - index for index in range(pad))
+    return struct.pack("<H", len(data)) + data
+
+
+def jam_crc(data: bytes) -> int:
+    return zlib.crc32(data, 0xFFFFFFFF) ^ 0xFFFFFFFF
+
+
+def udt_hash(prop: int, name: bytes, unique_name: bytes, record: Optional[bytes]) -> int:
+    """Hash a user defined type the way the TPI hash stream does."""
+    if not prop & ForwardReference and not prop & Scoped:
+        return hash_string_v1(name) % TypeHashBuckets
+    if not prop & ForwardReference and prop & HasUniqueName:
+        return hash_string_v1(unique_name) % TypeHashBuckets
+    return jam_crc(record) % TypeHashBuckets
+
+
+def numeric(value: int) -> bytes:
+    if value < 0x8000:
+        return struct.pack("<H", value)
+    return struct.pack("<HI", 0x8004, value)
+
+
+def padded_member(data: bytes, offset: int) -> bytes:
+    """Pad a field list member so that the next member is aligned to 4 bytes."""
+    pad = -(offset + len(data)) % 4
+    return data + bytes(0xF0 + pad - index for index in range(pad))
+
+
+def build_types(class_count: int) -> Tuple[List[bytes], List[int], List[bytes], List[int], List[int]]:
+    """Build type records for class_count classes.
+
+    Returns the TPI records and hashes, the IPI records and hashes and the index of the first TPI record of each class.
+    """
+    records = []
+    hashes = []
+    first_records = []
+
+    def add(kind: int, data: bytes, hash_value: Optional[int] = None) -> int:
+        record = type_record(kind, data)
+        records.append(record)
+        hashes.append(jam_crc(record) % TypeHashBuckets if hash_value is None else hash_value)
+        return TypeIndexBegin + len(records) - 1
+
+    for class_index in range(class_count):
+        name = f"Class{class_index}".encode()
+        unique_name = f".?AVClass{class_index}@@".encode()
+        member_count = 3 + class_index % 5
+        first_records.append(len(records))
+        forward_ref = add(
+            LF_STRUCTURE,
+            struct.pack("<HHIII", 0, ForwardReference | HasUniqueName, 0, 0, 0) + numeric(0) + name + b"\0" + unique_name + b"\0",
+        )
+        pointer = add(LF_POINTER, struct.pack("<II", forward_ref, 0x1000C))
+        arguments = add(LF_ARGLIST, struct.pack("<II", 1, 0x74))
+        add(LF_PROCEDURE, struct.pack("<IBBHI", 0x03, 0, 0, 1, arguments))
+        members = bytearray()
+        for member_index in range(member_count):
+            # Some offsets use the four byte numeric encoding.
+            offset = member_index * 8 if class_index % 3 else 0x9000 + member_index * 8
+            member = struct.pack("<HHI", LF_MEMBER, 3, 0x74 if member_index % 2 else pointer)
+            members += padded_member(member + numeric(offset) + f"m_{member_index}".encode() + b"\0", len(members))
+        enumerate_ = padded_member(struct.pack("<HH", LF_ENUMERATE, 3) + numeric(class_index) + b"E\0", 0)
+        field_list = add(LF_FIELDLIST, members)
+        data = (
+            struct.pack("<HHIII", member_count, HasUniqueName, field_list, 0, 0)
+            + numeric(8 * member_count) + name + b"\0" + unique_name + b"\0"
+        )
+        add(LF_STRUCTURE, data, udt_hash(HasUniqueName, name, unique_name, type_record(LF_STRUCTURE, data)))
+        if class_index % 4 == 0:
+            enum_name = f"Enum{class_index}".encode()
+            enum_fields = add(LF_FIELDLIST, enumerate_)
+            add(LF_ENUM, struct.pack("<HHII", 1, 0, 0x74, enum_fields) + enum_name + b"\0", udt_hash(0, enum_name, b"", None))
+
+    ids = []
+    for class_index in range(class_count):
+        ids.append(type_record(LF_STRING_ID, struct.pack("<I", 0) + f"c:\\src\\class{class_index}.cpp".encode() + b"\0"))
+        ids.append(type_record(LF_FUNC_ID, struct.pack("<II", 0, 0x1003) + f"func{class_index}".encode() + b"\0"))
+    id_hashes = [jam_crc(record) % TypeHashBuckets for record in ids]
+    return records, hashes, ids, id_hashes, first_records
+
+
+def type_stream(
+    records: Sequence[bytes] = (),
+    hashes: Sequence[int] = (),
+    hash_stream_index: int = 0xFFFF,
+    index_interval: int = 256,
+    adjusters: bytes = b"",
+) -> Tuple[bytes, bytes]:
+    """Build a TPI or IPI stream. Returns the stream and its hash stream."""
+    data = b"".join(records)
+    index_offsets = bytearray()
+    offset = 0
+    last_indexed = -index_interval
+    for index, record in enumerate(records):
+        if offset - last_indexed >= index_interval:
+            index_offsets += struct.pack("<II", TypeIndexBegin + index, offset)
+            last_indexed = offset
+        offset += len(record)
+    hash_values = struct.pack(f"<{len(hashes)}I", *hashes)
+    header = struct.pack(
+        "<IIIIIHHIIiIiIiI",
+        20040203, 56, TypeIndexBegin, TypeIndexBegin + len(records), len(data),
+        hash_stream_index, 0xFFFF, 4, TypeHashBuckets,
+        0, len(hash_values),
+        len(hash_values), len(index_offsets),
+        len(hash_values) + len(index_offsets), len(adjusters),
+    )
+    return header + data, hash_values + index_offsets + adjusters
+
+
+def module_info(
+    stream_index: int, symbol_size: int, name: bytes, object_name: bytes, c13_size: int, offset: int, size: int, module_index: int
+) -> bytes:
+    data = struct.pack(
+        "<Ih2xiiIh2xIIHhIIIH2xIII",
+        0, 1, offset, size, 0x60000020, module_index, 0, 0,
+        0, stream_index, symbol_size, 0, c13_size, 0, 0, 0, 0,
+    ) + name + b"\0" + object_name + b"\0"
+    return align(data)
+
+
+def dbi_stream(
+    module_infos: Sequence[bytes],
+    contributions: Sequence[tuple],
+    section_map: Sequence[tuple],
+    module_files: Sequence[Sequence[bytes]],
+    symbol_record_stream: int,
+    global_stream: int,
+    public_stream: int,
+    optional_debug_header: bytes,
+) -> bytes:
+    modules = b"".join(module_infos)
+    section_contributions = struct.pack("<I", 0xF12EBA2D) + b"".join(
+        struct.pack("<H2xiiIH2xII", *contribution) for contribution in contributions
+    )
+    section_map_data = struct.pack("<HH", len(section_map), len(section_map)) + b"".join(
+        struct.pack("<HHHHHHII", *entry) for entry in section_map
+    )
+    module_count = len(module_files)
+    names = bytearray()
+    offsets = []
+    for files in module_files:
+        for file_name in files:
+            offsets.append(len(names))
+            names += file_name + b"\0"
+    file_info = struct.pack("<HH", module_count, len(offsets) & 0xFFFF)
+    file_info += struct.pack(f"<{module_count}H", *range(module_count))
+    file_info += struct.pack(f"<{module_count}H", *[len(files) for files in module_files])
+    file_info += struct.pack(f"<{len(offsets)}I", *offsets)
+    file_info += names
+    header = struct.pack(
+        "<iIIHHHHHHiiiiiIiiHHI",
+        -1, 19990903, 1, global_stream, 0x8E00, public_stream, 0, symbol_record_stream, 0,
+        len(modules), len(section_contributions), len(section_map_data), len(file_info), 0, 0,
+        len(optional_debug_header), 0, 0, 0x8664, 0,
+    )
+    return header + modules + section_contributions + section_map_data + file_info + optional_debug_header
+
+
+def module_stream(symbols: bytes, c13: bytes) -> bytes:
+    # The CV_SIGNATURE_C13 signature, the symbols, the line information and an empty global references substream.
+    return struct.pack("<I", 4) + symbols + c13 + struct.pack("<I", 0)
+
+
+def gsi_hash(records: Sequence[Tuple[bytes, int]]) -> bytes:
+    """Build the hash table of a GSI or PSI stream from the name and symbol record offset of each symbol."""
+    buckets: List[List[int]] = [[] for _ in range(GSIHashBuckets)]
+    for name, offset in records:
+        buckets[hash_string_v1(name) % GSIHashBuckets].append(offset)
+    hash_records = bytearray()
+    bitmap = [0] * (GSIHashBuckets // 32 + 1)
+    starts = []
+    index = 0
+    for bucket_index, bucket in enumerate(buckets):
+        if bucket:
+            bitmap[bucket_index // 32] |= 1 << (bucket_index % 32)
+            starts.append(index * 12)
+        for offset in bucket:
+            hash_records += struct.pack("<Ii", offset + 1, 1)
+            index += 1
+    bucket_data = struct.pack(f"<{len(bitmap)}I", *bitmap) + struct.pack(f"<{len(starts)}I", *starts)
+    return struct.pack("<IIII", 0xFFFFFFFF, 0xEFFE0000 + 19990810, len(hash_records), len(bucket_data)) + hash_records + bucket_data
+
+
+def psi_stream(records: Sequence[Tuple[bytes, int]], address_offsets: Sequence[int]) -> bytes:
+    gsi = gsi_hash(records)
+    address_map = struct.pack(f"<{len(address_offsets)}I", *address_offsets)
+    return struct.pack("<IIIIHHII", len(gsi), len(address_map), 0, 0, 0, 0, 0, 0) + gsi + address_map
+
+
+def file_name(module_index: int, file_index: int) -> bytes:
+    return f"c:\\src\\file{module_index}_{file_index}.cpp".encode()
+
+
+def generate(
+    n_modules: int = 4,
+    n_symbols: int = 50,
+    n_files: int = 3,
+    block_size: int = 4096,
+    shuffle: bool = False,
+    seed: int = 0,
+    n_types: int = 0,
+    names_version: int = 1,
+    adjust: bool = True,
+    lines: bool = True,
+) -> bytes:
+    """Generate a PDB file.
+
+    :param n_modules: The number of modules.
+    :param n_symbols: The number of procedures in each module.
+        Each procedure also has a procedure reference in the global symbols and a public symbol.
+    :param n_files: The number of source files of each module.
+    :param block_size: The MSF block size.
+    :param shuffle: Write the blocks in a random order.
+    :param seed: The seed of the procedure lengths and block order.
+    :param n_types: The number of classes in the TPI stream. If 0 the TPI and IPI streams are empty.
+    :param names_version: The hash version of the /names string table.
+    :param adjust: Add TPI hash adjusters for every fifth class.
+    :param lines: Add C13 line information to four in five modules.
+    """
+    rng = random.Random(seed)
+    streams: List[Optional[bytes]] = [b"", None, None, None, None]
+    module_infos = []
+    contributions = []
+    module_files = []
+    symbol_records = bytearray()
+    global_records = []
+    public_records = []
+    public_addresses = []
+    rva = 0x1000
+    name_strings = [file_name(module_index, file_index) for module_index in range(n_modules) for file_index in range(n_files)]
+    name_strings += [f"Class{class_index}".encode() for class_index in range(0, n_types, 5)]
+    names_data, name_offsets = names_stream(name_strings, names_version)
+
+    for module_index in range(n_modules):
+        symbols = bytearray()
+        procedures = []
+        has_lines = lines and module_index % 5 != 4
+        checksums = b"".join(
+            struct.pack("<IBB2x", name_offsets[file_name(module_index, file_index)], 0, 0) for file_index in range(n_files)
+        )
+        c13 = bytearray(struct.pack("<II", 0xF4, len(checksums)) + checksums if has_lines else b"")
+        for symbol_index in range(n_symbols):
+            name = f"?func{module_index}_{symbol_index}@Class{module_index % 7}@@QEAAXXZ".encode()
+            length = rng.randint(16, 256)
+            offset = rva - 0x1000
+            procedures.append((len(symbols) + 4, name, offset))
+            symbols += procedure_symbol(S_LPROC32 if symbol_index % 2 == 0 else S_GPROC32, offset, 1, length, name)
+            symbols += symbol_record(S_END, b"")
+            if has_lines:
+                count = (length + 7) // 8
+                columns = symbol_index % 3 == 0
+                entries = b"".join(
+                    struct.pack("<II", line * 8, (10 + symbol_index * 100 + line) | 0x80000000) for line in range(count)
+                )
+                if columns:
+                    entries += b"".join(struct.pack("<HH", line, line + 1) for line in range(count))
+                block = struct.pack("<III", 8 * (symbol_index % n_files), count, 12 + len(entries)) + entries
+                subsection = struct.pack("<IHHI", offset, 1, 1 if columns else 0, length) + block
+                c13 += struct.pack("<II", 0xF2, len(subsection)) + subsection
+            rva += length
+
+        stream_index = len(streams)
+        streams.append(module_stream(symbols, c13))
+        start = procedures[0][2]
+        size = rva - 0x1000 - start
+        module_infos.append(module_info(
+            stream_index, len(symbols) + 4, f"mod{module_index}.obj".encode(), b"lib.lib", len(c13), start, size, module_index
+        ))
+        contributions.append((1, start, size, 0x60000020, module_index, 0, 0))
+        module_files.append([file_name(module_index, file_index) for file_index in range(n_files)])
+        for symbol_index, (symbol_offset, name, offset) in enumerate(procedures):
+            global_records.append((name, len(symbol_records)))
+            symbol_records += procedure_reference(
+                S_LPROCREF if symbol_index % 2 == 0 else S_PROCREF, symbol_offset, module_index + 1, name
+            )
+            public_records.append((name, len(symbol_records)))
+            public_addresses.append((offset, len(symbol_records)))
+            symbol_records += public_symbol(2, offset, 1, name)
+
+    symbol_record_stream = len(streams)
+    streams.append(symbol_records)
+    global_stream = len(streams)
+    streams.append(gsi_hash(global_records))
+    public_stream = len(streams)
+    streams.append(psi_stream(public_records, [offset for _, offset in sorted(public_addresses)]))
+    section_header_stream = len(streams)
+    streams.append(
+        struct.pack("<8sIIIIIIHHI", b".text", rva - 0x1000, 0x1000, rva - 0x1000, 0x400, 0, 0, 0, 0, 0x60000020)
+        + struct.pack("<8sIIIIIIHHI", b".data", 0x1000, (rva + 0xFFF) & ~0xFFF, 0x1000, 0, 0, 0, 0, 0, 0xC0000040)
+    )
+    optional_debug_header = struct.pack("<11h", -1, -1, -1, -1, -1, section_header_stream, -1, -1, -1, -1, -1)
+    section_map = [(0x10D, 0, 0, 1, 0xFFFF, 0xFFFF, 0, rva - 0x1000), (0x10B, 0, 0, 2, 0xFFFF, 0xFFFF, 0, 0x1000)]
+    names_stream_index = len(streams)
+    streams.append(names_data)
+
+    if n_types:
+        types, type_hashes, ids, id_hashes, first_records = build_types(n_types)
+        # Every fifth class name resolves to its forward reference through the hash adjusters.
+        adjusters = hash_table([
+            (name_offsets[f"Class{class_index}".encode()], TypeIndexBegin + first_records[class_index])
+            for class_index in range(0, n_types, 5)
+        ]) if adjust else b""
+        streams[2], hash_stream = type_stream(types, type_hashes, len(streams), adjusters=adjusters)
+        streams.append(hash_stream)
+        streams[4], hash_stream = type_stream(ids, id_hashes, len(streams))
+        streams.append(hash_stream)
+    else:
+        streams[2] = streams[4] = type_stream()[0]
+    streams[3] = dbi_stream(
+        module_infos, contributions, section_map, module_files,
+        symbol_record_stream, global_stream, public_stream, optional_debug_header,
+    )
+    streams[1] = info_stream({"/names": names_stream_index})
+    return build_msf(streams, block_size, shuffle, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="The file to write.")
+    parser.add_argument("--modules", type=int, default=100)
+    parser.add_argument("--symbols", type=int, default=1000, help="The number of procedures in each module.")
+    parser.add_argument("--files", type=int, default=10, help="The number of source files of each module.")
+    parser.add_argument("--types", type=int, default=0, help="The number of classes in the TPI stream.")
+    parser.add_argument("--block-size", type=int, default=4096)
+    parser.add_argument("--shuffle", action="store_true", help="Write the blocks in a random order.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    data = generate(
+        args.modules, args.symbols, args.files, args.block_size, args.shuffle, args.seed, args.types
+    )
+    with open(args.path, "wb") as f:
+        f.write(data)
+    print(f"Wrote {len(data)} bytes to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
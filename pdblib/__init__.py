@@ -3,8 +3,21 @@ from ._stream import (
     BaseStream,
     UnknownStream,
     DBIStream,
+    SectionContributionTable,
+    SectionMapTable,
     PDBInfoStream,
     ModuleStream,
+    SymbolTable,
     TPIIPIStream,
+    GlobalSymbolStream,
+    PublicSymbolStream,
+    StringTableStream,
 )
 from ._header import create_headers
+from ._cache import ParseCache
+from ._pdb_cache import PDBCache, PDBCacheStats, estimate_size
+from ._name_index import NameIndex
+from ._export import export, StringColumn
+from ._probe import probe, probe_many, ProbeResult
+from ._source import BlockSource, FileRangeReader
+from ._stats import ParseStats, PhaseStats
@@ -1,13 +1,23 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Iterator, List, TextIO, Dict
 import argparse
 import pathlib
+import sys
+import time
 
 import pdblib
 from pdblib._header import create_headers
+from pdblib._pdb import PDB7
+from pdblib._stats import ParseStats
+from pdblib._export import export, ExportFormats, ExportTables
 
 
 def arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Read and generate data from a Windows PDB file.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time, bytes and records of each phase of loading the pdb file to stderr.",
+    )
 
     subparsers = parser.add_subparsers(
         dest="operation", required=True, help="The operation to run."
@@ -21,14 +31,145 @@ def arg_parser() -> argparse.ArgumentParser:
     path_parser.add_argument(
         "header_directory", type=pathlib.Path, help="The path of the directory to save header files in."
     )
+    path_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of processes to demangle names in.",
+    )
+    symbolize_parser = subparsers.add_parser(
+        "symbolize", help="Convert relative virtual addresses to symbol+offset and file:line."
+    )
+    symbolize_parser.add_argument(
+        "pdb_path",
+        type=pathlib.Path,
+        help="The path of the pdb file to load. Must exist.",
+    )
+    symbolize_parser.add_argument(
+        "addresses",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="A file of whitespace separated hexadecimal addresses. Defaults to stdin.",
+    )
+    symbolize_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=65536,
+        help="The number of addresses to resolve at once.",
+    )
+    export_parser = subparsers.add_parser(
+        "export", help="Write the symbols, section contributions and modules as columnar tables."
+    )
+    export_parser.add_argument(
+        "pdb_path",
+        type=pathlib.Path,
+        help="The path of the pdb file to load. Must exist.",
+    )
+    export_parser.add_argument(
+        "output_directory", type=pathlib.Path, help="The directory to write a file for each table in."
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=ExportFormats,
+        default="npz",
+        help="The file format. npz files store string columns as a blob and an array of offsets.",
+    )
+    export_parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(ExportTables),
+        help="The tables to write. Defaults to all tables.",
+    )
+    export_parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Compress npz files.",
+    )
     return parser
 
 
+def read_addresses(f: TextIO, batch_size: int) -> Iterator[List[int]]:
+    """Read hexadecimal addresses from a file in batches.
+
+    Tokens that are not hexadecimal addresses are reported to stderr with their line number and skipped.
+    """
+    batch = []
+    for line_number, line in enumerate(f, 1):
+        for token in line.split():
+            try:
+                rva = int(token, 16)
+            except ValueError:
+                rva = -1
+            if rva < 0:
+                print(f"Skipping invalid address {token!r} on line {line_number}", file=sys.stderr)
+                continue
+            batch.append(rva)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def symbolize(pdb: PDB7, rvas: List[int], symbol_names: Dict[int, str]) -> List[str]:
+    """Resolve a batch of addresses to output lines in the order of rvas.
+
+    :param pdb: The PDB to resolve against.
+    :param rvas: The addresses.
+    :param symbol_names: A cache of the name of each address index entry shared between batches.
+    """
+    order = sorted(range(len(rvas)), key=rvas.__getitem__)
+    sorted_rvas = [rvas[index] for index in order]
+    address_index = pdb.address_index
+    entries = address_index.find_sorted(sorted_rvas)
+    lines = pdb.lines_at(sorted_rvas)
+    output = [""] * len(rvas)
+    for index, rva, entry, line in zip(order, sorted_rvas, entries, lines):
+        if entry == -1:
+            symbol_text = "?"
+        else:
+            name = symbol_names.get(entry)
+            if name is None:
+                symbol = address_index.location(pdb, entry, rva).symbol
+                name = symbol_names[entry] = getattr(symbol.RecordData, "name", b"?").decode(errors="replace")
+            symbol_text = f"{name}+0x{rva - address_index.starts[entry]:x}"
+        line_text = "?" if line is None else f"{line.file.decode(errors='replace')}:{line.line}"
+        output[index] = f"0x{rva:x} {symbol_text} {line_text}\n"
+    return output
+
+
 def main(args: Optional[Sequence[str]] = None):
     parsed_args = arg_parser().parse_args(args)
+    stats = ParseStats() if parsed_args.profile else None
     if parsed_args.operation == "header":
-        pdb = pdblib.parse(parsed_args.pdb_path)
-        create_headers(pdb, parsed_args.header_directory)
+        pdb = pdblib.parse(parsed_args.pdb_path, stats=stats)
+        create_headers(pdb, parsed_args.header_directory, parsed_args.jobs)
+    elif parsed_args.operation == "symbolize":
+        start = time.perf_counter()
+        pdb = pdblib.parse(parsed_args.pdb_path, lazy=True, stats=stats)
+        load_time = time.perf_counter() - start
+        count = 0
+        symbol_names: Dict[int, str] = {}
+        for rvas in read_addresses(parsed_args.addresses, parsed_args.batch_size):
+            sys.stdout.writelines(symbolize(pdb, rvas, symbol_names))
+            count += len(rvas)
+        sys.stdout.flush()
+        total_time = time.perf_counter() - start
+        print(
+            f"Resolved {count} addresses in {total_time:.3f}s "
+            f"(load {load_time:.3f}s, {count / max(total_time - load_time, 1e-9):.0f} addresses/s)",
+            file=sys.stderr,
+        )
+    elif parsed_args.operation == "export":
+        start = time.perf_counter()
+        pdb = pdblib.parse(parsed_args.pdb_path, lazy=True, stats=stats)
+        paths = export(
+            pdb, parsed_args.output_directory, parsed_args.format, parsed_args.tables, parsed_args.compress
+        )
+        print(f"Wrote {len(paths)} tables in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+    if stats is not None:
+        print(stats.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
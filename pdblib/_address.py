@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, List, Sequence, Dict
+from dataclasses import dataclass
+from array import array
+from bisect import bisect_right
+
+from ._stream.module import CodeView, PROCSYM32, PUBSYM32
+
+if TYPE_CHECKING:
+    from ._pdb import PDB7
+
+
+@dataclass
+class SymbolLocation:
+    """The symbol containing an address."""
+    symbol: CodeView
+    rva: int            # The start address of the symbol
+    length: int         # The extent of the symbol
+    offset: int         # The offset of the address from the start of the symbol
+
+
+@dataclass
+class AddressIndex:
+    """A sorted index from relative virtual address to the symbol at that address.
+
+    Each entry refers to a record by stream index and offset so symbols are only decoded when they are found.
+    """
+    starts: array       # The RVA of each symbol in ascending order
+    lengths: array      # The extent of each symbol
+    streams: array      # The stream containing each symbol record
+    offsets: array      # The offset of each symbol record in its stream
+
+    @classmethod
+    def from_pdb(cls, pdb: PDB7):
+        """Build the index from the public address map and the procedures referenced from the global symbols.
+
+        Procedures provide the extent of a symbol.
+        Public symbols without a procedure extend to the start of the next symbol or the end of their section.
+        References to a module that does not exist or has no symbol stream are skipped.
+        """
+        sym_record_stream = pdb.dbi_steam.header.SymRecordStream
+        module_infos = pdb.dbi_steam.modules
+        # The length, stream, offset and section end of the symbol at each RVA.
+        entries: Dict[int, list] = {}
+
+        # Procedures are found through S_PROCREF and S_LPROCREF records.
+        references = pdb.SymRecordStream.filter((0x1125, 0x1127))
+        module_buffers = {}
+        for reference in references:
+            record = reference.RecordData
+            # imod is one based.
+            if not 0 < record.imod <= len(module_infos):
+                continue
+            stream_index = module_infos[record.imod - 1].ModuleSymStream
+            if stream_index == -1:
+                continue
+            module_buffer = module_buffers.get(stream_index)
+            if module_buffer is None:
+                module_buffer = module_buffers[stream_index] = pdb.stream_buffer(stream_index)
+            procedure = CodeView.from_buffer(module_buffer, record.ibSym).RecordData
+            if not isinstance(procedure, PROCSYM32):
+                continue
+            rva = pdb.section_offset_to_rva(procedure.seg, procedure.off)
+            if rva is not None:
+                entries[rva] = [procedure.len, stream_index, record.ibSym, None]
+
+        # Public symbols take priority because they have the decorated name.
+        public_symbols = pdb.public_symbols
+        if public_symbols is not None:
+            sym_records = pdb.stream_buffer(sym_record_stream)
+            for offset in public_symbols.address_map:
+                public = CodeView.from_buffer(sym_records, offset).RecordData
+                if not isinstance(public, PUBSYM32):
+                    continue
+                rva = pdb.section_offset_to_rva(public.seg, public.off)
+                if rva is None:
+                    continue
+                entry = entries.get(rva)
+                if entry is None:
+                    entries[rva] = [0, sym_record_stream, offset, pdb.section_end_rva(public.seg)]
+                else:
+                    entry[1] = sym_record_stream
+                    entry[2] = offset
+
+        starts = array("I", sorted(entries))
+        lengths = array("I")
+        streams = array("H")
+        offsets = array("I")
+        for index, rva in enumerate(starts):
+            length, stream_index, offset, section_end = entries[rva]
+            if not length:
+                if index + 1 < len(starts):
+                    length = starts[index + 1] - rva
+                elif section_end is not None:
+                    length = max(section_end - rva, 0)
+            lengths.append(length)
+            streams.append(stream_index)
+            offsets.append(offset)
+        return cls(starts, lengths, streams, offsets)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find(self, rva: int) -> int:
+        """Get the index of the entry containing rva. -1 if no entry contains it."""
+        index = bisect_right(self.starts, rva) - 1
+        if index >= 0 and rva < self.starts[index] + self.lengths[index]:
+            return index
+        return -1
+
+    def find_sorted(self, rvas: Sequence[int]) -> List[int]:
+        """Find the entry index of each address in a sorted sequence in one merge pass."""
+        starts = self.starts
+        lengths = self.lengths
+        indexes = []
+        index = 0
+        previous = None
+        for rva in rvas:
+            if previous is not None and rva < previous:
+                raise ValueError("Addresses must be sorted in ascending order.")
+            previous = rva
+            # The search only needs to look forward from the previous match.
+            index = bisect_right(starts, rva, index) - 1
+            if index >= 0 and rva < starts[index] + lengths[index]:
+                indexes.append(index)
+            else:
+                indexes.append(-1)
+            index = max(index, 0)
+        return indexes
+
+    def location(self, pdb: PDB7, index: int, rva: int) -> Optional[SymbolLocation]:
+        """Decode the symbol of an entry."""
+        if index == -1:
+            return None
+        start = self.starts[index]
+        return SymbolLocation(
+            CodeView.from_buffer(pdb.stream_buffer(self.streams[index]), self.offsets[index]),
+            start,
+            self.lengths[index],
+            rva - start,
+        )
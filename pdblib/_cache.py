@@ -0,0 +1,136 @@
+from typing import Dict, Optional, Union
+from array import array
+from struct import Struct
+from uuid import UUID
+import mmap
+import os
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+# File layout
+#   header
+#   one entry per array: name, offset of the data in the file, byte size and typecode
+#   the array data in native byte order, each aligned to 8 bytes
+CacheMagic = b"PDBLIBC\0"
+CacheVersion = 1
+CacheHeaderStruct = Struct("<8sIB3x16sIQI")
+CacheEntryStruct = Struct("<16sQQc7x")
+ByteOrders = {"little": 0, "big": 1}
+DefaultCacheSize = 1 << 30
+CacheSuffix = ".pdbcache"
+
+
+def read_array_file(path: str, guid: UUID, age: int, file_size: int) -> Optional[Dict[str, memoryview]]:
+    """Map a file of named arrays written by write_array_file.
+
+    Returns None if the file does not exist, is invalid or was written for a different PDB.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, version, byte_order, entry_guid, entry_age, entry_file_size, count = CacheHeaderStruct.unpack_from(data)
+        if (
+            magic != CacheMagic
+            or version != CacheVersion
+            or byte_order != ByteOrders[sys.byteorder]
+            or entry_guid != guid.bytes_le
+            or entry_age != age
+            or entry_file_size != file_size
+        ):
+            return None
+        arrays = {}
+        view = memoryview(data)
+        for index in range(count):
+            name, offset, size, typecode = CacheEntryStruct.unpack_from(
+                data, CacheHeaderStruct.size + index * CacheEntryStruct.size
+            )
+            if offset + size > len(data):
+                raise ValueError("Cache entry is truncated.")
+            arrays[name.rstrip(b"\0").decode()] = view[offset:offset + size].cast(typecode.decode())
+    except Exception as e:
+        log.info(f"Invalid cache entry {path}: {e}")
+        return None
+    return arrays
+
+
+def write_array_file(path: str, guid: UUID, age: int, file_size: int, arrays: Dict[str, Union[array, memoryview]]):
+    """Write named arrays to a file that can be mapped by read_array_file.
+
+    The values may be arrays or memoryviews of arrays, such as the arrays of an entry that was read.
+
+    The file is written to a temporary path and then renamed so readers never see a partial file.
+    """
+    offset = CacheHeaderStruct.size + len(arrays) * CacheEntryStruct.size
+    views = {name: memoryview(values) for name, values in arrays.items()}
+    entries = []
+    for name, view in views.items():
+        offset += -offset % 8
+        entries.append(CacheEntryStruct.pack(name.encode(), offset, view.nbytes, view.format.encode()))
+        offset += view.nbytes
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(CacheHeaderStruct.pack(
+            CacheMagic, CacheVersion, ByteOrders[sys.byteorder], guid.bytes_le, age, file_size, len(arrays)
+        ))
+        f.write(b"".join(entries))
+        for view in views.values():
+            f.write(bytes(-f.tell() % 8))
+            f.write(view)
+    os.replace(temp_path, path)
+
+
+class ParseCache:
+    """A directory of parsed PDB indexes keyed by the PDB GUID and age.
+
+    Each entry is a set of named arrays stored in one file.
+    Entries are memory mapped when loaded so the arrays are not read until they are used.
+    When the directory grows larger than max_size the least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], max_size: int = DefaultCacheSize):
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+
+    def path(self, guid: UUID, age: int) -> str:
+        return os.path.join(self.directory, f"{guid.hex}{age:08x}{CacheSuffix}")
+
+    def load(self, guid: UUID, age: int, file_size: int) -> Optional[Dict[str, memoryview]]:
+        """Map the entry of a PDB. Returns None if there is no valid entry."""
+        path = self.path(guid, age)
+        arrays = read_array_file(path, guid, age, file_size)
+        if arrays is not None:
+            # Record the use for eviction.
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return arrays
+
+    def store(self, guid: UUID, age: int, file_size: int, arrays: Dict[str, Union[array, memoryview]]):
+        """Write the entry of a PDB and evict old entries if the cache is too large."""
+        os.makedirs(self.directory, exist_ok=True)
+        write_array_file(self.path(guid, age), guid, age, file_size, arrays)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache is no larger than max_size."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CacheSuffix) and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Union, Iterable, Optional, Callable, Sequence, BinaryIO
+from array import array
+from itertools import accumulate
+import csv
+import os
+import sys
+import zipfile
+
+if TYPE_CHECKING:
+    from ._pdb import PDB7
+
+# The kinds of the records exported as symbols. Each has a name, segment and offset.
+SymbolKinds = frozenset((
+    0x1102,  # S_THUNK32
+    0x1105,  # S_LABEL32
+    0x110C,  # S_LDATA32
+    0x110D,  # S_GDATA32
+    0x110E,  # S_PUB32
+    0x110F,  # S_LPROC32
+    0x1110,  # S_GPROC32
+    0x1112,  # S_LTHREAD32
+    0x1113,  # S_GTHREAD32
+    0x1146,  # S_LPROC32_ID
+    0x1147,  # S_GPROC32_ID
+))
+# The module of the records in the global symbol record stream.
+GlobalModule = -1
+ExportFormats = ("npz", "csv")
+
+
+class StringColumn:
+    """A column of byte strings stored as one blob and the offset of each string in it.
+
+    String n is blob[offsets[n]:offsets[n + 1]].
+    """
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: array, offsets: array):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[bytes]) -> StringColumn:
+        strings = list(strings)
+        offsets = array("Q", [0])
+        offsets.extend(accumulate(map(len, strings)))
+        return cls(array("B", b"".join(strings)), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def __iter__(self):
+        blob = self.blob.tobytes()
+        offsets = self.offsets
+        return (blob[start:end] for start, end in zip(offsets, offsets[1:]))
+
+
+Column = Union[array, StringColumn]
+Table = Dict[str, Column]
+
+
+def symbol_table(pdb: PDB7) -> Table:
+    """The named symbols with an address in the global symbol record stream and the module streams.
+
+    Symbols from the global stream have module GlobalModule.
+    length is the extent of procedures and thunks and 0 for other symbols.
+    Records that could not be decoded are skipped.
+    """
+    names = []
+    kinds = array("H")
+    segments = array("H")
+    offsets = array("I")
+    lengths = array("I")
+    modules = array("i")
+
+    def add(module: int, kind: int, record):
+        name = getattr(record, "name", None)
+        segment = getattr(record, "seg", None)
+        offset = getattr(record, "off", None)
+        if name is None or segment is None or offset is None:
+            # The record could not be decoded.
+            return
+        names.append(name)
+        kinds.append(kind)
+        segments.append(segment)
+        offsets.append(offset)
+        lengths.append(getattr(record, "len", 0))
+        modules.append(module)
+
+    global_symbols = pdb.SymRecordStream.filter(SymbolKinds)
+    for index, kind in enumerate(global_symbols.kinds):
+        add(GlobalModule, kind, global_symbols.record_data(index))
+    for module, symbol in pdb.iter_symbols(SymbolKinds):
+        add(module, symbol.RecordKind, symbol.RecordData)
+
+    return {
+        "name": StringColumn.from_strings(names),
+        "kind": kinds,
+        "segment": segments,
+        "offset": offsets,
+        "length": lengths,
+        "module": modules,
+    }
+
+
+def contribution_table(pdb: PDB7) -> Table:
+    """The section contributions of the DBI stream."""
+    contributions = pdb.dbi_steam.section_contributions
+    return {name: getattr(contributions, name) for name, _, _ in contributions.Fields}
+
+
+def module_table(pdb: PDB7) -> Table:
+    """The modules of the DBI stream. sym_stream is -1 if the module has no symbol stream."""
+    modules = pdb.dbi_steam.modules
+    return {
+        "name": StringColumn.from_strings(module.ModuleName for module in modules),
+        "obj_file_name": StringColumn.from_strings(module.ObjFileName for module in modules),
+        "section": array("h", [module.Section for module in modules]),
+        "offset": array("i", [module.Offset for module in modules]),
+        "size": array("i", [module.Size for module in modules]),
+        "characteristics": array("I", [module.Characteristics for module in modules]),
+        "sym_stream": array("h", [module.ModuleSymStream for module in modules]),
+        "sym_byte_size": array("I", [module.SymByteSize for module in modules]),
+        "c13_byte_size": array("I", [module.C13ByteSize for module in modules]),
+        "source_file_count": array("H", [module.SourceFileCount for module in modules]),
+    }
+
+
+ExportTables: Dict[str, Callable[[PDB7], Table]] = {
+    "symbols": symbol_table,
+    "contributions": contribution_table,
+    "modules": module_table,
+}
+
+
+def _npy_header(values: array) -> bytes:
+    """The header of a version 1.0 .npy file of a one dimensional array."""
+    kind = "f" if values.typecode in "fd" else "i" if values.typecode.islower() else "u"
+    byte_order = "|" if values.itemsize == 1 else "<"
+    header = f"{{'descr': '{byte_order}{kind}{values.itemsize}', 'fortran_order': False, 'shape': ({len(values)},), }}"
+    # The header is padded with spaces and ends with a newline so the data is 64 byte aligned.
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+def _write_npy(f: BinaryIO, values: array):
+    f.write(_npy_header(values))
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    f.write(memoryview(values).cast("B"))
+
+
+def write_npz(path: Union[str, os.PathLike], table: Table, compress: bool = False):
+    """Write a table to a .npz file that numpy.load can read.
+
+    A string column is stored as the arrays {name}_blob and {name}_offsets.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED) as zf:
+        for name, column in table.items():
+            if isinstance(column, StringColumn):
+                arrays = ((f"{name}_blob", column.blob), (f"{name}_offsets", column.offsets))
+            else:
+                arrays = ((name, column),)
+            for array_name, values in arrays:
+                with zf.open(f"{array_name}.npy", "w", force_zip64=True) as f:
+                    _write_npy(f, values)
+
+
+def write_csv(path: Union[str, os.PathLike], table: Table):
+    """Write a table to a CSV file with a header row. Strings are decoded as UTF-8."""
+    columns = [
+        [value.decode(errors="replace") for value in column] if isinstance(column, StringColumn) else column
+        for column in table.values()
+    ]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(table)
+        writer.writerows(zip(*columns))
+
+
+def export(
+    pdb: PDB7,
+    directory: Union[str, os.PathLike],
+    format: str = "npz",
+    tables: Optional[Sequence[str]] = None,
+    compress: bool = False,
+) -> List[str]:
+    """Write tables of the contents of a PDB to a directory.
+
+    Each table is written to {directory}/{table}.{format}.
+
+    :param pdb: The PDB to export.
+    :param directory: The directory to write the files in. It is created if it does not exist.
+    :param format: "npz" or "csv".
+    :param tables: The names of the tables in ExportTables to write. Defaults to all tables.
+    :param compress: Compress npz files.
+    :return: The paths of the files written.
+    """
+    if format not in ExportFormats:
+        raise ValueError(f"Unsupported export format {format}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name in ExportTables if tables is None else tables:
+        table = ExportTables[name](pdb)
+        path = os.path.join(directory, f"{name}.{format}")
+        if format == "npz":
+            write_npz(path, table, compress)
+        else:
+            write_csv(path, table)
+        paths.append(path)
+    return paths
@@ -0,0 +1,54 @@
+# https://github.com/llvm/llvm-project/blob/main/llvm/lib/DebugInfo/PDB/Native/Hash.cpp
+from typing import List, Tuple
+from struct import Struct
+
+
+def hash_string_v1(name: bytes) -> int:
+    """The string hash used by the symbol hash tables, the TPI hash stream and version 1 string tables."""
+    size = len(name)
+    long_count = size // 4
+    result = 0
+    for value in Struct(f"<{long_count}I").unpack_from(name):
+        result ^= value
+    offset = long_count * 4
+    remainder = size - offset
+    if remainder >= 2:
+        result ^= name[offset] | (name[offset + 1] << 8)
+        offset += 2
+        remainder -= 2
+    if remainder == 1:
+        result ^= name[offset]
+    result |= 0x20202020
+    result ^= result >> 11
+    return result ^ (result >> 16)
+
+
+# https://llvm.org/docs/PDB/HashTable.html
+HashTableHeaderStruct = Struct("<II")
+WordCountStruct = Struct("<I")
+
+
+def read_hash_table(reader) -> List[Tuple[int, int]]:
+    """Read a serialized hash table of 32 bit keys and values from a Reader.
+
+    Returns the key value pairs in bucket order.
+    """
+    size, capacity = reader.unpack(HashTableHeaderStruct)
+    present_words = reader.unpack(Struct(f"<{reader.unpack(WordCountStruct)[0]}I"))
+    reader.skip(4 * reader.unpack(WordCountStruct)[0])  # deleted bit vector
+    present_count = sum(bin(word).count("1") for word in present_words)
+    if present_count != size or size > capacity:
+        raise ValueError("Hash table size does not match the present bit vector.")
+    pairs = reader.unpack(Struct(f"<{2 * size}I"))
+    return list(zip(pairs[::2], pairs[1::2]))
+
+
+def hash_string_v2(name: bytes) -> int:
+    """The string hash used by version 2 string tables."""
+    result = 0xB170A1BF
+    long_count = len(name) // 4
+    for value in Struct(f"<{long_count}I").unpack_from(name) + tuple(name[long_count * 4:]):
+        result = (result + value) & 0xFFFFFFFF
+        result = (result + (result << 10)) & 0xFFFFFFFF
+        result ^= result >> 6
+    return (result * 1664525 + 1013904223) & 0xFFFFFFFF
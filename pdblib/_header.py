@@ -1,41 +1,111 @@
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 from undname import undname, UndnameFailure
 
 from ._pdb import PDB7
-from ._stream.module import PublicSymbol, LocalProcedure, LocalProcedureReference
+from ._stream.module import PublicSymbol, LocalProcedure, GlobalProcedure, ProcedureReference, LocalProcedureReference
 
+HeaderRecordTypes = (PublicSymbol, LocalProcedure, GlobalProcedure, ProcedureReference, LocalProcedureReference)
+# The record kinds of HeaderRecordTypes. Other records in the symbol record stream such as data and UDT symbols are skipped.
+HeaderRecordKinds = (0x110E, 0x110F, 0x1110, 0x1125, 0x1127)
+ChunkSize = 65536
+GroupBufferSize = 1 << 16
 
-def create_headers(pdb: PDB7, path: str):
-    """Generate header files from a program database"""
+Demangled = Tuple[Optional[str], Optional[str]]
+
+
+def demangle(record_descriptor_raw: str) -> Demangled:
+    """Get the group name and the full declaration of a decorated name.
+
+    The group name is None if the name is uncategorised.
+    The declaration is None if it could not be demangled.
+    """
+    try:
+        record_name: str = undname(record_descriptor_raw, name_only=True)
+    except UndnameFailure:
+        return None, None
+    group_name, *other = record_name.split("::", 1)
+    if not (other and group_name.isalnum()):
+        return None, None
+    try:
+        return group_name, undname(record_descriptor_raw)
+    except UndnameFailure:
+        return group_name, None
+
+
+class GroupWriter:
+    """Append text to one header file per group.
+
+    Text is buffered per group and appended to the file when the buffer is full.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._buffers: Dict[str, List[str]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._written = set()
+
+    def write(self, group_name: str, text: str):
+        self._buffers.setdefault(group_name, []).append(text)
+        size = self._sizes[group_name] = self._sizes.get(group_name, 0) + len(text)
+        if size >= GroupBufferSize:
+            self._flush(group_name)
+
+    def _flush(self, group_name: str):
+        # The first write replaces any existing file.
+        mode = "a" if group_name in self._written else "w"
+        with open(os.path.join(self._path, f"{group_name}.hpp"), mode) as f:
+            f.write("".join(self._buffers.pop(group_name)))
+        self._sizes.pop(group_name)
+        self._written.add(group_name)
+
+    def close(self):
+        for group_name in list(self._buffers):
+            self._flush(group_name)
+
+
+def create_headers(pdb: PDB7, path: str, jobs: int = 1):
+    """Generate header files from a program database
+
+    :param pdb: The program database.
+    :param path: The directory to write the header files to.
+    :param jobs: The number of processes to demangle names in.
+    """
     os.makedirs(path, exist_ok=True)
 
-    groups: dict[str, list[str]] = {}
-    for symbol in pdb.SymRecordStream:
-        record = symbol.RecordData
-        if isinstance(record, (PublicSymbol, LocalProcedure, LocalProcedureReference)):
-            record_descriptor_raw = record.name.decode()
-            try:
-                record_name: str = undname(record_descriptor_raw, name_only=True)
-            except UndnameFailure:
-                groups.setdefault("uncategorised", []).append(f"// {record_descriptor_raw}\n\n")
+    writer = GroupWriter(path)
+    # Public symbols and procedure references often share a name so each name is only demangled once.
+    demangled: Dict[str, Demangled] = {}
+    executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+    try:
+        symbols = pdb.SymRecordStream.filter(HeaderRecordKinds)
+        for chunk_start in range(0, len(symbols), ChunkSize):
+            names = []
+            for symbol in symbols[chunk_start:chunk_start + ChunkSize]:
+                record = symbol.RecordData
+                if not isinstance(record, HeaderRecordTypes):
+                    # The record is truncated.
+                    continue
+                names.append(record.name.decode())
+
+            new_names = [name for name in dict.fromkeys(names) if name not in demangled]
+            if executor is None:
+                demangled.update(zip(new_names, map(demangle, new_names)))
             else:
-                group_name, *other = record_name.split("::", 1)
-                if other and group_name.isalnum():
-                    group = groups.setdefault(group_name, [])
-                    group.append(f"// {record_descriptor_raw}\n")
-                    try:
-                        record_descriptor = undname(record_descriptor_raw)
-                    except UndnameFailure:
-                        pass
-                    else:
-                        group.append(f"{record_descriptor}\n")
-                    group.append("\n")
-                else:
-                    groups.setdefault("uncategorised", []).append(f"// {record_descriptor_raw}\n\n")
-        else:
-            raise NotImplementedError
+                chunk_size = max(1, len(new_names) // (jobs * 4))
+                demangled.update(zip(new_names, executor.map(demangle, new_names, chunksize=chunk_size)))
 
-    for group_name, group in groups.items():
-        with open(os.path.join(path, f"{group_name}.hpp"), "w") as f:
-            f.write("".join(group))
+            for record_descriptor_raw in names:
+                group_name, record_descriptor = demangled[record_descriptor_raw]
+                if group_name is None:
+                    writer.write("uncategorised", f"// {record_descriptor_raw}\n\n")
+                elif record_descriptor is None:
+                    writer.write(group_name, f"// {record_descriptor_raw}\n\n")
+                else:
+                    writer.write(group_name, f"// {record_descriptor_raw}\n{record_descriptor}\n\n")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        writer.close()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, List, Sequence, Dict
+from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+
+from ._stream.lines import C13LineTable
+
+if TYPE_CHECKING:
+    from ._pdb import PDB7
+
+UnknownFile = 0xFFFFFFFF
+
+
+@dataclass
+class SourceLine:
+    """The source line containing an address."""
+    file: bytes         # The source file name. Empty if it is not known.
+    line: int
+    rva: int            # The start address of the line
+    offset: int         # The offset of the address from the start of the line
+
+
+@dataclass
+class ModuleLines:
+    """The line entries of one module grouped by range and sorted by relative virtual address."""
+    range_starts: array     # The RVA of each range of code with line information in ascending order
+    range_ends: array
+    range_entries: array    # The index of the first line entry of each range followed by the number of entries
+    addresses: array        # The RVA of each line entry. Ascending within each range.
+    lines: array
+    files: array            # The /names offset of the file name of each line entry
+
+    @classmethod
+    def from_table(cls, pdb: PDB7, table: C13LineTable):
+        ranges = []
+        for index, segment in enumerate(table.segments):
+            base = pdb.section_offset_to_rva(segment, 0)
+            if base is None:
+                continue
+            start = base + table.starts[index]
+            entries = []
+            for entry in range(table.entry_starts[index], table.entry_starts[index + 1]):
+                file_name_offset = table.file_name_offset(table.files[entry])
+                entries.append((
+                    base + table.offsets[entry],
+                    table.lines[entry],
+                    UnknownFile if file_name_offset is None else file_name_offset,
+                ))
+            entries.sort()
+            ranges.append((start, start + table.sizes[index], entries))
+        ranges.sort(key=lambda range_: range_[:2])
+        range_entries = array("I", [0])
+        addresses = array("I")
+        lines = array("I")
+        files = array("I")
+        for _, _, entries in ranges:
+            for address, line, file_name_offset in entries:
+                addresses.append(address)
+                lines.append(line)
+                files.append(file_name_offset)
+            range_entries.append(len(addresses))
+        return cls(
+            array("I", [start for start, _, _ in ranges]),
+            array("I", [end for _, end, _ in ranges]),
+            range_entries,
+            addresses,
+            lines,
+            files,
+        )
+
+    def find(self, rva: int) -> int:
+        """Get the index of the line entry containing rva. -1 if no entry contains it."""
+        index = bisect_right(self.range_starts, rva) - 1
+        if index < 0 or rva >= self.range_ends[index]:
+            return -1
+        first = self.range_entries[index]
+        # Only the entries of the range are searched so an address before its first entry is not given the line of the previous range.
+        entry = bisect_right(self.addresses, rva, first, self.range_entries[index + 1]) - 1
+        if entry < first:
+            return -1
+        return entry
+
+
+@dataclass
+class LineIndex:
+    """An index from relative virtual address to source line.
+
+    The section contributions locate the module containing an address.
+    The line information of a module is only decoded when an address in it is first looked up.
+    """
+    starts: array       # The RVA of each section contribution in ascending order
+    ends: array
+    modules: array      # The DBI module index of each section contribution
+    _module_lines: Dict[int, ModuleLines] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_pdb(cls, pdb: PDB7):
+        module_infos = pdb.dbi_steam.modules
+        table = pdb.dbi_steam.section_contributions
+        contributions = []
+        for section, offset, size, module_index in zip(table.sections, table.offsets, table.sizes, table.module_indexes):
+            if not 0 <= module_index < len(module_infos):
+                continue
+            module_info = module_infos[module_index]
+            if module_info.ModuleSymStream == -1 or not module_info.C13ByteSize:
+                continue
+            rva = pdb.section_offset_to_rva(section, offset)
+            if rva is not None:
+                contributions.append((rva, rva + size, module_index))
+        contributions.sort()
+        return cls(
+            array("I", [start for start, _, _ in contributions]),
+            array("I", [end for _, end, _ in contributions]),
+            array("I", [module_index for _, _, module_index in contributions]),
+        )
+
+    def module_lines(self, pdb: PDB7, module_index: int) -> ModuleLines:
+        """Get the line entries of a module, decoding them if needed."""
+        module_lines = self._module_lines.get(module_index)
+        if module_lines is None:
+            module_info = pdb.dbi_steam.modules[module_index]
+            start = module_info.SymByteSize + module_info.C11ByteSize
+            c13 = pdb.stream_buffer(module_info.ModuleSymStream)[start:start + module_info.C13ByteSize]
+            module_lines = self._module_lines[module_index] = ModuleLines.from_table(
+                pdb, C13LineTable.from_bytes(c13)
+            )
+        return module_lines
+
+    def find(self, pdb: PDB7, rva: int) -> Optional[SourceLine]:
+        """Find the source line containing rva. Returns None if no line contains it."""
+        index = bisect_right(self.starts, rva) - 1
+        if index < 0 or rva >= self.ends[index]:
+            return None
+        module_lines = self.module_lines(pdb, self.modules[index])
+        entry = module_lines.find(rva)
+        if entry == -1:
+            return None
+        file_name_offset = module_lines.files[entry]
+        names = pdb.names
+        if file_name_offset == UnknownFile or names is None:
+            file = b""
+        else:
+            file = names.string_at(file_name_offset)
+        start = module_lines.addresses[entry]
+        return SourceLine(file, module_lines.lines[entry], start, rva - start)
+
+    def find_all(self, pdb: PDB7, rvas: Sequence[int]) -> List[Optional[SourceLine]]:
+        """Find the source line of each address. Only the modules containing the addresses are decoded."""
+        return [self.find(pdb, rva) for rva in rvas]
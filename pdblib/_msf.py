@@ -0,0 +1,400 @@
+from typing import Dict, List, Tuple, Iterator, Iterable, MutableMapping, Union, Sequence, Optional, Callable
+from math import ceil
+from dataclasses import dataclass, field
+from mmap import mmap
+from bisect import bisect_right
+from struct import Struct, error as StructError
+import logging
+
+from ._source import BlockSource
+
+log = logging.getLogger(__name__)
+
+PDB7Header = b"Microsoft C/C++ MSF 7.00\r\n\x1ADS\0\0\0"
+SuperBlockStruct = Struct("<IIIIII")
+
+Buffer = Union[bytes, bytearray, mmap]
+
+
+class MSFStream:
+    """A read only view of the data of a stream.
+
+    The blocks of a stream do not need to be contiguous in the file.
+    Consecutive blocks are merged into runs and reads are served directly from the file buffer.
+    Data is only copied when a read spans the boundary between two runs or when it is converted to bytes.
+    """
+
+    __slots__ = ("_data", "_starts", "_offsets", "_size")
+
+    def __init__(self, data: Buffer, starts: Sequence[int], offsets: Sequence[int], size: int):
+        """
+        :param data: The buffer containing the data.
+        :param starts: The logical start of each run. Must be ascending and start at 0.
+        :param offsets: The offset of each run in data.
+        :param size: The logical size of the stream.
+        """
+        self._data = data
+        self._starts = starts
+        self._offsets = offsets
+        self._size = size
+
+    @classmethod
+    def from_blocks(cls, data: Buffer, block_size: int, blocks: Sequence[int], size: int):
+        starts = [0]
+        offsets = [blocks[0] * block_size] if blocks else [0]
+        for i in range(1, len(blocks)):
+            if blocks[i] != blocks[i - 1] + 1:
+                starts.append(i * block_size)
+                offsets.append(blocks[i] * block_size)
+        return cls(data, starts, offsets, size)
+
+    @classmethod
+    def from_bytes(cls, data: Buffer):
+        return cls(data, (0,), (0,), len(data))
+
+    @classmethod
+    def from_runs(cls, data: Buffer, runs: Sequence[Tuple[int, int]]):
+        """Create a stream from the (offset, length) of each run in data."""
+        starts = [0]
+        offsets = [runs[0][0]] if runs else [0]
+        size = runs[0][1] if runs else 0
+        for offset, length in runs[1:]:
+            starts.append(size)
+            offsets.append(offset)
+            size += length
+        return cls(data, starts, offsets, size)
+
+    def runs(self) -> List[Tuple[int, int]]:
+        """Get the (offset, length) in the underlying buffer of each run of the stream."""
+        return [
+            (offset, self._run_end(run) - start)
+            for run, (start, offset) in enumerate(zip(self._starts, self._offsets))
+        ]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def contiguous_range(self) -> Optional[Tuple[Buffer, int]]:
+        """If the stream is stored in one run get the underlying buffer and the offset of the stream in it."""
+        if len(self._starts) == 1:
+            return self._data, self._offsets[0]
+        return None
+
+    def unpacker(self, struct: Struct) -> Tuple[Union[Buffer, "MSFStream"], int, Callable[[Buffer, int], tuple]]:
+        """Get a buffer, the offset of the stream in it and a function to unpack struct at an offset in that buffer.
+
+        A stream stored in one run is read directly from the underlying buffer.
+        Otherwise the buffer is this view and each unpack goes through unpack_from.
+        Loops that read many records should call this once rather than dispatching on every read.
+        """
+        if len(self._starts) == 1:
+            return self._data, self._offsets[0], struct.unpack_from
+        return self, 0, lambda data, offset: self.unpack_from(struct, offset)
+
+    def _run_end(self, run: int) -> int:
+        return self._starts[run + 1] if run + 1 < len(self._starts) else self._size
+
+    def unpack_from(self, struct: Struct, offset: int = 0) -> tuple:
+        """Unpack a struct from the given offset in the stream."""
+        end = offset + struct.size
+        if offset < 0 or end > self._size:
+            raise StructError(f"unpack_from requires {struct.size} bytes at offset {offset} in a stream of {self._size} bytes")
+        starts = self._starts
+        if len(starts) == 1:
+            return struct.unpack_from(self._data, self._offsets[0] + offset)
+        run = bisect_right(starts, offset) - 1
+        if end <= self._run_end(run):
+            return struct.unpack_from(self._data, self._offsets[run] + offset - starts[run])
+        return struct.unpack(self._read(offset, end))
+
+    def _read(self, start: int, stop: int) -> bytes:
+        data = self._data
+        starts = self._starts
+        offsets = self._offsets
+        if len(starts) == 1:
+            return bytes(data[offsets[0] + start:offsets[0] + max(start, stop)])
+        run = bisect_right(starts, start) - 1
+        chunks = []
+        while start < stop:
+            run_stop = min(self._run_end(run), stop)
+            offset = offsets[run] + start - starts[run]
+            chunks.append(data[offset:offset + run_stop - start])
+            start = run_stop
+            run += 1
+        if len(chunks) == 1:
+            return bytes(chunks[0])
+        return b"".join(chunks)
+
+    def __getitem__(self, item: Union[int, slice]):
+        """Index a byte or create a view of a range of the stream without copying."""
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._size)
+            if step != 1:
+                raise ValueError("Stream slices do not support a step.")
+            if stop <= start:
+                return MSFStream(self._data, (0,), (0,), 0)
+            starts = self._starts
+            first = bisect_right(starts, start) - 1
+            last = bisect_right(starts, stop - 1)
+            return MSFStream(
+                self._data,
+                [0] + [run_start - start for run_start in starts[first + 1:last]],
+                [self._offsets[first] + start - starts[first]] + list(self._offsets[first + 1:last]),
+                stop - start,
+            )
+        if item < 0:
+            item += self._size
+        if not 0 <= item < self._size:
+            raise IndexError("stream index out of range")
+        run = bisect_right(self._starts, item) - 1
+        return self._data[self._offsets[run] + item - self._starts[run]]
+
+    def find(self, sub: bytes, start: int = 0, end: int = None) -> int:
+        """Find the lowest offset of sub in the range start to end. Returns -1 if it is not found."""
+        end = self._size if end is None else min(end, self._size)
+        if not sub:
+            return start if start <= end else -1
+        data = self._data
+        starts = self._starts
+        offsets = self._offsets
+        run = bisect_right(starts, start) - 1
+        while start < end:
+            run_end = min(self._run_end(run), end)
+            offset = offsets[run] + start - starts[run]
+            found = data.find(sub, offset, offset + run_end - start)
+            if found != -1:
+                return start + found - offset
+            if len(sub) > 1 and run_end < end:
+                # Matches that span the boundary between two runs.
+                window_start = max(start, run_end - len(sub) + 1)
+                found = self._read(window_start, min(end, run_end + len(sub) - 1)).find(sub)
+                if found != -1:
+                    return window_start + found
+            start = run_end
+            run += 1
+        return -1
+
+    def tobytes(self, start: int = 0, stop: int = None) -> bytes:
+        """Copy the range start to stop of the stream into a bytes object."""
+        stop = self._size if stop is None else min(stop, self._size)
+        return self._read(start, stop)
+
+    def __bytes__(self) -> bytes:
+        return self.tobytes()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MSFStream):
+            other = other.tobytes()
+        elif not isinstance(other, (bytes, bytearray, memoryview)):
+            return NotImplemented
+        return self.tobytes() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(size={self._size}, runs={len(self._starts)})"
+
+
+def as_stream(buffer: Union[Buffer, MSFStream]) -> MSFStream:
+    """Wrap a buffer in a stream view if it is not one already."""
+    if isinstance(buffer, MSFStream):
+        return buffer
+    return MSFStream.from_bytes(buffer)
+
+
+def read_stream_directory(root_stream: MSFStream, block_size: int) -> Tuple[Tuple[int, ...], List[Tuple[int, ...]]]:
+    """Read the size and block list of each stream from the stream directory."""
+    stream_count = root_stream.unpack_from(Struct("<I"))[0]
+    stream_sizes = root_stream.unpack_from(Struct(f"<{stream_count}i"), 4)
+    offset = 4 + 4 * stream_count
+    stream_blocks = []
+
+    for stream_size in stream_sizes:
+        stream_index_count = ceil(max(stream_size, 0) / block_size)
+        stream_blocks.append(
+            root_stream.unpack_from(Struct(f"<{stream_index_count}I"), offset)
+        )
+        offset += 4 * stream_index_count
+
+    if offset != len(root_stream):
+        raise ValueError("root stream has incorrect size")
+
+    return stream_sizes, stream_blocks
+
+
+@dataclass
+class SuperBlock:
+    BlockSize: int
+    FreeBlockMapBlock: int
+    NumBlocks: int
+    NumDirectoryBytes: int
+    Unknown: int
+    BlockMapAddr: int
+
+
+@dataclass
+class MSF:
+    """The block layout of a multi-stream file.
+
+    Only the superblock and the stream directory are parsed.
+    The stream data is read from the buffer when it is requested.
+    If the file is read from a block source data is None and each stream is fetched from the source when it is opened.
+    """
+    data: Optional[Buffer]
+    header: SuperBlock
+    stream_sizes: Tuple[int, ...]
+    stream_blocks: List[Tuple[int, ...]]
+    directory_blocks: Tuple[int, ...]
+    _streams: Dict[int, MSFStream] = field(default_factory=dict, repr=False, compare=False)
+    source: Optional[BlockSource] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_buffer(cls, data: Buffer):
+        # https://llvm.org/docs/PDB/MsfFile.html#the-superblock
+        if data[:32] != PDB7Header:
+            raise ValueError("Header is incorrect")
+        header = SuperBlock(*SuperBlockStruct.unpack_from(data, 32))
+        block_size = header.BlockSize
+
+        if any(data[32 + SuperBlockStruct.size:block_size]):
+            log.info("Extra data in the superblock")
+
+        # https://llvm.org/docs/PDB/MsfFile.html#the-free-block-map
+        # The free block map is not read. unused_blocks finds the free blocks from the stream directory instead.
+
+        # https://llvm.org/docs/PDB/MsfFile.html#the-stream-directory
+        block_index_count = ceil(header.NumDirectoryBytes / block_size)
+        if block_index_count > block_size / 4:
+            raise NotImplementedError
+        directory_blocks = Struct(f"<{block_index_count}I").unpack_from(data, header.BlockMapAddr * block_size)
+
+        if directory_blocks:
+            directory_tail = directory_blocks[-1] * block_size + header.NumDirectoryBytes - (block_index_count - 1) * block_size
+            if any(data[directory_tail:(directory_blocks[-1] + 1) * block_size]):
+                log.info("Extra data after root stream")
+        root_stream = MSFStream.from_blocks(data, block_size, directory_blocks, header.NumDirectoryBytes)
+        stream_sizes, stream_blocks = read_stream_directory(root_stream, block_size)
+        return cls(data, header, stream_sizes, stream_blocks, directory_blocks)
+
+    @classmethod
+    def from_source(cls, source: BlockSource):
+        """Read the superblock and stream directory from a block source."""
+        data = source.read(0, len(PDB7Header) + SuperBlockStruct.size)
+        if data[:32] != PDB7Header:
+            raise ValueError("Header is incorrect")
+        header = SuperBlock(*SuperBlockStruct.unpack_from(data, 32))
+        block_size = source.block_size = header.BlockSize
+
+        block_index_count = ceil(header.NumDirectoryBytes / block_size)
+        if block_index_count > block_size / 4:
+            raise NotImplementedError
+        directory_blocks = Struct(f"<{block_index_count}I").unpack(
+            source.read(header.BlockMapAddr * block_size, 4 * block_index_count)
+        )
+        root_stream = MSFStream.from_bytes(source.read_blocks(directory_blocks, header.NumDirectoryBytes))
+        stream_sizes, stream_blocks = read_stream_directory(root_stream, block_size)
+        return cls(None, header, stream_sizes, stream_blocks, directory_blocks, source=source)
+
+    @property
+    def size(self) -> int:
+        """The size of the file in bytes."""
+        if self.data is None:
+            return self.header.NumBlocks * self.header.BlockSize
+        return len(self.data)
+
+    def open_stream(self, stream_index: int) -> MSFStream:
+        """Get a view of the data of a stream.
+
+        No data is read until the view is used unless the file is read from a block source.
+        The view is retained so later calls return the same view until release_stream is called.
+        From a block source this keeps the data of the stream in memory for the life of the MSF.
+        """
+        stream = self._streams.get(stream_index)
+        if stream is None:
+            stream = self._streams[stream_index] = self.read_stream(stream_index)
+        return stream
+
+    def release_stream(self, stream_index: int):
+        """Stop retaining the view of a stream. Views that have already been returned remain valid."""
+        self._streams.pop(stream_index, None)
+
+    def read_stream(self, stream_index: int) -> MSFStream:
+        """Get a view of the data of a stream that is not kept.
+
+        From a block source the data is read again unless the blocks are cached.
+        """
+        blocks = self.stream_blocks[stream_index]
+        size = max(self.stream_sizes[stream_index], 0)
+        if self.source is None:
+            return MSFStream.from_blocks(self.data, self.header.BlockSize, blocks, size)
+        return MSFStream.from_bytes(self.source.read_blocks(blocks, size))
+
+    def prefetch(self, stream_indexes: Iterable[int]):
+        """Fetch the blocks of several streams from the block source together. Does nothing without a source."""
+        if self.source is not None:
+            self.source.prefetch(
+                block
+                for stream_index in stream_indexes
+                if stream_index not in self._streams
+                for block in self.stream_blocks[stream_index]
+            )
+
+    def unused_blocks(self) -> Dict[int, bytes]:
+        """Get the blocks that are not part of the superblock, directory or any stream."""
+        block_size = self.header.BlockSize
+        used = {0, self.header.BlockMapAddr}
+        used.update(self.directory_blocks)
+        for stream_blocks in self.stream_blocks:
+            used.update(stream_blocks)
+        unused = [block_index for block_index in range(ceil(self.size / block_size)) if block_index not in used]
+        if self.source is not None:
+            data = self.source.read_blocks(unused, len(unused) * block_size)
+            return {
+                block_index: data[index * block_size:(index + 1) * block_size]
+                for index, block_index in enumerate(unused)
+            }
+        return {
+            block_index: self.data[block_index * block_size:(block_index + 1) * block_size]
+            for block_index in unused
+        }
+
+
+class StreamMap(MutableMapping[int, MSFStream]):
+    """A mapping from stream index to stream data.
+
+    Stream views are only created when they are first accessed.
+    Popping a stream removes it from the mapping.
+    """
+
+    def __init__(self, msf: MSF):
+        self._msf = msf
+        self._indexes = set(range(len(msf.stream_sizes)))
+        self._streams: Dict[int, MSFStream] = {}
+
+    def __getitem__(self, stream_index: int) -> MSFStream:
+        if stream_index not in self._indexes:
+            raise KeyError(stream_index)
+        stream = self._streams.get(stream_index)
+        if stream is None:
+            stream = self._msf.open_stream(stream_index)
+        return stream
+
+    def __setitem__(self, stream_index: int, stream: MSFStream):
+        self._indexes.add(stream_index)
+        self._streams[stream_index] = as_stream(stream)
+
+    def __delitem__(self, stream_index: int):
+        self._indexes.remove(stream_index)
+        self._streams.pop(stream_index, None)
+
+    def __contains__(self, stream_index) -> bool:
+        return stream_index in self._indexes
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(self._indexes))
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({sorted(self._indexes)})"
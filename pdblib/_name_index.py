@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Iterable, Union
+from array import array
+from bisect import bisect_left
+import os
+import re
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    # Python 3.10 and earlier
+    import sre_parse
+    import sre_constants
+
+from undname import undname, UndnameFailure
+
+from ._cache import read_array_file, write_array_file
+from ._stream.module import CodeView
+
+if TYPE_CHECKING:
+    from ._pdb import PDB7
+
+GramSize = 3
+_RepeatOpcodes = frozenset(
+    getattr(sre_constants, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_constants, name)
+)
+
+
+def grams(text: str) -> Iterable[str]:
+    return (text[index:index + GramSize] for index in range(len(text) - GramSize + 1))
+
+
+def _pattern_literals(items, literals: List[str]):
+    """Add the runs of literal characters that every match of a parsed pattern must contain to literals."""
+    current: List[str] = []
+
+    def flush():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    for opcode, argument in items:
+        if opcode is sre_constants.LITERAL:
+            current.append(chr(argument))
+            continue
+        flush()
+        if opcode is sre_constants.SUBPATTERN:
+            add_flags, pattern = argument[1], argument[-1]
+            if not add_flags & re.IGNORECASE:
+                _pattern_literals(pattern, literals)
+        elif opcode in _RepeatOpcodes:
+            minimum, _, pattern = argument
+            if minimum:
+                _pattern_literals(pattern, literals)
+        # Alternations, classes, assertions and back references do not require any literal.
+    flush()
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """Get strings that every match of a regular expression must contain.
+
+    The pattern is parsed with the regular expression parser so escapes and repeats are handled exactly.
+    This is conservative. Case insensitive groups, alternations, classes and optional items are skipped.
+    """
+    if flags & re.IGNORECASE:
+        return []
+    literals: List[str] = []
+    _pattern_literals(sre_parse.parse(pattern, flags), literals)
+    return literals
+
+
+def demangle_name(name: str) -> str:
+    """Get the qualified name of a decorated name. Empty if it could not be demangled."""
+    if not name.startswith("?"):
+        return ""
+    try:
+        return undname(name, name_only=True)
+    except UndnameFailure:
+        return ""
+
+
+def _join(strings: Sequence[str]) -> array:
+    # Symbol names are null terminated so they cannot contain a null character.
+    return array("B", "\0".join(strings).encode())
+
+
+def _split(blob: Union[memoryview, array], count: int) -> List[str]:
+    if not count:
+        return []
+    return bytes(blob).decode().split("\0")
+
+
+class NameIndex:
+    """An index of the names of the records in the symbol record stream.
+
+    Each distinct name has an id.
+    The raw and demangled names are sorted for prefix search and
+    an index from each three character substring to the ids of the names containing it is used for substring search.
+    Regular expressions are only run on the names containing the literal parts of the expression.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        demangled: List[str],
+        symbol_starts: Sequence[int],
+        symbols: Sequence[int],
+        name_order: Sequence[int],
+        demangled_order: Sequence[int],
+        gram_keys: List[str],
+        gram_starts: Sequence[int],
+        gram_ids: Sequence[int],
+    ):
+        """
+        :param names: The raw name of each id.
+        :param demangled: The demangled name of each id. Empty if the name could not be demangled.
+        :param symbol_starts: The symbols of id n are symbols[symbol_starts[n]:symbol_starts[n + 1]].
+        :param symbols: The symbol record stream indexes of the records of each name.
+        :param name_order: The ids sorted by raw name.
+        :param demangled_order: The ids of the names that could be demangled sorted by demangled name.
+        :param gram_keys: Every substring of GramSize characters in ascending order.
+        :param gram_starts: The ids containing gram n are gram_ids[gram_starts[n]:gram_starts[n + 1]].
+        :param gram_ids: The ids containing each substring in ascending order.
+        """
+        self.names = names
+        self.demangled = demangled
+        self.symbol_starts = symbol_starts
+        self.symbols = symbols
+        self.name_order = name_order
+        self.demangled_order = demangled_order
+        self.gram_keys = gram_keys
+        self.gram_starts = gram_starts
+        self.gram_ids = gram_ids
+        self._sorted_names = [names[name_id] for name_id in name_order]
+        self._sorted_demangled = [demangled[name_id] for name_id in demangled_order]
+
+    @classmethod
+    def from_pdb(cls, pdb: PDB7):
+        """Index the names of the records in the symbol record stream."""
+        ids: Dict[bytes, int] = {}
+        name_symbols: List[List[int]] = []
+        for symbol_index, symbol in enumerate(pdb.SymRecordStream):
+            name = getattr(symbol.RecordData, "name", None)
+            if name is None:
+                continue
+            name_id = ids.get(name)
+            if name_id is None:
+                name_id = ids[name] = len(name_symbols)
+                name_symbols.append([])
+            name_symbols[name_id].append(symbol_index)
+
+        names = [name.decode(errors="replace") for name in ids]
+        demangled = [demangle_name(name) for name in names]
+        symbol_starts = array("I", [0])
+        symbols = array("I")
+        for symbol_indexes in name_symbols:
+            symbols.extend(symbol_indexes)
+            symbol_starts.append(len(symbols))
+
+        postings: Dict[str, List[int]] = {}
+        for name_id, (name, demangled_name) in enumerate(zip(names, demangled)):
+            name_grams = set(grams(name))
+            name_grams.update(grams(demangled_name))
+            for gram in name_grams:
+                gram_ids = postings.get(gram)
+                if gram_ids is None:
+                    postings[gram] = [name_id]
+                else:
+                    gram_ids.append(name_id)
+        gram_keys = sorted(postings)
+        gram_starts = array("I", [0])
+        gram_ids = array("I")
+        for gram in gram_keys:
+            gram_ids.extend(postings[gram])
+            gram_starts.append(len(gram_ids))
+
+        return cls(
+            names,
+            demangled,
+            symbol_starts,
+            symbols,
+            array("I", sorted(range(len(names)), key=names.__getitem__)),
+            array("I", sorted((name_id for name_id in range(len(names)) if demangled[name_id]), key=demangled.__getitem__)),
+            gram_keys,
+            gram_starts,
+            gram_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def symbol_indexes(self, name_id: int) -> Sequence[int]:
+        """Get the symbol record stream indexes of the records with a name."""
+        return self.symbols[self.symbol_starts[name_id]:self.symbol_starts[name_id + 1]]
+
+    def symbols_of(self, pdb: PDB7, name_id: int) -> List[CodeView]:
+        """Get the records with a name."""
+        table = pdb.SymRecordStream
+        return [table[symbol_index] for symbol_index in self.symbol_indexes(name_id)]
+
+    def find_prefix(self, prefix: str, demangled: bool = False) -> List[int]:
+        """Get the ids of the names starting with prefix in name order.
+
+        :param prefix: The start of the name.
+        :param demangled: Search the demangled names instead of the raw names.
+        """
+        sorted_names, order = (
+            (self._sorted_demangled, self.demangled_order) if demangled else (self._sorted_names, self.name_order)
+        )
+        start = end = bisect_left(sorted_names, prefix)
+        while end < len(sorted_names) and sorted_names[end].startswith(prefix):
+            end += 1
+        return list(order[start:end])
+
+    def _postings(self, gram: str) -> Sequence[int]:
+        index = bisect_left(self.gram_keys, gram)
+        if index < len(self.gram_keys) and self.gram_keys[index] == gram:
+            return self.gram_ids[self.gram_starts[index]:self.gram_starts[index + 1]]
+        return ()
+
+    def _candidates(self, literals: Iterable[str]) -> Optional[Set[int]]:
+        """Get the ids of the names that may contain all literals. None if every name may."""
+        query_grams = {gram for literal in literals for gram in grams(literal)}
+        if not query_grams:
+            return None
+        postings = sorted((self._postings(gram) for gram in query_grams), key=len)
+        candidates = set(postings[0])
+        for gram_ids in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(gram_ids)
+        return candidates
+
+    def _ids(self, candidates: Optional[Set[int]]) -> Iterable[int]:
+        return range(len(self.names)) if candidates is None else sorted(candidates)
+
+    def find_substring(self, text: str) -> List[int]:
+        """Get the ids of the names whose raw or demangled name contains text in ascending order."""
+        names = self.names
+        demangled = self.demangled
+        return [
+            name_id for name_id in self._ids(self._candidates((text,)))
+            if text in names[name_id] or text in demangled[name_id]
+        ]
+
+    def find_regex(self, pattern: Union[str, re.Pattern]) -> List[int]:
+        """Get the ids of the names whose raw or demangled name contains a match of a regular expression."""
+        compiled = re.compile(pattern)
+        candidates = self._candidates(required_literals(compiled.pattern, compiled.flags))
+        search = compiled.search
+        names = self.names
+        demangled = self.demangled
+        return [
+            name_id for name_id in self._ids(candidates)
+            if search(names[name_id]) or (demangled[name_id] and search(demangled[name_id]))
+        ]
+
+    def save(self, path: Union[str, os.PathLike], pdb: PDB7):
+        """Write the index to a file. The GUID, age and size of the PDB are stored to detect a stale file."""
+        info = pdb.info_stream
+        write_array_file(os.fspath(path), info.guid, info.age, pdb.msf.size, {
+            "names": _join(self.names),
+            "demangled": _join(self.demangled),
+            "symbol_starts": array("I", self.symbol_starts),
+            "symbols": array("I", self.symbols),
+            "name_order": array("I", self.name_order),
+            "demangled_order": array("I", self.demangled_order),
+            "gram_keys": _join(self.gram_keys),
+            "gram_starts": array("I", self.gram_starts),
+            "gram_ids": array("I", self.gram_ids),
+        })
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], pdb: PDB7) -> Optional[NameIndex]:
+        """Read an index written by save. Returns None if there is no valid index for this PDB at path."""
+        info = pdb.info_stream
+        arrays = read_array_file(os.fspath(path), info.guid, info.age, pdb.msf.size)
+        if arrays is None:
+            return None
+        name_count = len(arrays["symbol_starts"]) - 1
+        return cls(
+            _split(arrays["names"], name_count),
+            _split(arrays["demangled"], name_count),
+            arrays["symbol_starts"],
+            arrays["symbols"],
+            arrays["name_order"],
+            arrays["demangled_order"],
+            _split(arrays["gram_keys"], len(arrays["gram_starts"]) - 1),
+            arrays["gram_starts"],
+            arrays["gram_ids"],
+        )
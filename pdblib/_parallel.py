@@ -0,0 +1,39 @@
+from typing import Optional, List, Tuple, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+
+from ._msf import MSFStream
+from ._stream.module import SymbolTable
+
+# The file mapping of the worker process. Workers read stream ranges from it instead of receiving the data.
+_data: Optional[mmap.mmap] = None
+
+Runs = List[Tuple[int, int]]
+SymbolIndex = Tuple[bytes, bytes, bytes]
+
+
+def _open_file(path: str):
+    global _data
+    with open(path, "rb") as pdb:
+        _data = mmap.mmap(pdb.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _index_module_symbols(task: Tuple[Runs, int]) -> SymbolIndex:
+    runs, sym_byte_size = task
+    stream = MSFStream.from_runs(_data, runs)
+    # The symbols follow the 4 byte signature.
+    table = SymbolTable.from_bytes(stream[4:sym_byte_size])
+    return table.offsets.tobytes(), table.lengths.tobytes(), table.kinds.tobytes()
+
+
+def index_module_symbols(path: str, tasks: Sequence[Tuple[Runs, int]], workers: int) -> List[SymbolIndex]:
+    """Index the symbol records of module streams in a pool of processes.
+
+    :param path: The path of the PDB file. Each worker maps the file once.
+    :param tasks: The runs of each module stream in the file and the SymByteSize of the module.
+    :param workers: The number of processes.
+    :return: The offsets, lengths and kinds arrays of each symbol table as bytes in the order of tasks.
+    """
+    chunk_size = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_open_file, initargs=(path,)) as executor:
+        return list(executor.map(_index_module_symbols, tasks, chunksize=chunk_size))
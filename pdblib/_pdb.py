@@ -1,25 +1,63 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Optional, List, Dict
-from math import ceil
+from typing import BinaryIO, Optional, List, Dict, MutableMapping, Union, Sequence, Tuple, Iterable, Iterator, FrozenSet, Callable, TypeVar
 from dataclasses import dataclass, field
-from io import BytesIO
+from array import array
+from threading import RLock
+import mmap
+import os
 import logging
 
-from ._struct import Struct
-from ._stream import BaseStream, DBIStream, PDBInfoStream, ModuleStream, TPIIPIStream, UnknownStream
-from ._stream.module import CodeView
+from ._msf import MSF, MSFStream, StreamMap, SuperBlock
+from ._stream import DBIStream, PDBInfoStream, ModuleStream, TPIIPIStream, UnknownStream
+from ._stream.module import SymbolTable, CodeView, RecordHeaderStruct, SignatureStruct, CV_SIGNATURE_C13, iter_records, kind_histogram
+from ._stream.gsi import GlobalSymbolStream, PublicSymbolStream
+from ._stream.section import SectionHeaderStream, ImageSectionHeader
+from ._stream.names import StringTableStream
+from ._address import AddressIndex, SymbolLocation
+from ._lines import LineIndex, SourceLine
+from ._name_index import NameIndex
+from ._parallel import index_module_symbols
+from ._cache import ParseCache
+from ._source import BlockSource, ReadRange
+from ._stats import ParseStats, NullTimer
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-@dataclass
-class SuperBlock:
-    BlockSize: int
-    FreeBlockMapBlock: int
-    NumBlocks: int
-    NumDirectoryBytes: int
-    Unknown: int
-    BlockMapAddr: int
+# The name used in a load profile for each lazily loaded attribute of PDB7.
+StreamAttributes = {
+    "zero": "zero_stream",
+    "info": "info_stream",
+    "tpi": "tpi_stream",
+    "dbi": "dbi_steam",
+    "ipi": "ipi_stream",
+    "modules": "modules",
+    "symbols": "SymRecordStream",
+    "globals": "global_symbols",
+    "publics": "public_symbols",
+    "section_headers": "section_headers",
+    "names": "names",
+}
+LoadProfiles: Dict[str, FrozenSet[str]] = {
+    "minimal": frozenset({"info", "dbi"}),
+    "symbols": frozenset({"info", "dbi", "symbols", "globals", "publics"}),
+    "full": frozenset({"zero", "info", "tpi", "dbi", "ipi", "modules", "symbols"}),
+}
+LoadProfile = Union[str, Iterable[str], None]
+
+
+def resolve_load_profile(streams: LoadProfile) -> FrozenSet[str]:
+    """Get the stream names of a preset name or validate a collection of stream names."""
+    if isinstance(streams, str):
+        if streams not in LoadProfiles:
+            raise ValueError(f"Unknown load profile {streams!r}. Expected one of {sorted(LoadProfiles)}.")
+        return LoadProfiles[streams]
+    streams = frozenset(streams)
+    unknown = streams.difference(StreamAttributes)
+    if unknown:
+        raise ValueError(f"Unknown streams {sorted(unknown)}. Expected names from {sorted(StreamAttributes)}.")
+    return streams
 
 
 @dataclass
@@ -35,95 +73,620 @@ class AbstractBasePDB(ABC):
         raise NotImplementedError
 
 
-PDB7Header = b"Microsoft C/C++ MSF 7.00\r\n\x1ADS\0\0\0"
-
-
 @dataclass
 class PDB7(AbstractBasePDB):
     header: Optional[SuperBlock] = None
-    unused_blocks: Dict[int, bytes] = field(default_factory=list)
-    unused_streams: Dict[int, BaseStream] = field(default_factory=list)
-    zero_stream: Optional[UnknownStream] = None
-    info_stream: Optional[PDBInfoStream] = None
-    tpi_stream: Optional[TPIIPIStream] = None
-    dbi_steam: Optional[DBIStream] = None
-    ipi_stream: Optional[TPIIPIStream] = None
-    modules: List[ModuleStream] = field(default_factory=list)
-    SymRecordStream: List[CodeView] = field(default_factory=list)
+    msf: Optional[MSF] = None
+    unused_blocks: Dict[int, bytes] = field(default_factory=dict)
+    unused_streams: MutableMapping[int, MSFStream] = field(default_factory=dict)
+    _zero_stream: Optional[UnknownStream] = None
+    _info_stream: Optional[PDBInfoStream] = None
+    _tpi_stream: Optional[TPIIPIStream] = None
+    _dbi_steam: Optional[DBIStream] = None
+    _ipi_stream: Optional[TPIIPIStream] = None
+    _modules: Optional[List[ModuleStream]] = None
+    _SymRecordStream: Optional[SymbolTable] = None
+    _global_symbols: Optional[GlobalSymbolStream] = None
+    _public_symbols: Optional[PublicSymbolStream] = None
+    _section_headers: Optional[SectionHeaderStream] = None
+    _address_index: Optional[AddressIndex] = None
+    _names: Optional[StringTableStream] = None
+    _line_index: Optional[LineIndex] = None
+    _name_index: Optional[NameIndex] = None
+    _path: Optional[str] = field(default=None, repr=False)
+    _workers: int = field(default=0, repr=False)
+    _symbol_indexes: Optional[List[Tuple[array, array, array]]] = field(default=None, repr=False)
+    stats: Optional[ParseStats] = field(default=None, repr=False)
+    # Held while a stream or index is parsed on first access so that threads sharing the PDB parse it once.
+    _lock: RLock = field(default_factory=RLock, repr=False, compare=False)
 
     @classmethod
-    def from_path(cls, path: str):
+    def from_path(
+        cls,
+        path: str,
+        lazy: bool = False,
+        workers: int = 0,
+        cache: Union[ParseCache, str, os.PathLike, None] = None,
+        streams: LoadProfile = None,
+        stats: Optional[ParseStats] = None,
+    ):
         with open(path, "rb") as pdb:
-            return cls.from_file(pdb)
+            return cls.from_file(pdb, lazy, workers, cache, streams, stats)
 
     @classmethod
-    def from_file(cls, pdb: BinaryIO):
-        self = cls()
-
-        # https://llvm.org/docs/PDB/MsfFile.html#the-superblock
-        if pdb.read(32) != PDB7Header:
-            raise ValueError("Header is incorrect")
-        self.header = SuperBlock(*Struct("<IIIIII").read(pdb))
-
-        self.unused_blocks = unused_blocks = {}
-        block_index = 0
-        pdb.seek(0)
-        while block := pdb.read(self.header.BlockSize):
-            unused_blocks[block_index] = block
-            block_index += 1
-
-        if any(unused_blocks.pop(0)[32 + 6 * 4:]):
-            log.info("Extra data in the superblock")
-
-        # https://llvm.org/docs/PDB/MsfFile.html#the-free-block-map  # TODO
-
-        # https://llvm.org/docs/PDB/MsfFile.html#the-stream-directory
-        root_stream_table = BytesIO(unused_blocks.pop(self.header.BlockMapAddr))
-        block_index_count = ceil(self.header.NumDirectoryBytes / self.header.BlockSize)
-        if block_index_count > self.header.BlockSize / 4:
-            raise NotImplementedError
-        block_indexes = Struct(f"<{block_index_count}I").read(root_stream_table)
-
-        root_stream_bytes = b"".join(map(unused_blocks.pop, block_indexes))
-        if any(root_stream_bytes[self.header.NumDirectoryBytes:]):
-            log.info("Extra data after root stream")
-        root_stream = BytesIO(root_stream_bytes[:self.header.NumDirectoryBytes])
-        stream_count = Struct("<I").read(root_stream)[0]
-        stream_sizes = Struct(f"<{stream_count}i").read(root_stream)
-        stream_block_indexes = []
-
-        for stream_size in stream_sizes:
-            stream_index_count = ceil(stream_size / self.header.BlockSize)
-            stream_block_indexes.append(
-                Struct(f"<{stream_index_count}I").read(root_stream)
+    def from_file(
+        cls,
+        pdb: BinaryIO,
+        lazy: bool = False,
+        workers: int = 0,
+        cache: Union[ParseCache, str, os.PathLike, None] = None,
+        streams: LoadProfile = None,
+        stats: Optional[ParseStats] = None,
+    ):
+        """Load a PDB file.
+
+        :param pdb: The file to read from.
+        :param lazy: If True the file is memory mapped and only the stream directory is parsed up front.
+            Each stream is read and parsed when the attribute or unused_streams entry is first accessed.
+            The file must support fileno. The mapping remains valid after the file is closed.
+        :param workers: If greater than 1 the module symbol streams are indexed in this many processes.
+            Each process maps the file so it must be a file on disk with a name.
+            The result is identical to parsing them in this process.
+        :param cache: A ParseCache or the directory of one.
+            If the cache has an entry for the GUID and age of the PDB the symbol and address indexes are mapped from it.
+            Otherwise they are built and stored in the cache.
+        :param streams: The streams to parse up front.
+            A preset name ("minimal", "symbols" or "full") or a collection of names from StreamAttributes.
+            Other streams are parsed when their attribute is first accessed.
+            Defaults to "full" or to no streams if lazy is True.
+            Unless the profile is "full" the file is memory mapped if it supports fileno.
+        :param stats: If given the time, bytes and records of each phase and stream are recorded in it.
+            It is stored in the stats attribute so that streams parsed later are also recorded.
+        """
+        self = cls(stats=stats)
+        self._workers = workers
+        self._path = getattr(pdb, "name", None)
+        if streams is None:
+            streams = () if lazy else "full"
+        load = resolve_load_profile(streams)
+        full = load >= LoadProfiles["full"]
+
+        with self._time("read_file") as timer:
+            pdb.seek(0)
+            if lazy:
+                data = mmap.mmap(pdb.fileno(), 0, access=mmap.ACCESS_READ)
+            elif full:
+                data = pdb.read()
+            else:
+                try:
+                    data = mmap.mmap(pdb.fileno(), 0, access=mmap.ACCESS_READ)
+                except (AttributeError, OSError, ValueError):
+                    # The file is not on disk.
+                    data = pdb.read()
+            if self.stats is not None:
+                timer.size = len(data)
+
+        with self._time("directory") as timer:
+            msf = MSF.from_buffer(data)
+            if self.stats is not None:
+                timer.size = msf.header.NumDirectoryBytes
+                timer.records = len(msf.stream_sizes)
+        return self._load(msf, load, full and not lazy, cache)
+
+    @classmethod
+    def from_source(
+        cls,
+        source: Union[BlockSource, ReadRange],
+        cache: Union[ParseCache, str, os.PathLike, None] = None,
+        streams: LoadProfile = (),
+        stats: Optional[ParseStats] = None,
+    ):
+        """Load a PDB file through a block source such as a remote file.
+
+        Each stream is fetched with as few range reads as possible when it is first parsed.
+
+        :param source: A BlockSource or a read_range(offset, size) function to create one from.
+        :param cache: A ParseCache or the directory of one. See from_file.
+        :param streams: The streams to parse up front. See from_file. Defaults to no streams.
+        :param stats: See from_file.
+        """
+        if not isinstance(source, BlockSource):
+            source = BlockSource(source)
+        self = cls(stats=stats)
+        with self._time("directory") as timer:
+            msf = MSF.from_source(source)
+            if self.stats is not None:
+                timer.size = msf.header.NumDirectoryBytes
+                timer.records = len(msf.stream_sizes)
+        return self._load(msf, resolve_load_profile(streams), False, cache)
+
+    def _load(
+        self,
+        msf: MSF,
+        load: FrozenSet[str],
+        read_unused_blocks: bool,
+        cache: Union[ParseCache, str, os.PathLike, None],
+    ):
+        self.msf = msf
+        self.header = msf.header
+        self.unused_streams = StreamMap(msf)
+
+        cached_arrays: Dict[str, memoryview] = {}
+        if cache is not None:
+            if not isinstance(cache, ParseCache):
+                cache = ParseCache(cache)
+            info_stream = self.info_stream
+            with self._time("cache_load") as timer:
+                arrays = cache.load(info_stream.guid, info_stream.age, msf.size)
+                if arrays is not None:
+                    self._load_cached_indexes(arrays)
+                    cached_arrays = arrays
+                    if self.stats is not None:
+                        timer.size = sum(values.nbytes for values in arrays.values())
+
+        if read_unused_blocks:
+            with self._time("unused_blocks") as timer:
+                self.unused_blocks = msf.unused_blocks()
+                if self.stats is not None:
+                    timer.records = len(self.unused_blocks)
+        for name, attribute in StreamAttributes.items():
+            if name in load:
+                getattr(self, attribute)
+
+        if cache is not None:
+            # Only the indexes built by this load are stored so that a lazy load does not parse everything.
+            # The entry is rewritten when this load built indexes that it does not have yet.
+            arrays = self._cached_indexes()
+            if arrays.keys() - cached_arrays.keys():
+                arrays = {**cached_arrays, **arrays}
+                with self._time("cache_store") as timer:
+                    try:
+                        cache.store(info_stream.guid, info_stream.age, msf.size, arrays)
+                    except OSError as e:
+                        log.info(f"Could not store the parse cache entry: {e}")
+                    if self.stats is not None:
+                        timer.size = sum(memoryview(values).nbytes for values in arrays.values())
+
+        return self
+
+    def _cached_indexes(self) -> Dict[str, array]:
+        """Get the indexes that have been built to store in the parse cache."""
+        arrays = {}
+        if self._modules is not None:
+            module_counts = array("I")
+            module_offsets = array("I")
+            module_lengths = array("H")
+            module_kinds = array("H")
+            for module in self._modules:
+                module_counts.append(len(module.symbols))
+                module_offsets.extend(module.symbols.offsets)
+                module_lengths.extend(module.symbols.lengths)
+                module_kinds.extend(module.symbols.kinds)
+            arrays.update(
+                module_counts=module_counts,
+                module_offsets=module_offsets,
+                module_lengths=module_lengths,
+                module_kinds=module_kinds,
             )
+        sym_records = self._SymRecordStream
+        if sym_records is not None:
+            arrays.update(
+                sym_offsets=sym_records.offsets,
+                sym_lengths=sym_records.lengths,
+                sym_kinds=sym_records.kinds,
+            )
+        address_index = self._address_index
+        if address_index is not None:
+            arrays.update(
+                address_starts=address_index.starts,
+                address_lengths=address_index.lengths,
+                address_streams=address_index.streams,
+                address_offsets=address_index.offsets,
+            )
+        return arrays
+
+    def _load_cached_indexes(self, arrays: Dict[str, memoryview]):
+        """Use the indexes from the parse cache instead of scanning the streams.
+
+        An entry only holds the indexes that were built when it was stored.
+        """
+        if "sym_offsets" in arrays:
+            self._SymRecordStream = SymbolTable(
+                self._pop_stream(self.dbi_steam.header.SymRecordStream),
+                arrays["sym_offsets"],
+                arrays["sym_lengths"],
+                arrays["sym_kinds"],
+            )
+        if "module_counts" in arrays:
+            symbol_indexes = []
+            start = 0
+            for count in arrays["module_counts"]:
+                symbol_indexes.append((
+                    arrays["module_offsets"][start:start + count],
+                    arrays["module_lengths"][start:start + count],
+                    arrays["module_kinds"][start:start + count],
+                ))
+                start += count
+            self._symbol_indexes = symbol_indexes
+        if "address_starts" in arrays:
+            self._address_index = AddressIndex(
+                arrays["address_starts"],
+                arrays["address_lengths"],
+                arrays["address_streams"],
+                arrays["address_offsets"],
+            )
+
+    def _time(self, phase: str, stream_index: Optional[int] = None, size: int = 0):
+        """Measure a phase if stats are enabled."""
+        if self.stats is None:
+            return NullTimer
+        return self.stats.time(phase, stream_index, size)
+
+    def _pop_stream(self, stream_index: int) -> MSFStream:
+        """Remove a stream from unused_streams.
+
+        The MSF stops retaining the view so that the data is owned by the caller and freed with the parsed stream.
+        """
+        with self._time("read_stream", stream_index) as timer:
+            stream = self.unused_streams.pop(stream_index)
+            self.msf.release_stream(stream_index)
+            if self.stats is not None:
+                timer.size = len(stream)
+        return stream
+
+    def _parse_stream(self, phase: str, stream_index: int, parse: Callable[[MSFStream], T], count: Callable[[T], int] = None) -> T:
+        """Remove a stream from unused_streams and parse it.
+
+        :param phase: The name to record the time under.
+        :param stream_index: The stream to parse.
+        :param parse: The function to parse the stream with.
+        :param count: A function to get the number of records in the result.
+        """
+        stream = self._pop_stream(stream_index)
+        with self._time(phase, stream_index, len(stream)) as timer:
+            result = parse(stream)
+            if count is not None and self.stats is not None:
+                timer.records = count(result)
+        return result
+
+    @property
+    def zero_stream(self) -> UnknownStream:
+        if self._zero_stream is None:
+            with self._lock:
+                if self._zero_stream is None:
+                    # Stream 0 holds the stream directory of the previous version of the file. It is kept unparsed.
+                    self._zero_stream = self._parse_stream("zero", 0, UnknownStream.from_bytes)
+        return self._zero_stream
 
-        if root_stream.read():
-            raise ValueError("root stream has incorrect size")
+    @property
+    def info_stream(self) -> PDBInfoStream:
+        if self._info_stream is None:
+            with self._lock:
+                if self._info_stream is None:
+                    self._info_stream = self._parse_stream(
+                        "info", 1, PDBInfoStream.from_bytes, lambda stream: len(stream.named_streams)
+                    )
+        return self._info_stream
 
-        self.unused_streams = streams = {}
-        for stream_index, (stream_size, stream_blocks) in enumerate(zip(stream_sizes, stream_block_indexes)):
-            stream = b"".join(map(unused_blocks.pop, stream_blocks))
-            if any(stream[stream_size:]):
-                log.info(f"Extra data after stream {stream_index}")
-            streams[stream_index] = stream[:stream_size]
+    @property
+    def tpi_stream(self) -> TPIIPIStream:
+        if self._tpi_stream is None:
+            with self._lock:
+                if self._tpi_stream is None:
+                    self._tpi_stream = self._type_stream("tpi", 2)
+        return self._tpi_stream
 
-        self.zero_stream = UnknownStream.from_bytes(streams.pop(0))  # TODO
-        self.info_stream = PDBInfoStream.from_bytes(streams.pop(1))
-        self.tpi_stream = TPIIPIStream.from_bytes(streams.pop(2))
-        self.dbi_steam = DBIStream.from_bytes(streams.pop(3))
-        self.ipi_stream = TPIIPIStream.from_bytes(streams.pop(4))
+    def find_type(self, name: Union[str, bytes]) -> Optional[int]:
+        """Find the type index of a class, structure, union or enum by name. Returns None if it is not found."""
+        names = self.names
+        return self.tpi_stream.find_type(name, None if names is None else names.string_at)
 
-        for module_info in self.dbi_steam.modules:
+    @property
+    def names(self) -> Optional[StringTableStream]:
+        """The /names string table. None if the PDB does not have one."""
+        if self._names is None:
+            with self._lock:
+                if self._names is None:
+                    stream_index = self.info_stream.named_streams.get("/names")
+                    if stream_index is None:
+                        return None
+                    self._names = self._parse_stream(
+                        "names", stream_index, StringTableStream.from_bytes, lambda stream: stream.NameCount
+                    )
+        return self._names
+
+    @property
+    def dbi_steam(self) -> DBIStream:
+        if self._dbi_steam is None:
+            with self._lock:
+                if self._dbi_steam is None:
+                    self._dbi_steam = self._parse_stream("dbi", 3, DBIStream.from_bytes, lambda stream: len(stream.modules))
+        return self._dbi_steam
+
+    @property
+    def ipi_stream(self) -> TPIIPIStream:
+        if self._ipi_stream is None:
+            with self._lock:
+                if self._ipi_stream is None:
+                    self._ipi_stream = self._type_stream("ipi", 4)
+        return self._ipi_stream
+
+    def _type_stream(self, phase: str, stream_index: int) -> TPIIPIStream:
+        stream = self._parse_stream(phase, stream_index, TPIIPIStream.from_bytes, lambda stream: stream.type_count)
+        hash_stream_index = stream.header.HashStreamIndex
+        if hash_stream_index != 0xFFFF and hash_stream_index in self.unused_streams:
+            self._parse_stream(f"{phase}_hash", hash_stream_index, stream.load_hash_stream)
+        return stream
+
+    @property
+    def modules(self) -> List[ModuleStream]:
+        if self._modules is None:
+            with self._lock:
+                if self._modules is None:
+                    self._modules = self._parse_modules()
+        return self._modules
+
+    def _parse_modules(self) -> List[ModuleStream]:
+        module_infos = [
+            module_info for module_info in self.dbi_steam.modules if module_info.ModuleSymStream != -1
+        ]
+        # Module streams are usually written next to each other so a block source can fetch them together.
+        self.msf.prefetch(module_info.ModuleSymStream for module_info in module_infos)
+        streams = [self._pop_stream(module_info.ModuleSymStream) for module_info in module_infos]
+        if self._symbol_indexes is not None and len(self._symbol_indexes) == len(module_infos):
+            symbol_indexes = self._symbol_indexes
+        elif self._workers > 1 and isinstance(self._path, str) and len(module_infos) > 1:
+            with self._time("index_modules", None, 0 if self.stats is None else sum(map(len, streams))):
+                symbol_indexes = [
+                    (array("I", offsets), array("H", lengths), array("H", kinds))
+                    for offsets, lengths, kinds in index_module_symbols(
+                        self._path,
+                        [(stream.runs(), module_info.SymByteSize) for stream, module_info in zip(streams, module_infos)],
+                        self._workers,
+                    )
+                ]
+        else:
+            symbol_indexes = [None] * len(streams)
+        modules = []
+        for stream, module_info, symbol_index in zip(streams, module_infos, symbol_indexes):
+            with self._time("modules", module_info.ModuleSymStream, len(stream)) as timer:
+                module = ModuleStream.from_bytes(stream, module_info, symbol_index)
+                if self.stats is not None:
+                    timer.records = len(module.symbols)
+            modules.append(module)
+        return modules
+
+    def _module_symbol_buffers(self, modules: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, MSFStream]]:
+        """Read the symbol records of the modules one at a time.
+
+        Each module stream is read when it is reached and is not kept.
+        Modules without a symbol stream are skipped.
+
+        :param modules: The DBI module indexes to read. Defaults to all modules.
+        :return: An iterator of the DBI module index and symbol records of each module.
+        """
+        module_infos = self.dbi_steam.modules
+        for module_index in range(len(module_infos)) if modules is None else modules:
+            module_info = module_infos[module_index]
             if module_info.ModuleSymStream == -1:
                 continue
-            stream = streams.pop(module_info.ModuleSymStream)
-            self.modules.append(ModuleStream.from_bytes(stream, module_info))
+            stream = self.msf.read_stream(module_info.ModuleSymStream)
+            if stream.unpack_from(SignatureStruct)[0] != CV_SIGNATURE_C13:
+                raise NotImplementedError
+            yield module_index, stream[SignatureStruct.size:module_info.SymByteSize]
 
-        self.SymRecordStream = CodeView.from_file_all(BytesIO(self.unused_streams.pop(self.dbi_steam.header.SymRecordStream)))
+    def iter_symbols(
+        self, kinds: Optional[Iterable[int]] = None, modules: Optional[Iterable[int]] = None
+    ) -> Iterator[Tuple[int, CodeView]]:
+        """Decode the symbol records of the modules one at a time.
 
-        return self
+        The module streams are not parsed or kept.
+        Each module stream is read when it is reached and released when the next one is read
+        so memory use is bounded by the largest module rather than the whole file.
+
+        :param kinds: If given only records of these kinds are returned.
+        :param modules: The DBI module indexes to read. Defaults to all modules.
+        :return: An iterator of the DBI module index and record of each symbol.
+        """
+        kinds = None if kinds is None else frozenset(kinds)
+        for module_index, symbols in self._module_symbol_buffers(modules):
+            for symbol in iter_records(symbols, kinds):
+                yield module_index, symbol
+
+    def symbol_kind_histogram(self, modules: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """Count the symbol records of each kind in the modules without decoding them.
+
+        The module streams are read one at a time like iter_symbols.
+
+        :param modules: The DBI module indexes to read. Defaults to all modules.
+        """
+        counts: Dict[int, int] = {}
+        for _, symbols in self._module_symbol_buffers(modules):
+            for kind, count in kind_histogram(symbols).items():
+                counts[kind] = counts.get(kind, 0) + count
+        return counts
+
+    @property
+    def SymRecordStream(self) -> SymbolTable:
+        if self._SymRecordStream is None:
+            with self._lock:
+                if self._SymRecordStream is None:
+                    self._SymRecordStream = self._parse_stream(
+                        "symbols", self.dbi_steam.header.SymRecordStream, SymbolTable.from_bytes, len
+                    )
+        return self._SymRecordStream
+
+    def stream_buffer(self, stream_index: int) -> MSFStream:
+        """Get a view of the data of any stream without parsing it or removing it from unused_streams."""
+        return self.msf.open_stream(stream_index)
+
+    @property
+    def global_symbols(self) -> Optional[GlobalSymbolStream]:
+        """The global symbol hash stream. None if the PDB does not have one."""
+        if self._global_symbols is None:
+            with self._lock:
+                if self._global_symbols is None:
+                    stream_index = self.dbi_steam.header.GlobalStreamIndex
+                    if stream_index == 0xFFFF:
+                        return None
+                    self._global_symbols = self._parse_stream(
+                        "globals", stream_index, GlobalSymbolStream.from_bytes,
+                        lambda stream: len(stream.hash_table.record_offsets) if stream.hash_table is not None else 0,
+                    )
+        return self._global_symbols
+
+    @property
+    def public_symbols(self) -> Optional[PublicSymbolStream]:
+        """The public symbol hash stream. None if the PDB does not have one."""
+        if self._public_symbols is None:
+            with self._lock:
+                if self._public_symbols is None:
+                    stream_index = self.dbi_steam.header.PublicStreamIndex
+                    if stream_index == 0xFFFF:
+                        return None
+                    self._public_symbols = self._parse_stream(
+                        "publics", stream_index, PublicSymbolStream.from_bytes,
+                        lambda stream: len(stream.address_map) if stream.address_map is not None else 0,
+                    )
+        return self._public_symbols
+
+    def find_symbols(self, name: Union[str, bytes]) -> List[CodeView]:
+        """Find all global and public symbols with the given name using the on-disk hash tables."""
+        if isinstance(name, str):
+            name = name.encode()
+        terminated_name = name + b"\0"
+        buffer = self.stream_buffer(self.dbi_steam.header.SymRecordStream)
+        symbols = []
+        for stream in (self.global_symbols, self.public_symbols):
+            if stream is None:
+                continue
+            for offset in stream.hash_table.find_offsets(name):
+                # Many names share a bucket. Only decode records that could match.
+                record_end = offset + 2 + buffer.unpack_from(RecordHeaderStruct, offset)[0]
+                if buffer.find(terminated_name, offset + 4, record_end) == -1:
+                    continue
+                symbol = CodeView.from_buffer(buffer, offset)
+                if getattr(symbol.RecordData, "name", None) == name:
+                    symbols.append(symbol)
+        return symbols
+
+    def find_symbol(self, name: Union[str, bytes]) -> Optional[CodeView]:
+        """Find a global or public symbol by name. Returns None if there is no symbol with that name."""
+        symbols = self.find_symbols(name)
+        return symbols[0] if symbols else None
+
+    @property
+    def section_headers(self) -> Optional[SectionHeaderStream]:
+        """The section headers of the executable. None if the PDB does not have them."""
+        if self._section_headers is None:
+            with self._lock:
+                if self._section_headers is None:
+                    stream_index = self.dbi_steam.optional_dbg_header.SectionHdr
+                    if stream_index == -1:
+                        return None
+                    self._section_headers = self._parse_stream(
+                        "section_headers", stream_index, SectionHeaderStream.from_bytes, lambda stream: len(stream.sections)
+                    )
+        return self._section_headers
+
+    def section_offset_to_rva(self, segment: int, offset: int) -> Optional[int]:
+        """Convert a segment and offset to a relative virtual address.
+
+        The segment is mapped to a section through the section map.
+        Returns None if the segment does not exist.
+        """
+        section = self._section_header(segment)
+        if section is None:
+            return None
+        return section.VirtualAddress + offset
+
+    def section_end_rva(self, segment: int) -> Optional[int]:
+        """Get the relative virtual address of the end of a segment. Returns None if the segment does not exist."""
+        section = self._section_header(segment)
+        if section is None:
+            return None
+        return section.VirtualAddress + section.VirtualSize
+
+    def _section_header(self, segment: int) -> Optional[ImageSectionHeader]:
+        """Get the section header of a segment through the section map. Returns None if the segment does not exist."""
+        section_headers = self.section_headers
+        if section_headers is None:
+            raise ValueError("The PDB does not contain section headers.")
+        section_maps = self.dbi_steam.section_maps
+        section = segment
+        if 0 < segment <= len(section_maps):
+            section = section_maps.frames[segment - 1]
+        if not 0 < section <= len(section_headers.sections):
+            return None
+        return section_headers.sections[section - 1]
+
+    @property
+    def address_index(self) -> AddressIndex:
+        """The index from address to symbol. Built on first access."""
+        if self._address_index is None:
+            with self._lock:
+                if self._address_index is None:
+                    self._address_index = AddressIndex.from_pdb(self)
+        return self._address_index
+
+    def symbol_at(self, rva: int) -> Optional[SymbolLocation]:
+        """Find the symbol containing a relative virtual address. Returns None if no symbol contains it."""
+        index = self.address_index
+        return index.location(self, index.find(rva), rva)
+
+    def symbols_at(self, rvas: Sequence[int]) -> List[Optional[SymbolLocation]]:
+        """Find the symbol containing each address in a sequence sorted in ascending order."""
+        index = self.address_index
+        return [
+            index.location(self, entry, rva)
+            for entry, rva in zip(index.find_sorted(rvas), rvas)
+        ]
+
+    @property
+    def line_index(self) -> LineIndex:
+        """The index from address to source line. Built on first access."""
+        if self._line_index is None:
+            with self._lock:
+                if self._line_index is None:
+                    self._line_index = LineIndex.from_pdb(self)
+        return self._line_index
+
+    def line_at(self, rva: int) -> Optional[SourceLine]:
+        """Find the source line containing a relative virtual address. Returns None if no line contains it."""
+        return self.line_index.find(self, rva)
+
+    def lines_at(self, rvas: Sequence[int]) -> List[Optional[SourceLine]]:
+        """Find the source line containing each address."""
+        return self.line_index.find_all(self, rvas)
+
+    @property
+    def name_index(self) -> NameIndex:
+        """The index of the names of the records in the symbol record stream. Built on first access."""
+        if self._name_index is None:
+            with self._lock:
+                if self._name_index is None:
+                    self._name_index = NameIndex.from_pdb(self)
+        return self._name_index
+
+    def load_name_index(self, path: Union[str, os.PathLike]) -> NameIndex:
+        """Read the name index from a file written for this PDB. If there is no valid file the index is built and written to path."""
+        if self._name_index is None:
+            with self._lock:
+                if self._name_index is None:
+                    name_index = NameIndex.load(path, self)
+                    if name_index is None:
+                        name_index = NameIndex.from_pdb(self)
+                        name_index.save(path, self)
+                    self._name_index = name_index
+        return self._name_index
 
 
-def parse(path: str) -> PDB7:
-    return PDB7.from_path(path)
+def parse(
+    path: str,
+    lazy: bool = False,
+    workers: int = 0,
+    cache: Union[ParseCache, str, os.PathLike, None] = None,
+    streams: LoadProfile = None,
+    stats: Optional[ParseStats] = None,
+) -> PDB7:
+    return PDB7.from_path(path, lazy, workers, cache, streams, stats)
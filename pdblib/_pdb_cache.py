@@ -0,0 +1,308 @@
+from typing import Optional, Union, Dict, Tuple, Callable, Iterable, List
+from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from uuid import UUID
+from mmap import mmap
+from types import FunctionType, BuiltinFunctionType, MethodType, ModuleType
+import os
+import sys
+import time
+
+from ._pdb import PDB7, parse, LoadProfile
+from ._msf import MSF, MSFStream
+from ._cache import ParseCache
+from ._probe import probe_many, ProbeResult
+
+DefaultPDBCacheSize = 2 << 30
+
+# Objects that reference the file data. Their size is counted once from the MSF.
+_SharedTypes = (MSF, MSFStream, mmap, memoryview)
+# Objects that are not owned by the PDB.
+_ExternalTypes = (type, FunctionType, BuiltinFunctionType, MethodType, ModuleType)
+
+
+def _slot_names(cls: type) -> Iterable[str]:
+    for base in cls.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        yield from (slots,) if isinstance(slots, str) else slots
+
+
+def estimate_size(pdb: PDB7) -> int:
+    """Estimate the memory used by a PDB in bytes.
+
+    File data that was read into memory is counted in full.
+    A memory mapped file counts the logical size of each stream view that is retained by the MSF or referenced
+    by a parsed stream since only the pages of the streams that are read become resident.
+    A file read through a block source counts the size of the block cache and the data of each stream view
+    that is retained by the MSF or referenced by a parsed stream.
+    The parsed streams and indexes are measured with sys.getsizeof.
+    """
+    msf = pdb.msf
+    data = None if msf is None else msf.data
+    mapped = isinstance(data, mmap)
+    if msf is None or mapped:
+        size = 0
+    elif data is not None:
+        size = msf.size
+    else:
+        size = msf.source.cache_size
+
+    seen = {id(pdb.msf)}
+    stack = [value for value in vars(pdb).values() if value is not msf]
+    if msf is not None and (data is None or mapped):
+        stack.extend(msf._streams.values())
+    getsizeof = sys.getsizeof
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, _ExternalTypes):
+            continue
+        size += getsizeof(obj)
+        if isinstance(obj, MSFStream) and msf is not None:
+            if obj._data is not data:
+                # The data was read for this view and is not part of the file buffer or the block cache.
+                stack.append(obj._data)
+            elif mapped:
+                size += obj._size
+            continue
+        if isinstance(obj, (str, bytes, bytearray, int, float, UUID)) or isinstance(obj, _SharedTypes):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                stack.extend(attributes.values())
+            stack.extend(
+                getattr(obj, name) for name in _slot_names(type(obj)) if hasattr(obj, name)
+            )
+    return size
+
+
+@dataclass
+class PDBCacheStats:
+    hits: int = 0           # Requests served from the cache
+    misses: int = 0         # Requests that loaded a PDB
+    waits: int = 0          # Requests that waited for another thread to load the same PDB
+    evictions: int = 0
+    errors: int = 0         # Loads that raised an exception
+    load_seconds: float = 0.0
+
+
+@dataclass
+class _Entry:
+    path: str
+    pdb: PDB7
+    size: int
+    signature: Tuple[int, int]  # The modification time and size of the file when it was loaded
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PDBCache:
+    """A memory bounded least recently used cache of loaded PDB files.
+
+    PDBs are loaded by path or by GUID and age. The memory used by each PDB is estimated when it is loaded and
+    the least recently used PDBs are evicted when the total is larger than max_size.
+    The most recently loaded PDB is kept even if it is larger than max_size on its own.
+    A PDB is reloaded if its file has been modified since it was loaded.
+
+    The cache can be shared between threads. If several threads request a PDB that is not loaded
+    it is loaded once and every thread gets the same instance.
+    Streams and indexes that are parsed on first access are parsed once under a lock held by the PDB
+    so lookups such as symbol_at and line_at can be made from several threads.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DefaultPDBCacheSize,
+        search_paths: Iterable[Union[str, os.PathLike]] = (),
+        lazy: bool = True,
+        cache: Union[ParseCache, str, os.PathLike, None] = None,
+        streams: LoadProfile = None,
+        size_of: Callable[[PDB7], int] = estimate_size,
+    ):
+        """
+        :param max_size: The total estimated size in bytes of the PDBs to keep.
+        :param search_paths: Symbol store directories to find PDBs by GUID and age in.
+            A PDB is looked up at {directory}/{name}/{GUID}{age}/{name}.
+        :param lazy: See PDB7.from_file.
+        :param cache: A ParseCache or the directory of one. See PDB7.from_file.
+        :param streams: See PDB7.from_file.
+        :param size_of: A function to estimate the memory used by a PDB.
+        """
+        self.max_size = max_size
+        self.search_paths = [os.fspath(path) for path in search_paths]
+        self._lazy = lazy
+        self._cache = ParseCache(cache) if isinstance(cache, (str, os.PathLike)) else cache
+        self._streams = streams
+        self._size_of = size_of
+        self.stats = PDBCacheStats()
+        self._lock = Lock()
+        self._entries: Dict[str, _Entry] = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._paths: Dict[Tuple[UUID, int], str] = {}
+        self._size = 0
+
+    @staticmethod
+    def _key(path: Union[str, os.PathLike]) -> str:
+        return os.path.normcase(os.path.abspath(os.fspath(path)))
+
+    @property
+    def size(self) -> int:
+        """The total estimated size of the loaded PDBs in bytes."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: Union[str, os.PathLike]) -> bool:
+        return self._key(path) in self._entries
+
+    def add_paths(self, paths: Iterable[Union[str, os.PathLike]], workers: int = 8):
+        """Read the GUID and age of PDB files so that get_by_id can find them. The files are not loaded.
+
+        Files that cannot be read or are not PDB files are skipped.
+        """
+        paths = [self._key(path) for path in paths]
+        results = probe_many(paths, workers)
+        with self._lock:
+            for path, result in zip(paths, results):
+                if isinstance(result, ProbeResult):
+                    self._paths[(result.guid, result.age)] = path
+
+    def get(self, path: Union[str, os.PathLike]) -> PDB7:
+        """Get the PDB at a path. It is loaded if it is not in the cache."""
+        key = self._key(path)
+        signature = _file_signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.signature == signature:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return entry.pdb
+                # The file has changed.
+                self._remove(key)
+            future = self._loading.get(key)
+            if future is None:
+                future = self._loading[key] = Future()
+                self.stats.misses += 1
+                owner = True
+            else:
+                self.stats.waits += 1
+                owner = False
+        if not owner:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            pdb = parse(key, self._lazy, cache=self._cache, streams=self._streams)
+            info = pdb.info_stream
+            size = self._size_of(pdb)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+                self.stats.errors += 1
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[key]
+            self.stats.load_seconds += time.perf_counter() - start
+            self._entries[key] = _Entry(key, pdb, size, signature)
+            self._size += size
+            self._paths[(info.guid, info.age)] = key
+            self._evict()
+        future.set_result(pdb)
+        return pdb
+
+    def find_path(self, guid: Union[UUID, str], age: int, name: Optional[str] = None) -> Optional[str]:
+        """Find the path of a PDB by GUID and age.
+
+        PDBs that have been loaded or added with add_paths are found by GUID and age alone.
+        Otherwise the search paths are searched if the file name is given.
+        Returns None if the PDB was not found.
+        """
+        if not isinstance(guid, UUID):
+            guid = UUID(guid)
+        with self._lock:
+            path = self._paths.get((guid, age))
+        if path is not None:
+            return path
+        if name is not None:
+            for directory in self.search_paths:
+                path = os.path.join(directory, name, f"{guid.hex.upper()}{age:X}", name)
+                if os.path.isfile(path):
+                    return self._key(path)
+        return None
+
+    def get_by_id(self, guid: Union[UUID, str], age: int, name: Optional[str] = None) -> PDB7:
+        """Get a PDB by GUID and age. Raises KeyError if it cannot be found. See find_path."""
+        path = self.find_path(guid, age, name)
+        if path is None:
+            raise KeyError(f"No PDB found for {guid} {age}")
+        pdb = self.get(path)
+        info = pdb.info_stream
+        if not isinstance(guid, UUID):
+            guid = UUID(guid)
+        if (info.guid, info.age) != (guid, age):
+            raise KeyError(f"{path} does not match {guid} {age}")
+        return pdb
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _evict(self):
+        while self._size > self.max_size and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
+
+    def remove(self, path: Union[str, os.PathLike]) -> bool:
+        """Remove a PDB from the cache. Returns False if it was not loaded."""
+        key = self._key(path)
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def refresh_sizes(self):
+        """Estimate the size of each PDB again and evict PDBs if the total is too large.
+
+        Streams and indexes that are parsed when first accessed are not counted until this is called.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        sizes = [self._size_of(entry.pdb) for entry in entries]
+        with self._lock:
+            for entry, size in zip(entries, sizes):
+                if self._entries.get(entry.path) is entry:
+                    self._size += size - entry.size
+                    entry.size = size
+            self._evict()
+
+    def clear(self):
+        """Remove all PDBs from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def paths(self) -> List[str]:
+        """The paths of the loaded PDBs from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self._entries)} PDBs, {self._size} of {self.max_size} bytes)"
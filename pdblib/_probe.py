@@ -0,0 +1,124 @@
+from typing import BinaryIO, Sequence, List, Iterable, Union
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from struct import Struct
+from uuid import UUID
+import os
+
+from ._msf import PDB7Header, SuperBlockStruct, SuperBlock
+from ._stream.dbi import DBIHeaderStruct, DBIHeader, DBIModuleInfoStruct
+
+# Only the start of the info stream is needed.
+InfoHeaderStruct = Struct("<III16s")
+U32Struct = Struct("<I")
+InfoStreamIndex = 1
+DBIStreamIndex = 3
+
+
+@dataclass
+class ProbeResult:
+    """The identifying information of a PDB file."""
+    guid: UUID
+    age: int
+    timestamp: int
+    machine: int
+    module_count: int
+
+
+def read_stream_range(f: BinaryIO, block_size: int, blocks: Sequence[int], offset: int, size: int) -> bytes:
+    """Read a range of a stream from a file. Consecutive blocks are read in one call."""
+    chunks = []
+    end = offset + size
+    while offset < end:
+        block = offset // block_size
+        block_offset = offset % block_size
+        run_end = block + 1
+        while run_end < len(blocks) and run_end * block_size < end and blocks[run_end] == blocks[run_end - 1] + 1:
+            run_end += 1
+        if block >= len(blocks):
+            raise ValueError("Read past the end of the stream.")
+        read_size = min(end, run_end * block_size) - offset
+        f.seek(blocks[block] * block_size + block_offset)
+        data = f.read(read_size)
+        if len(data) != read_size:
+            raise ValueError("The file is truncated.")
+        chunks.append(data)
+        offset += read_size
+    return b"".join(chunks)
+
+
+def probe_file(f: BinaryIO) -> ProbeResult:
+    """Read the identifying information of a PDB file without reading the module or symbol streams."""
+    f.seek(0)
+    data = f.read(len(PDB7Header) + SuperBlockStruct.size)
+    if data[:len(PDB7Header)] != PDB7Header:
+        raise ValueError("Header is incorrect")
+    header = SuperBlock(*SuperBlockStruct.unpack_from(data, len(PDB7Header)))
+    block_size = header.BlockSize
+
+    # The block map lists the blocks of the stream directory.
+    directory_block_count = ceil(header.NumDirectoryBytes / block_size)
+    f.seek(header.BlockMapAddr * block_size)
+    directory_blocks = Struct(f"<{directory_block_count}I").unpack(f.read(4 * directory_block_count))
+
+    def read_directory(offset: int, size: int) -> bytes:
+        return read_stream_range(f, block_size, directory_blocks, offset, size)
+
+    stream_count = U32Struct.unpack(read_directory(0, 4))[0]
+    if stream_count <= DBIStreamIndex:
+        raise ValueError("The PDB does not have a DBI stream.")
+    stream_sizes = Struct(f"<{DBIStreamIndex + 1}i").unpack(read_directory(4, 4 * (DBIStreamIndex + 1)))
+    block_counts = [ceil(max(stream_size, 0) / block_size) for stream_size in stream_sizes]
+
+    def stream_blocks(stream_index: int) -> Sequence[int]:
+        offset = 4 + 4 * stream_count + 4 * sum(block_counts[:stream_index])
+        count = block_counts[stream_index]
+        return Struct(f"<{count}I").unpack(read_directory(offset, 4 * count))
+
+    info_blocks = stream_blocks(InfoStreamIndex)
+    _, timestamp, age, guid = InfoHeaderStruct.unpack(
+        read_stream_range(f, block_size, info_blocks, 0, InfoHeaderStruct.size)
+    )
+
+    dbi_blocks = stream_blocks(DBIStreamIndex)
+    dbi_header = DBIHeader(*DBIHeaderStruct.unpack(read_stream_range(f, block_size, dbi_blocks, 0, DBIHeaderStruct.size)))
+    # Module info records have a variable length so the substream must be walked to count them.
+    module_infos = read_stream_range(f, block_size, dbi_blocks, DBIHeaderStruct.size, dbi_header.ModInfoSize)
+    module_count = 0
+    offset = 0
+    while offset < len(module_infos):
+        offset += DBIModuleInfoStruct.size
+        offset = module_infos.index(b"\0", offset) + 1  # ModuleName
+        offset = module_infos.index(b"\0", offset) + 1  # ObjFileName
+        offset += -offset % 4
+        module_count += 1
+
+    return ProbeResult(UUID(bytes_le=guid), age, timestamp, dbi_header.Machine, module_count)
+
+
+def probe(path: Union[str, os.PathLike]) -> ProbeResult:
+    """Read the GUID, age, timestamp, machine and module count of a PDB file.
+
+    Only the superblock, the stream directory entries of the info and DBI streams,
+    the info stream header and the DBI header and module info substream are read.
+    """
+    with open(path, "rb") as f:
+        return probe_file(f)
+
+
+def _probe_or_error(path: Union[str, os.PathLike]) -> Union[ProbeResult, Exception]:
+    try:
+        return probe(path)
+    except Exception as e:
+        return e
+
+
+def probe_many(paths: Iterable[Union[str, os.PathLike]], workers: int = 8) -> List[Union[ProbeResult, Exception]]:
+    """Probe many PDB files in a thread pool so that the reads overlap.
+
+    A file that cannot be read or is not a PDB does not stop the others from being probed.
+    The result of each path is its ProbeResult or the exception raised while probing it.
+    """
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(_probe_or_error, paths))
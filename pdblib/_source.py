@@ -0,0 +1,150 @@
+from typing import Callable, Dict, List, Sequence, Tuple, Union, Iterable
+from collections import OrderedDict
+from threading import Lock
+import os
+
+ReadRange = Callable[[int, int], bytes]
+DefaultBlockCacheSize = 64 << 20
+
+
+def coalesce_blocks(blocks: Iterable[int]) -> List[Tuple[int, int]]:
+    """Merge block indexes into (first block, block count) runs of consecutive blocks in ascending order."""
+    runs = []
+    for block in sorted(set(blocks)):
+        if runs and runs[-1][0] + runs[-1][1] == block:
+            runs[-1][1] += 1
+        else:
+            runs.append([block, 1])
+    return [(first, count) for first, count in runs]
+
+
+class BlockSource:
+    """Read the blocks of a multi-stream file through a range read function.
+
+    read_range(offset, size) must return size bytes starting at offset.
+    It may read from a local file, an HTTP server supporting range requests or an object store.
+    The blocks of a read that are not cached are merged into runs of consecutive blocks
+    and each run is fetched with one call.
+    The most recently used blocks are cached until the cache holds more than cache_size bytes.
+    It may be shared between threads. Blocks are fetched outside the lock so reads of different blocks overlap.
+    """
+
+    def __init__(self, read_range: ReadRange, cache_size: int = DefaultBlockCacheSize):
+        self._read_range = read_range
+        self.cache_size = cache_size
+        # Set when the superblock is read.
+        self.block_size = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cached_size = 0
+        self._lock = Lock()
+        self.requests = 0
+        self.bytes_read = 0
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read a range of the file without using the block cache."""
+        data = bytes(self._read_range(offset, size))
+        with self._lock:
+            self.requests += 1
+            self.bytes_read += len(data)
+        if len(data) != size:
+            raise ValueError(f"Expected {size} bytes at offset {offset} but got {len(data)}. The source is truncated.")
+        return data
+
+    def _fetch(self, blocks: Iterable[int]) -> Dict[int, bytes]:
+        """Read blocks from the source in as few calls as possible."""
+        block_size = self.block_size
+        fetched = {}
+        for first, count in coalesce_blocks(blocks):
+            data = self.read(first * block_size, count * block_size)
+            for index in range(count):
+                fetched[first + index] = data[index * block_size:(index + 1) * block_size]
+        return fetched
+
+    def _insert(self, block: int, data: bytes):
+        """Add a block to the cache and evict the least recently used blocks. The lock must be held."""
+        if block in self._blocks:
+            self._cached_size -= len(self._blocks[block])
+        self._blocks[block] = data
+        self._cached_size += len(data)
+        while self._cached_size > self.cache_size and self._blocks:
+            _, evicted = self._blocks.popitem(last=False)
+            self._cached_size -= len(evicted)
+
+    def read_blocks(self, blocks: Sequence[int], size: int) -> bytes:
+        """Read the first size bytes of the concatenation of blocks."""
+        if not self.block_size:
+            raise RuntimeError("The block size is not known until the superblock is read.")
+        block_count = min(len(blocks), -(-size // self.block_size))
+        blocks = blocks[:block_count]
+        cache = self._blocks
+        with self._lock:
+            # Take the cached blocks now because another thread may evict them before the fetch returns.
+            cached = {}
+            for block in blocks:
+                data = cache.get(block)
+                if data is not None:
+                    cached[block] = data
+                    cache.move_to_end(block)
+            missing = [block for block in blocks if block not in cached]
+            self.misses += len(missing)
+            self.hits += len(blocks) - len(missing)
+        fetched = self._fetch(missing)
+        with self._lock:
+            for block, data in fetched.items():
+                self._insert(block, data)
+        cached.update(fetched)
+        return b"".join([cached[block] for block in blocks])[:size]
+
+    def prefetch(self, blocks: Iterable[int]):
+        """Read blocks into the cache ahead of use so that neighbouring streams are fetched together.
+
+        Nothing is read if the blocks do not fit in the cache.
+        """
+        with self._lock:
+            missing = {block for block in blocks if block not in self._blocks}
+            if not missing or len(missing) * self.block_size > self.cache_size - self._cached_size:
+                return
+            self.misses += len(missing)
+        fetched = self._fetch(missing)
+        with self._lock:
+            for block, data in fetched.items():
+                self._insert(block, data)
+
+    def clear(self):
+        """Empty the block cache."""
+        with self._lock:
+            self._blocks.clear()
+            self._cached_size = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(requests={self.requests}, bytes_read={self.bytes_read}, "
+            f"hits={self.hits}, misses={self.misses}, cached={self._cached_size})"
+        )
+
+
+class FileRangeReader:
+    """A read_range function backed by a local file.
+
+    This stands in for a remote source.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self._file = open(path, "rb")
+        self._lock = Lock()
+
+    def __call__(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
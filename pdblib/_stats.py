@@ -0,0 +1,119 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from time import perf_counter
+
+
+@dataclass
+class PhaseStats:
+    """The time spent and the data processed in one phase of loading a PDB."""
+    phase: str
+    stream_index: Optional[int] = None  # None if the phase is not specific to one stream
+    seconds: float = 0.0
+    size: int = 0           # The number of bytes processed
+    records: int = 0        # The number of records, types or entries decoded
+    calls: int = 1
+
+
+class _Timer:
+    """Measure the time of a with block. size and records can be set in the block."""
+
+    __slots__ = ("_stats", "_phase", "_stream_index", "_start", "size", "records")
+
+    def __init__(self, stats: "ParseStats", phase: str, stream_index: Optional[int], size: int):
+        self._stats = stats
+        self._phase = phase
+        self._stream_index = stream_index
+        self.size = size
+        self.records = 0
+
+    def __enter__(self) -> "_Timer":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stats.add(self._phase, self._stream_index, perf_counter() - self._start, self.size, self.records)
+
+
+class _NullTimer:
+    """A timer that measures nothing. Used when stats are disabled.
+
+    It is shared so values set on it are ignored.
+    """
+
+    __slots__ = ()
+    size = 0
+    records = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NullTimer = _NullTimer()
+
+
+class ParseStats:
+    """Collect the time, bytes and record count of each phase and stream while a PDB is loaded.
+
+    Pass an instance to parse or PDB7.from_file. Streams parsed later when an attribute is first accessed are also recorded.
+    If a callback is given it is called with the PhaseStats of each measurement as it is made.
+    Nothing is measured when no instance is given.
+    """
+
+    def __init__(self, callback: Optional[Callable[[PhaseStats], None]] = None):
+        self.callback = callback
+        self.phases: Dict[Tuple[str, Optional[int]], PhaseStats] = {}
+
+    def add(self, phase: str, stream_index: Optional[int] = None, seconds: float = 0.0, size: int = 0, records: int = 0):
+        """Record a measurement. Measurements of the same phase and stream are summed."""
+        stats = self.phases.get((phase, stream_index))
+        if stats is None:
+            self.phases[(phase, stream_index)] = PhaseStats(phase, stream_index, seconds, size, records)
+        else:
+            stats.seconds += seconds
+            stats.size += size
+            stats.records += records
+            stats.calls += 1
+        if self.callback is not None:
+            self.callback(PhaseStats(phase, stream_index, seconds, size, records))
+
+    def time(self, phase: str, stream_index: Optional[int] = None, size: int = 0) -> _Timer:
+        """Measure the time of a with block."""
+        return _Timer(self, phase, stream_index, size)
+
+    def totals(self) -> List[PhaseStats]:
+        """Sum the measurements of each phase over all streams in the order the phases were first measured."""
+        totals: Dict[str, PhaseStats] = {}
+        for stats in self.phases.values():
+            total = totals.get(stats.phase)
+            if total is None:
+                totals[stats.phase] = PhaseStats(stats.phase, None, stats.seconds, stats.size, stats.records, stats.calls)
+            else:
+                total.seconds += stats.seconds
+                total.size += stats.size
+                total.records += stats.records
+                total.calls += stats.calls
+        return list(totals.values())
+
+    def report(self, per_stream: bool = False) -> str:
+        """Format the measurements as a table.
+
+        :param per_stream: If True there is one row per phase and stream. Otherwise there is one row per phase.
+        """
+        rows = list(self.phases.values()) if per_stream else self.totals()
+        lines = [f"{'phase':<16} {'stream':>6} {'calls':>6} {'seconds':>10} {'bytes':>12} {'MB/s':>9} {'records':>10}"]
+        for stats in rows:
+            stream = "" if stats.stream_index is None else str(stats.stream_index)
+            throughput = f"{stats.size / stats.seconds / 1e6:.1f}" if stats.seconds and stats.size else ""
+            lines.append(
+                f"{stats.phase:<16} {stream:>6} {stats.calls:>6} {stats.seconds:>10.4f} "
+                f"{stats.size:>12} {throughput:>9} {stats.records:>10}"
+            )
+        total_seconds = sum(stats.seconds for stats in rows)
+        lines.append(f"{'total':<16} {'':>6} {'':>6} {total_seconds:>10.4f}")
+        return "\n".join(lines)
@@ -1,6 +1,9 @@
 from .base import BaseStream
 from .unknown import UnknownStream
-from .dbi import DBIStream
+from .dbi import DBIStream, SectionContributionTable, SectionMapTable
 from .info import PDBInfoStream
-from .module import ModuleStream
+from .module import ModuleStream, SymbolTable
 from .tpi import TPIIPIStream
+from .gsi import GlobalSymbolStream, PublicSymbolStream
+from .section import SectionHeaderStream
+from .names import StringTableStream
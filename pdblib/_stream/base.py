@@ -1,7 +1,9 @@
 from typing import Optional
 from dataclasses import dataclass
 
+from pdblib._msf import MSFStream
+
 
 @dataclass
 class BaseStream:
-    stream: Optional[bytes] = None
+    stream: Optional[MSFStream] = None
@@ -1,11 +1,17 @@
-from io import BytesIO
-from math import ceil
-from typing import Optional, List, Tuple
+from __future__ import annotations
+
+from typing import Optional, List, Tuple, Union, Sequence, Iterator, TypeVar, Type
 from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+import logging
 
-from pdblib._struct import Struct, read_str
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader, unpack_columns
 from .base import BaseStream
 
+log = logging.getLogger(__name__)
+
 
 DBIHeaderStruct = Struct("<iIIHHHHHHiiiiiIiiHHI")
 DBIModuleInfoStruct = Struct("<Ih2xiiIh2xIIHhIIIH2xIII")
@@ -13,6 +19,7 @@ SectionContribEntryStruct = Struct("<H2xiiIH2xII")
 SectionMapHeaderStruct = Struct("<HH")
 SectionMapEntryStruct = Struct("<HHHHHHII")
 FileInfoHeaderStruct = Struct("<HH")
+OptionalDbgHeaderFieldCount = 11
 
 
 @dataclass
@@ -91,6 +98,124 @@ class SectionMapEntry:
     SectionLength: int
 
 
+T = TypeVar("T")
+
+
+class ColumnTable(Sequence[T]):
+    """A table of fixed size records stored as one array per field.
+
+    Entry objects are only created when a record is accessed and are not kept.
+    Subclasses define the entry type and the name, typecode and offset of each field.
+    """
+
+    __slots__ = ()
+    Entry: Type[T]
+    RecordSize: int
+    Fields: Tuple[Tuple[str, str, int], ...]  # The column attribute name, array typecode and byte offset of each field
+
+    def __init__(self, *columns: array):
+        for (name, _, _), column in zip(self.Fields, columns):
+            setattr(self, name, column)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        if len(data) % cls.RecordSize:
+            log.info(f"{cls.__name__} has {len(data) % cls.RecordSize} trailing bytes")
+        return cls(*unpack_columns(data, cls.RecordSize, [(typecode, offset) for _, typecode, offset in cls.Fields]))
+
+    def columns(self) -> List[array]:
+        return [getattr(self, name) for name, _, _ in self.Fields]
+
+    def __len__(self) -> int:
+        return len(getattr(self, self.Fields[0][0]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(*(column[index] for column in self.columns()))
+        return self.Entry(*(column[index] for column in self.columns()))
+
+    def __iter__(self) -> Iterator[T]:
+        entry = self.Entry
+        for values in zip(*self.columns()):
+            yield entry(*values)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={len(self)})"
+
+
+class SectionContributionTable(ColumnTable[SectionContribEntry]):
+    """The section contributions of the DBI stream stored as one array per field."""
+
+    __slots__ = ("sections", "offsets", "sizes", "characteristics", "module_indexes", "data_crcs", "reloc_crcs", "_sorted")
+    Entry = SectionContribEntry
+    RecordSize = SectionContribEntryStruct.size
+    Fields = (
+        ("sections", "H", 0),
+        ("offsets", "i", 4),
+        ("sizes", "i", 8),
+        ("characteristics", "I", 12),
+        ("module_indexes", "H", 16),
+        ("data_crcs", "I", 20),
+        ("reloc_crcs", "I", 24),
+    )
+    sections: array
+    offsets: array
+    sizes: array
+    characteristics: array
+    module_indexes: array
+    data_crcs: array
+    reloc_crcs: array
+
+    def __init__(self, *columns: array):
+        super().__init__(*columns)
+        self._sorted: Optional[Tuple[array, array]] = None
+
+    def _sort(self) -> Tuple[array, array]:
+        """Get the start of each contribution as section << 32 | offset in ascending order and the index of each."""
+        if self._sorted is None:
+            starts = [section << 32 | offset & 0xFFFFFFFF for section, offset in zip(self.sections, self.offsets)]
+            order = sorted(range(len(starts)), key=starts.__getitem__)
+            self._sorted = (array("Q", [starts[index] for index in order]), array("I", order))
+        return self._sorted
+
+    def find(self, section: int, offset: int) -> int:
+        """Get the index of the contribution containing a section and offset. -1 if no contribution contains it."""
+        starts, order = self._sort()
+        position = bisect_right(starts, section << 32 | offset) - 1
+        if position < 0:
+            return -1
+        index = order[position]
+        if self.sections[index] != section or offset >= (self.offsets[index] & 0xFFFFFFFF) + self.sizes[index]:
+            return -1
+        return index
+
+
+class SectionMapTable(ColumnTable[SectionMapEntry]):
+    """The section map entries of the DBI stream stored as one array per field."""
+
+    __slots__ = ("flags", "ovls", "groups", "frames", "section_names", "class_names", "offsets", "section_lengths")
+    Entry = SectionMapEntry
+    RecordSize = SectionMapEntryStruct.size
+    Fields = (
+        ("flags", "H", 0),
+        ("ovls", "H", 2),
+        ("groups", "H", 4),
+        ("frames", "H", 6),
+        ("section_names", "H", 8),
+        ("class_names", "H", 10),
+        ("offsets", "I", 12),
+        ("section_lengths", "I", 16),
+    )
+    flags: array
+    ovls: array
+    groups: array
+    frames: array
+    section_names: array
+    class_names: array
+    offsets: array
+    section_lengths: array
+
+
 @dataclass
 class FileInfo:
     NumModules: int
@@ -101,74 +226,108 @@ class FileInfo:
     NamesBuffer: Tuple[bytes]
 
 
+@dataclass
+class OptionalDbgHeader:
+    """Stream indexes of the optional debug streams. -1 if the stream is not present."""
+    FPO: int = -1
+    Exception: int = -1
+    Fixup: int = -1
+    OmapToSrc: int = -1
+    OmapFromSrc: int = -1
+    SectionHdr: int = -1
+    TokenRidMap: int = -1
+    Xdata: int = -1
+    Pdata: int = -1
+    NewFPO: int = -1
+    SectionHdrOrig: int = -1
+
+
 @dataclass
 class DBIStream(BaseStream):
     header: Optional[DBIHeader] = None
     modules: List[DBIModuleInfo] = field(default_factory=list)
-    section_contributions: List[SectionContribEntry] = field(default_factory=list)
+    section_contributions: SectionContributionTable = field(default_factory=lambda: SectionContributionTable.from_bytes(b""))
     section_map_header: Optional[SectionMapHeader] = None
-    section_maps: List[SectionMapEntry] = field(default_factory=list)
+    section_maps: SectionMapTable = field(default_factory=lambda: SectionMapTable.from_bytes(b""))
     file_info: Optional[FileInfo] = None
+    optional_dbg_header: Optional[OptionalDbgHeader] = None
 
     @classmethod
-    def from_bytes(cls, buffer: bytes):
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
         self = cls(buffer)
-        dbi = BytesIO(buffer)
-        self.header = DBIHeader(*DBIHeaderStruct.read(dbi))
+        dbi = Reader(buffer)
+        self.header = DBIHeader(*dbi.unpack(DBIHeaderStruct))
         if self.header.VersionSignature != -1:
             raise NotImplementedError
         if self.header.VersionHeader != 19990903:
             raise NotImplementedError
 
         # https://llvm.org/docs/PDB/DbiStream.html#module-info-substream
-        dbi_section = BytesIO(dbi.read(self.header.ModInfoSize))
-        while dbi_section.tell() < self.header.ModInfoSize:
+        dbi_section = dbi.read_reader(self.header.ModInfoSize)
+        while dbi_section.remaining:
             self.modules.append(
                 DBIModuleInfo(
-                    *DBIModuleInfoStruct.read(dbi_section),
-                    read_str(dbi_section),
-                    read_str(dbi_section),
+                    *dbi_section.unpack(DBIModuleInfoStruct),
+                    dbi_section.read_str(),
+                    dbi_section.read_str(),
                 )
             )
-            dbi_section.seek(ceil(dbi_section.tell() / 4) * 4)  # Not sure if this should be before or after
+            dbi_section.align(4)  # Not sure if this should be before or after
 
         # https://llvm.org/docs/PDB/DbiStream.html#section-contribution-substream
-        dbi_section = BytesIO(dbi.read(self.header.SectionContributionSize))
-        if Struct("<I").read(dbi_section)[0] != 4046371373:
+        dbi_section = dbi.read_reader(self.header.SectionContributionSize)
+        if dbi_section.unpack(Struct("<I"))[0] != 4046371373:
             raise NotImplementedError
-        while dbi_section.tell() < self.header.SectionContributionSize:
-            self.section_contributions.append(
-                SectionContribEntry(
-                    *SectionContribEntryStruct.read(dbi_section)
-                )
-            )
+        self.section_contributions = SectionContributionTable.from_bytes(dbi_section.read_bytes(dbi_section.remaining))
 
         # https://llvm.org/docs/PDB/DbiStream.html#section-map-substream
-        dbi_section = BytesIO(dbi.read(self.header.SectionMapSize))
-        self.section_map_header = SectionMapHeader(*SectionMapHeaderStruct.read(dbi_section))
-        while dbi_section.tell() < self.header.SectionMapSize:
-            self.section_maps.append(
-                SectionMapEntry(
-                    *SectionMapEntryStruct.read(dbi_section)
-                )
-            )
+        dbi_section = dbi.read_reader(self.header.SectionMapSize)
+        self.section_map_header = SectionMapHeader(*dbi_section.unpack(SectionMapHeaderStruct))
+        self.section_maps = SectionMapTable.from_bytes(dbi_section.read_bytes(dbi_section.remaining))
 
         # https://llvm.org/docs/PDB/DbiStream.html#file-info-substream
-        dbi_section = BytesIO(dbi.read(self.header.SourceInfoSize))
-        NumModules, NumSourceFiles = FileInfoHeaderStruct.read(dbi_section)
+        dbi_section = dbi.read_reader(self.header.SourceInfoSize)
+        NumModules, NumSourceFiles = dbi_section.unpack(FileInfoHeaderStruct)
+        ModIndices = dbi_section.unpack(Struct(f"<{NumModules}H"))
+        ModFileCounts = dbi_section.unpack(Struct(f"<{NumModules}H"))
+        # NumSourceFiles is only 16 bits so it overflows on large programs.
+        # The real number of offsets is the sum of the per-module counts.
+        FileNameOffsets = dbi_section.unpack(Struct(f"<{sum(ModFileCounts)}I"))
+        NamesBuffer = []
+        while dbi_section.remaining:
+            if dbi_section.remaining < 4 and not any(dbi_section.peek(Struct(f"{dbi_section.remaining}s"))[0]):
+                break  # alignment padding
+            NamesBuffer.append(dbi_section.read_str())
         self.file_info = FileInfo(
             NumModules,
             NumSourceFiles,
-            Struct(f"<{NumModules}H").read(dbi_section),
-            Struct(f"<{NumModules}H").read(dbi_section),
-            Struct(f"<{NumSourceFiles}I").read(dbi_section),
-            tuple(read_str(dbi_section) for _ in range(NumSourceFiles))
+            ModIndices,
+            ModFileCounts,
+            FileNameOffsets,
+            tuple(NamesBuffer)
         )
-        if dbi_section.read():
-            raise RuntimeError
 
         # https://llvm.org/docs/PDB/DbiStream.html#dbi-type-server-map-substream
-        # https://llvm.org/docs/PDB/DbiStream.html#dbi-optional-dbg-stream
+        dbi.skip(self.header.TypeServerMapSize)
+
         # https://llvm.org/docs/PDB/DbiStream.html#dbi-ec-substream
+        dbi.skip(self.header.ECSubstreamSize)
+
+        # https://llvm.org/docs/PDB/DbiStream.html#dbi-optional-dbg-stream
+        dbg_stream_count = min(self.header.OptionalDbgHeaderSize // 2, OptionalDbgHeaderFieldCount)
+        self.optional_dbg_header = OptionalDbgHeader(
+            *dbi.unpack(Struct(f"<{dbg_stream_count}h"))
+        )
 
         return self
+
+    def module_for_address(self, section: int, offset: int) -> Optional[int]:
+        """Get the index of the module that contributed the code or data at a section and offset.
+
+        Returns None if no section contribution contains the address.
+        """
+        index = self.section_contributions.find(section, offset)
+        if index == -1:
+            return None
+        return self.section_contributions.module_indexes[index]
@@ -0,0 +1,121 @@
+from typing import Optional, Union, Iterator
+from dataclasses import dataclass
+from array import array
+
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader, unpack_array, unpack_columns
+from pdblib._hash import hash_string_v1
+from .base import BaseStream
+
+# https://llvm.org/docs/PDB/GlobalStream.html
+# https://github.com/microsoft/microsoft-pdb/blob/master/PDB/dbi/gsi.h
+
+GSIHashHeaderStruct = Struct("<IIII")
+PSGSIHeaderStruct = Struct("<IIIIHHII")
+IPHR_HASH = 4096
+HashRecordSize = 8
+HROffsetCalcSize = 12
+BitmapWordCount = (IPHR_HASH + 32) // 32
+SectionMapEntrySize = 8
+
+
+@dataclass
+class GSIHashHeader:
+    VerSignature: int
+    VerHdr: int
+    HrSize: int
+    NumBuckets: int
+
+
+@dataclass
+class GSIHashTable:
+    """The on-disk hash table mapping a symbol name to its offsets in the symbol record stream."""
+    header: GSIHashHeader
+    record_offsets: array  # The offset + 1 in the symbol record stream of each hash record.
+    bucket_starts: array  # The first hash record index of each bucket. Bucket n ends where bucket n + 1 starts.
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        header = GSIHashHeader(*reader.unpack(GSIHashHeaderStruct))
+        if header.VerSignature != 0xFFFFFFFF or header.VerHdr != 0xEFFE0000 + 19990810:
+            raise NotImplementedError("Only the V70 symbol hash table is supported.")
+        if header.HrSize % HashRecordSize:
+            raise ValueError("Hash record size is not a multiple of the record size.")
+
+        # Each hash record is the offset + 1 of the symbol and a reference count.
+        record_offsets = unpack_array("I", reader.read_bytes(header.HrSize))[::2]
+
+        bucket_starts = array("I", bytes(4 * (IPHR_HASH + 1)))
+        if not header.NumBuckets:
+            return cls(header, record_offsets, bucket_starts)
+
+        # A bitmap of the non-empty buckets followed by the start of each non-empty bucket.
+        bitmap = reader.unpack(Struct(f"<{BitmapWordCount}I"))
+        bucket_count = (header.NumBuckets - 4 * BitmapWordCount) // 4
+        buckets = reader.unpack(Struct(f"<{bucket_count}I"))
+        bucket_starts[IPHR_HASH] = len(record_offsets)
+        bucket_index = bucket_count
+        for bucket in reversed(range(IPHR_HASH)):
+            if bitmap[bucket // 32] & (1 << (bucket % 32)):
+                bucket_index -= 1
+                bucket_starts[bucket] = buckets[bucket_index] // HROffsetCalcSize
+            else:
+                bucket_starts[bucket] = bucket_starts[bucket + 1]
+
+        return cls(header, record_offsets, bucket_starts)
+
+    def find_offsets(self, name: bytes) -> Iterator[int]:
+        """Get the symbol record offsets of all symbols that hash to the same bucket as name."""
+        bucket = hash_string_v1(name) % IPHR_HASH
+        for offset in self.record_offsets[self.bucket_starts[bucket]:self.bucket_starts[bucket + 1]]:
+            yield offset - 1
+
+
+@dataclass
+class GlobalSymbolStream(BaseStream):
+    hash_table: Optional[GSIHashTable] = None
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
+        self = cls(buffer)
+        self.hash_table = GSIHashTable.from_reader(Reader(buffer))
+        return self
+
+
+@dataclass
+class PSGSIHeader:
+    SymHash: int
+    AddrMap: int
+    NumThunks: int
+    SizeOfThunk: int
+    ISectThunkTable: int
+    Padding: int
+    OffThunkTable: int
+    NumSections: int
+
+
+@dataclass
+class PublicSymbolStream(BaseStream):
+    header: Optional[PSGSIHeader] = None
+    hash_table: Optional[GSIHashTable] = None
+    address_map: Optional[array] = None  # Symbol record offsets of the public symbols sorted by address.
+    thunk_map: Optional[array] = None  # The offset of each incremental linking thunk.
+    section_offsets: Optional[array] = None  # The offset of each section in the image.
+    section_indexes: Optional[array] = None  # The section number of each entry of section_offsets.
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
+        self = cls(buffer)
+        reader = Reader(buffer)
+        self.header = PSGSIHeader(*reader.unpack(PSGSIHeaderStruct))
+        self.hash_table = GSIHashTable.from_reader(reader.read_reader(self.header.SymHash))
+        self.address_map = unpack_array("I", reader.read_bytes(self.header.AddrMap))
+        self.thunk_map = unpack_array("I", reader.read_bytes(4 * self.header.NumThunks))
+        self.section_offsets, self.section_indexes = unpack_columns(
+            reader.read_bytes(SectionMapEntrySize * self.header.NumSections),
+            SectionMapEntrySize,
+            (("I", 0), ("H", 4)),
+        )
+        return self
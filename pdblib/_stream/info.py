@@ -1,24 +1,52 @@
-from io import BytesIO
-from dataclasses import dataclass
+from typing import Union, Optional, Dict, List
+from dataclasses import dataclass, field
+from uuid import UUID
+import logging
 
-from pdblib._struct import Struct
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader
+from pdblib._hash import read_hash_table
 from .base import BaseStream
 
+log = logging.getLogger(__name__)
+
+InfoStreamHeaderStruct = Struct("<III16sI")
+U32Struct = Struct("<I")
+
 
 @dataclass
 class PDBInfoStream(BaseStream):
+    version: int = 0
+    timestamp: int = 0      # The time the PDB was written. Called Signature in the reference implementation.
+    age: int = 0            # Incremented each time the PDB is written.
+    guid: Optional[UUID] = None  # Matches the GUID in the debug directory of the executable.
+    named_streams: Dict[str, int] = field(default_factory=dict)  # Stream name to stream index.
+    features: List[int] = field(default_factory=list)
+
     @classmethod
-    def from_bytes(cls, buffer: bytes):
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
         self = cls(buffer)
         # https://llvm.org/docs/PDB/PdbStream.html
-        f = BytesIO(buffer)
-        version, timestamp, age, guid_lower, guid_upper, str_size = Struct("<IIIQQI").read(f)
-        guid = guid_lower + (guid_upper << 64)
-        if version != 20000404:
+        f = Reader(buffer)
+        self.version, self.timestamp, self.age, guid, str_size = f.unpack(InfoStreamHeaderStruct)
+        self.guid = UUID(bytes_le=guid)
+        if self.version != 20000404:
             raise NotImplementedError("Only VC70 is supported.")
-        str_data = f.read(str_size)
-        str_count = Struct("<I").read(f)
-        # TODO: hash table
-        # TODO: more here
+
+        # https://llvm.org/docs/PDB/PdbStream.html#named-stream-map
+        str_data = f.read_view(str_size)
+        for offset, stream_index in read_hash_table(f):
+            end = str_data.find(b"\0", offset)
+            if end == -1:
+                raise ValueError("Stream name is not terminated.")
+            self.named_streams[str_data.tobytes(offset, end).decode()] = stream_index
+        niMac = f.unpack(U32Struct)[0]
+        if niMac:
+            log.info("Named stream map has a non-zero niMac")
+
+        # https://llvm.org/docs/PDB/PdbStream.html#pdb-feature-codes
+        while f.remaining >= 4:
+            self.features.append(f.unpack(U32Struct)[0])
 
         return self
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Union, Dict, Optional
+from dataclasses import dataclass, field
+from array import array
+import logging
+
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader
+
+log = logging.getLogger(__name__)
+
+# https://llvm.org/docs/PDB/ModiStream.html#c13-line-information
+# https://github.com/microsoft/microsoft-pdb/blob/master/include/cvinfo.h
+
+SubsectionHeaderStruct = Struct("<II")
+LinesHeaderStruct = Struct("<IHHI")
+LineBlockHeaderStruct = Struct("<III")
+FileChecksumHeaderStruct = Struct("<IBB")
+
+DEBUG_S_IGNORE = 0x80000000
+DEBUG_S_LINES = 0xF2
+DEBUG_S_FILECHKSMS = 0xF4
+CV_LINES_HAVE_COLUMNS = 0x0001
+LineNumberMask = 0x00FFFFFF
+LineEntrySize = 8
+ColumnEntrySize = 4
+
+
+@dataclass
+class FileChecksum:
+    FileNameOffset: int     # Offset of the file name in the /names string table
+    ChecksumKind: int
+    Checksum: bytes
+
+
+@dataclass
+class C13LineTable:
+    """The line numbers of a module.
+
+    Each DEBUG_S_LINES subsection describes one contiguous range of code.
+    The line entries of all ranges are stored in parallel arrays.
+    The entries of range n are entry_starts[n] to entry_starts[n + 1].
+    """
+    checksums: Dict[int, FileChecksum] = field(default_factory=dict)  # Keyed by the offset in the checksum subsection
+    segments: array = field(default_factory=lambda: array("H"))   # The segment of each range
+    starts: array = field(default_factory=lambda: array("I"))     # The segment offset of each range
+    sizes: array = field(default_factory=lambda: array("I"))      # The code size of each range
+    entry_starts: array = field(default_factory=lambda: array("I", [0]))
+    offsets: array = field(default_factory=lambda: array("I"))    # The segment offset of each line entry
+    lines: array = field(default_factory=lambda: array("I"))      # The line number of each line entry
+    files: array = field(default_factory=lambda: array("I"))      # The checksum offset of the file of each line entry
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        self = cls()
+        reader = Reader(as_stream(buffer))
+        while reader.remaining >= SubsectionHeaderStruct.size:
+            kind, length = reader.unpack(SubsectionHeaderStruct)
+            subsection = reader.read_reader(length)
+            reader.align(4)
+            if kind & DEBUG_S_IGNORE:
+                continue
+            if kind == DEBUG_S_LINES:
+                self._read_lines(subsection)
+            elif kind == DEBUG_S_FILECHKSMS:
+                self._read_checksums(subsection)
+        return self
+
+    def _read_lines(self, reader: Reader):
+        offset, segment, flags, size = reader.unpack(LinesHeaderStruct)
+        self.segments.append(segment)
+        self.starts.append(offset)
+        self.sizes.append(size)
+        entry_size = LineEntrySize + (ColumnEntrySize if flags & CV_LINES_HAVE_COLUMNS else 0)
+        while reader.remaining >= LineBlockHeaderStruct.size:
+            file_id, line_count, block_size = reader.unpack(LineBlockHeaderStruct)
+            if block_size != LineBlockHeaderStruct.size + line_count * entry_size:
+                log.info("Line block size does not match the number of lines")
+            entries = reader.unpack(Struct(f"<{2 * line_count}I"))
+            self.offsets.extend(offset + entry_offset for entry_offset in entries[::2])
+            self.lines.extend(line_flags & LineNumberMask for line_flags in entries[1::2])
+            self.files.extend([file_id] * line_count)
+            if flags & CV_LINES_HAVE_COLUMNS:
+                reader.skip(line_count * ColumnEntrySize)
+        self.entry_starts.append(len(self.offsets))
+
+    def _read_checksums(self, reader: Reader):
+        while reader.remaining >= FileChecksumHeaderStruct.size:
+            checksum_offset = reader.pos
+            file_name_offset, checksum_size, checksum_kind = reader.unpack(FileChecksumHeaderStruct)
+            self.checksums[checksum_offset] = FileChecksum(
+                file_name_offset, checksum_kind, reader.read_bytes(checksum_size)
+            )
+            reader.align(4)
+
+    def file_name_offset(self, file_id: int) -> Optional[int]:
+        """Get the /names offset of the file name of a line entry file id."""
+        checksum = self.checksums.get(file_id)
+        return None if checksum is None else checksum.FileNameOffset
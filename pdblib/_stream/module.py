@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Tuple, Optional, List
-from io import BytesIO
+from typing import TYPE_CHECKING, Tuple, Optional, Union, Sequence, Iterator, Iterable, Container, Callable, Dict, Type
+from array import array
+from struct import error as StructError
+from collections import Counter
 import logging
 
-from pdblib._struct import Struct, read_str
+from pdblib._msf import MSFStream, Buffer, as_stream
+from pdblib._struct import Struct, Reader
 from .base import BaseStream
+from .lines import C13LineTable
+from .types import read_numeric
 
 if TYPE_CHECKING:
     from .dbi import DBIModuleInfo
@@ -21,9 +26,9 @@ Lazy = True
 @dataclass
 class ModiStream:
     Signature: int
-    Symbols: bytes
-    C11LineInfo: bytes
-    C13LineInfo: bytes
+    Symbols: MSFStream
+    C11LineInfo: MSFStream
+    C13LineInfo: MSFStream
     GlobalRefsSize: int
     GlobalRefs: Tuple[int]
 
@@ -79,6 +84,10 @@ class LocalProcedure(PROCSYM32):  # 0x110F
     pass
 
 
+class GlobalProcedure(PROCSYM32):  # 0x1110
+    pass
+
+
 REFSYM2Struct = Struct("<IIH")  # + Name
 
 @dataclass
@@ -89,36 +98,593 @@ class REFSYM2(CodeViewData):
     name: bytes     # hidden name made a first class member
 
 
+class ProcedureReference(REFSYM2):  # 0x1125
+    pass
+
+
+class DataReference(REFSYM2):  # 0x1126
+    pass
+
+
 class LocalProcedureReference(REFSYM2):  # 0x1127
     pass
 
 
-def parse_record(record_kind: int, record: bytes) -> CodeViewData:
-    record_stream = BytesIO(record)
-    if record_kind == 0x0006:
-        record_data = FarBASICString()
-    elif record_kind == 0x110E:
-        record_data = PublicSymbol(
-            *PUBSYM32Struct.read(record_stream),
-            read_str(record_stream),
-        )
-    elif record_kind == 0x110F:
-        record_data = LocalProcedure(
-            *PROCSYM32Struct.read(record_stream),
-            read_str(record_stream)
-        )
-    elif record_kind == 0x1127:
-        record_data = LocalProcedureReference(
-            *REFSYM2Struct.read(record_stream),
-            read_str(record_stream),
-        )
-    else:
-        log.info(f"Unknown record type {record_kind:04X}")
-        record_data = UnknownRecord()
+DATASYM32Struct = Struct("<IIH")  # + Name
+
+
+@dataclass
+class DATASYM32(CodeViewData):
+    typind: int     # Type index, or Metadata token if a managed symbol
+    off: int
+    seg: int
+    name: bytes     # Length-prefixed name
+
+
+class LocalData(DATASYM32):  # 0x110C
+    pass
+
+
+class GlobalData(DATASYM32):  # 0x110D
+    pass
+
+
+UDTSYMStruct = Struct("<I")  # + Name
+
+
+@dataclass
+class UDTSYM(CodeViewData):
+    typind: int     # Type index
+    name: bytes     # Length-prefixed name
+
+
+class UserDefinedType(UDTSYM):  # 0x1108
+    pass
+
+
+THUNKSYM32Struct = Struct("<IIIIHHB")  # + Name + Variant
+
+
+@dataclass
+class THUNKSYM32(CodeViewData):
+    pParent: int    # pointer to the parent
+    pEnd: int       # pointer to this blocks end
+    pNext: int      # pointer to next symbol
+    off: int
+    seg: int
+    len: int        # length of thunk
+    ord: int        # THUNK_ORDINAL specifying type of thunk
+    name: bytes
+
+
+class Thunk(THUNKSYM32):  # 0x1102
+    pass
+
+
+BLOCKSYM32Struct = Struct("<IIIIH")  # + Name
+
+
+@dataclass
+class BLOCKSYM32(CodeViewData):
+    pParent: int    # pointer to the parent
+    pEnd: int       # pointer to this blocks end
+    len: int        # Block length
+    off: int        # Offset in code segment
+    seg: int        # segment of label
+    name: bytes
+
+
+class Block(BLOCKSYM32):  # 0x1103
+    pass
+
+
+LABELSYM32Struct = Struct("<IHB")  # + Name
+
+
+@dataclass
+class LABELSYM32(CodeViewData):
+    off: int
+    seg: int
+    flags: int      # flags
+    name: bytes
+
+
+class Label(LABELSYM32):  # 0x1105
+    pass
+
+
+REGSYMStruct = Struct("<IH")  # + Name
+
+
+@dataclass
+class REGSYM(CodeViewData):
+    typind: int     # Type index or Metadata token
+    reg: int        # register enumerate
+    name: bytes
+
+
+class Register(REGSYM):  # 0x1106
+    pass
+
+
+CONSTSYMStruct = Struct("<I")  # + Value + Name
+
+
+@dataclass
+class CONSTSYM(CodeViewData):
+    typind: int     # Type index (containing enum if enumerate) or metadata token
+    value: int      # numeric leaf containing value
+    name: bytes
+
+
+class Constant(CONSTSYM):  # 0x1107
+    pass
+
+
+BPRELSYM32Struct = Struct("<iI")  # + Name
+
+
+@dataclass
+class BPRELSYM32(CodeViewData):
+    off: int        # BP-relative offset
+    typind: int     # Type index or Metadata token
+    name: bytes
+
+
+class BasePointerRelative(BPRELSYM32):  # 0x110B
+    pass
+
+
+REGREL32Struct = Struct("<IIH")  # + Name
+
+
+@dataclass
+class REGREL32(CodeViewData):
+    off: int        # offset of symbol
+    typind: int     # Type index or metadata token
+    reg: int        # register index for symbol
+    name: bytes
+
+
+class RegisterRelative(REGREL32):  # 0x1111
+    pass
+
+
+class LocalThreadStorage(DATASYM32):  # 0x1112
+    pass
+
+
+class GlobalThreadStorage(DATASYM32):  # 0x1113
+    pass
+
+
+FRAMEPROCSYMStruct = Struct("<IIIIIHI")
+
+
+@dataclass
+class FRAMEPROCSYM(CodeViewData):
+    cbFrame: int        # count of bytes of total frame of procedure
+    cbPad: int          # count of bytes of padding in the frame
+    offPad: int         # offset (relative to frame pointer) to where padding starts
+    cbSaveRegs: int     # count of bytes of callee save registers
+    offExHdlr: int      # offset of exception handler
+    sectExHdlr: int     # section id of exception handler
+    flags: int
+
+
+class FrameProcedure(FRAMEPROCSYM):  # 0x1012
+    pass
+
+
+OBJNAMESYMStruct = Struct("<I")  # + Name
+
+
+@dataclass
+class OBJNAMESYM(CodeViewData):
+    signature: int  # signature
+    name: bytes
+
+
+class ObjectName(OBJNAMESYM):  # 0x1101
+    pass
+
+
+COMPILESYM3Struct = Struct("<IHHHHHHHHH")  # + Version string
+
+
+@dataclass
+class COMPILESYM3(CodeViewData):
+    flags: int          # language and flags
+    machine: int        # target processor
+    verFEMajor: int     # front end major version #
+    verFEMinor: int     # front end minor version #
+    verFEBuild: int     # front end build version #
+    verFEQFE: int       # front end QFE version #
+    verMajor: int       # back end major version #
+    verMinor: int       # back end minor version #
+    verBuild: int       # back end build version #
+    verQFE: int         # back end QFE version #
+    name: bytes         # Zero terminated compiler version string
+
+
+class Compile3(COMPILESYM3):  # 0x113C
+    pass
+
+
+LOCALSYMStruct = Struct("<IH")  # + Name
+
+
+@dataclass
+class LOCALSYM(CodeViewData):
+    typind: int     # type index
+    flags: int      # local var flags
+    name: bytes
+
+
+class Local(LOCALSYM):  # 0x113E
+    pass
+
+
+DEFRANGESYMREGISTERStruct = Struct("<HHIHH")  # + Gaps
+
+
+@dataclass
+class DEFRANGESYMREGISTER(CodeViewData):
+    reg: int            # Register to hold the value of the symbol
+    attr: int           # Attribute of the register range
+    offStart: int       # Start of the range
+    isectStart: int     # Section of the start of the range
+    cbRange: int        # Length of the range
+    gaps: bytes         # The CV_LVAR_ADDR_GAP entries within the range
+
+
+class DefRangeRegister(DEFRANGESYMREGISTER):  # 0x1141
+    pass
+
+
+DEFRANGESYMFRAMEPOINTERRELStruct = Struct("<iIHH")  # + Gaps
+
+
+@dataclass
+class DEFRANGESYMFRAMEPOINTERREL(CodeViewData):
+    offFramePointer: int    # offset to frame pointer
+    offStart: int
+    isectStart: int
+    cbRange: int
+    gaps: bytes
+
+
+class DefRangeFramePointerRelative(DEFRANGESYMFRAMEPOINTERREL):  # 0x1142
+    pass
+
+
+DEFRANGESYMFRAMEPOINTERREL_FULL_SCOPEStruct = Struct("<i")
+
+
+@dataclass
+class DEFRANGESYMFRAMEPOINTERREL_FULL_SCOPE(CodeViewData):
+    offFramePointer: int    # offset to frame pointer
+
+
+class DefRangeFramePointerRelativeFullScope(DEFRANGESYMFRAMEPOINTERREL_FULL_SCOPE):  # 0x1144
+    pass
+
+
+DEFRANGESYMREGISTERRELStruct = Struct("<HHiIHH")  # + Gaps
+
+
+@dataclass
+class DEFRANGESYMREGISTERREL(CodeViewData):
+    baseReg: int            # Register to hold the base pointer of the symbol
+    flags: int              # Spilled member for s.i. and offset in parent
+    offBasePointer: int     # offset to register
+    offStart: int
+    isectStart: int
+    cbRange: int
+    gaps: bytes
+
+
+class DefRangeRegisterRelative(DEFRANGESYMREGISTERREL):  # 0x1145
+    pass
+
+
+BUILDINFOSYMStruct = Struct("<I")
+
+
+@dataclass
+class BUILDINFOSYM(CodeViewData):
+    id: int         # CV_ItemId of Build Info.
 
-    if not isinstance(record_data, UnknownRecord) and any(record_stream.read()):
-        log.info("More data in record")
-    return record_data
+
+class BuildInfo(BUILDINFOSYM):  # 0x114C
+    pass
+
+
+INLINESITESYMStruct = Struct("<III")  # + Annotations
+
+
+@dataclass
+class INLINESITESYM(CodeViewData):
+    pParent: int    # pointer to the inliner
+    pEnd: int       # pointer to this block's end
+    inlinee: int    # CV_ItemId of inlinee
+    annotations: bytes  # an array of compressed binary annotations.
+
+
+class InlineSite(INLINESITESYM):  # 0x114D
+    pass
+
+
+@dataclass
+class ENDSYM(CodeViewData):
+    pass
+
+
+class InlineSiteEnd(ENDSYM):  # 0x114E
+    pass
+
+
+class ProcedureIdEnd(ENDSYM):  # 0x114F
+    pass
+
+
+class LocalProcedureId(PROCSYM32):  # 0x1146
+    pass
+
+
+class GlobalProcedureId(PROCSYM32):  # 0x1147
+    pass
+
+
+UNAMESPACEStruct = Struct("")  # + Name
+
+
+@dataclass
+class UNAMESPACE(CodeViewData):
+    name: bytes     # name
+
+
+class UsingNamespace(UNAMESPACE):  # 0x1124
+    pass
+
+
+SECTIONSYMStruct = Struct("<HBBIII")  # + Name
+
+
+@dataclass
+class SECTIONSYM(CodeViewData):
+    isec: int       # Section number
+    align: int      # Alignment of this section (power of 2)
+    bReserved: int  # Reserved.  Must be zero.
+    rva: int
+    cb: int
+    characteristics: int
+    name: bytes     # name
+
+
+class Section(SECTIONSYM):  # 0x1136
+    pass
+
+
+COFFGROUPSYMStruct = Struct("<IIIH")  # + Name
+
+
+@dataclass
+class COFFGROUPSYM(CodeViewData):
+    cb: int
+    characteristics: int
+    off: int        # Symbol offset
+    seg: int        # Symbol segment
+    name: bytes     # name
+
+
+class CoffGroup(COFFGROUPSYM):  # 0x1137
+    pass
+
+
+EXPORTSYMStruct = Struct("<HH")  # + Name
+
+
+@dataclass
+class EXPORTSYM(CodeViewData):
+    ordinal: int
+    flags: int
+    name: bytes     # name of
+
+
+class Export(EXPORTSYM):  # 0x1138
+    pass
+
+
+CALLSITEINFOStruct = Struct("<IHHI")
+
+
+@dataclass
+class CALLSITEINFO(CodeViewData):
+    off: int        # offset of call site
+    sect: int       # section index of call site
+    reserved: int   # alignment padding field, must be zero
+    typind: int     # type index describing function signature
+
+
+class CallSiteInfo(CALLSITEINFO):  # 0x1139
+    pass
+
+
+FRAMECOOKIEStruct = Struct("<IHBB")
+
+
+@dataclass
+class FRAMECOOKIE(CodeViewData):
+    off: int        # Frame relative offset
+    reg: int        # Register index
+    cookietype: int # Type of the cookie
+    flags: int      # Flags describing this cookie
+
+
+class FrameCookie(FRAMECOOKIE):  # 0x113A
+    pass
+
+
+HEAPALLOCSITEStruct = Struct("<IHHI")
+
+
+@dataclass
+class HEAPALLOCSITE(CodeViewData):
+    off: int        # offset of call site
+    sect: int       # section index of call site
+    cbInstr: int    # length of heap allocation call instruction
+    typind: int     # type index describing function signature
+
+
+class HeapAllocationSite(HEAPALLOCSITE):  # 0x115E
+    pass
+
+
+TRAMPOLINESYMStruct = Struct("<HHIIHH")
+
+
+@dataclass
+class TRAMPOLINESYM(CodeViewData):
+    trampType: int  # trampoline sym subtype
+    cbThunk: int    # size of the thunk
+    offThunk: int   # offset of the thunk
+    offTarget: int  # offset of the target of the thunk
+    sectThunk: int  # section index of the thunk
+    sectTarget: int # section index of the target of the thunk
+
+
+class Trampoline(TRAMPOLINESYM):  # 0x112C
+    pass
+
+
+RecordHeaderStruct = Struct("<HH")
+SignatureStruct = Struct("<I")
+CV_SIGNATURE_C13 = 4
+
+# Decode a record from data[offset:end]. offset is the start of the record after the kind.
+RecordDecoder = Callable[[Buffer, int, int], CodeViewData]
+
+
+def _read_name(data: Buffer, start: int, end: int) -> bytes:
+    """Read a null terminated name. If there is no terminator the name extends to the end of the record."""
+    name_end = data.find(b"\0", start, end)
+    return data[start:end if name_end == -1 else name_end]
+
+
+def _empty_decoder(cls: Type[CodeViewData]) -> RecordDecoder:
+    def decode(data: Buffer, offset: int, end: int) -> CodeViewData:
+        return cls()
+    return decode
+
+
+def _fixed_decoder(cls: Type[CodeViewData], struct: Struct) -> RecordDecoder:
+    """Decode a record of fixed size fields."""
+    unpack_from = struct.unpack_from
+
+    def decode(data: Buffer, offset: int, end: int) -> CodeViewData:
+        return cls(*unpack_from(data, offset))
+    return decode
+
+
+def _named_decoder(cls: Type[CodeViewData], struct: Struct) -> RecordDecoder:
+    """Decode a record of fixed size fields followed by a null terminated name."""
+    unpack_from = struct.unpack_from
+    size = struct.size
+
+    def decode(data: Buffer, offset: int, end: int) -> CodeViewData:
+        return cls(*unpack_from(data, offset), _read_name(data, offset + size, end))
+    return decode
+
+
+def _trailing_decoder(cls: Type[CodeViewData], struct: Struct) -> RecordDecoder:
+    """Decode a record of fixed size fields followed by variable length data that is kept as bytes."""
+    unpack_from = struct.unpack_from
+    size = struct.size
+
+    def decode(data: Buffer, offset: int, end: int) -> CodeViewData:
+        return cls(*unpack_from(data, offset), data[offset + size:end])
+    return decode
+
+
+def _decode_constant(data: Buffer, offset: int, end: int) -> CodeViewData:
+    reader = Reader(data, offset)
+    typind = reader.unpack(CONSTSYMStruct)[0]
+    value = read_numeric(reader)
+    return Constant(typind, value, _read_name(data, reader.pos, end))
+
+
+RecordDecoders: Dict[int, RecordDecoder] = {
+    0x0006: _empty_decoder(FarBASICString),
+    0x1012: _fixed_decoder(FrameProcedure, FRAMEPROCSYMStruct),
+    0x1101: _named_decoder(ObjectName, OBJNAMESYMStruct),
+    0x1102: _named_decoder(Thunk, THUNKSYM32Struct),
+    0x1103: _named_decoder(Block, BLOCKSYM32Struct),
+    0x1105: _named_decoder(Label, LABELSYM32Struct),
+    0x1106: _named_decoder(Register, REGSYMStruct),
+    0x1107: _decode_constant,
+    0x1108: _named_decoder(UserDefinedType, UDTSYMStruct),
+    0x110B: _named_decoder(BasePointerRelative, BPRELSYM32Struct),
+    0x110C: _named_decoder(LocalData, DATASYM32Struct),
+    0x110D: _named_decoder(GlobalData, DATASYM32Struct),
+    0x110E: _named_decoder(PublicSymbol, PUBSYM32Struct),
+    0x110F: _named_decoder(LocalProcedure, PROCSYM32Struct),
+    0x1110: _named_decoder(GlobalProcedure, PROCSYM32Struct),
+    0x1111: _named_decoder(RegisterRelative, REGREL32Struct),
+    0x1112: _named_decoder(LocalThreadStorage, DATASYM32Struct),
+    0x1113: _named_decoder(GlobalThreadStorage, DATASYM32Struct),
+    0x1124: _named_decoder(UsingNamespace, UNAMESPACEStruct),
+    0x1125: _named_decoder(ProcedureReference, REFSYM2Struct),
+    0x1126: _named_decoder(DataReference, REFSYM2Struct),
+    0x1127: _named_decoder(LocalProcedureReference, REFSYM2Struct),
+    0x112C: _fixed_decoder(Trampoline, TRAMPOLINESYMStruct),
+    0x1136: _named_decoder(Section, SECTIONSYMStruct),
+    0x1137: _named_decoder(CoffGroup, COFFGROUPSYMStruct),
+    0x1138: _named_decoder(Export, EXPORTSYMStruct),
+    0x1139: _fixed_decoder(CallSiteInfo, CALLSITEINFOStruct),
+    0x113A: _fixed_decoder(FrameCookie, FRAMECOOKIEStruct),
+    0x113C: _named_decoder(Compile3, COMPILESYM3Struct),
+    0x113E: _named_decoder(Local, LOCALSYMStruct),
+    0x1141: _trailing_decoder(DefRangeRegister, DEFRANGESYMREGISTERStruct),
+    0x1142: _trailing_decoder(DefRangeFramePointerRelative, DEFRANGESYMFRAMEPOINTERRELStruct),
+    0x1144: _fixed_decoder(DefRangeFramePointerRelativeFullScope, DEFRANGESYMFRAMEPOINTERREL_FULL_SCOPEStruct),
+    0x1145: _trailing_decoder(DefRangeRegisterRelative, DEFRANGESYMREGISTERRELStruct),
+    0x1146: _named_decoder(LocalProcedureId, PROCSYM32Struct),
+    0x1147: _named_decoder(GlobalProcedureId, PROCSYM32Struct),
+    0x114C: _fixed_decoder(BuildInfo, BUILDINFOSYMStruct),
+    0x114D: _trailing_decoder(InlineSite, INLINESITESYMStruct),
+    0x114E: _empty_decoder(InlineSiteEnd),
+    0x114F: _empty_decoder(ProcedureIdEnd),
+    0x115E: _fixed_decoder(HeapAllocationSite, HEAPALLOCSITEStruct),
+}
+
+# The unknown kinds that have been logged. Each is logged once.
+_logged_kinds = set()
+
+
+def decode_record(record_kind: int, data: Buffer, offset: int = 0, end: Optional[int] = None) -> CodeViewData:
+    """Decode the data of a record in place.
+
+    :param record_kind: The RecordKind of the record.
+    :param data: A buffer containing the record.
+    :param offset: The offset in data of the record after the length and kind.
+    :param end: The offset in data of the end of the record. Defaults to the end of data.
+    """
+    decoder = RecordDecoders.get(record_kind)
+    if decoder is None:
+        if record_kind not in _logged_kinds:
+            _logged_kinds.add(record_kind)
+            log.info(f"Unknown record type {record_kind:04X}")
+        return UnknownRecord()
+    try:
+        return decoder(data, offset, len(data) if end is None else end)
+    except StructError:
+        log.info(f"Record {record_kind:04X} is truncated")
+        return UnknownRecord()
+    except NotImplementedError as e:
+        # Such as an S_CONSTANT whose value is a numeric leaf that read_numeric does not support.
+        log.info(f"Record {record_kind:04X} is not supported: {e}")
+        return UnknownRecord()
 
 
 @dataclass
@@ -130,47 +696,199 @@ class CodeView:
     @property
     def RecordData(self) -> CodeViewData:
         if self._record_data is None:
-            self._record_data = parse_record(self.RecordKind, self.Record)
+            self._record_data = decode_record(self.RecordKind, self.Record)
         return self._record_data
 
     @classmethod
-    def from_file(cls, stream: BytesIO):
+    def from_buffer(cls, buffer: MSFStream, offset: int):
+        """Read the record whose header is at offset in a symbol stream."""
         self = cls()
-        RecordLen, self.RecordKind = Struct("<HH").read(stream)
-        self.Record = stream.read(RecordLen-2)
+        RecordLen, self.RecordKind = buffer.unpack_from(RecordHeaderStruct, offset)
+        self.Record = buffer.tobytes(offset + 4, offset + 2 + RecordLen)
         if not Lazy:
             self.RecordData
         return self
 
+
+def record_headers(buffer: MSFStream) -> Iterator[Tuple[int, int, int]]:
+    """Walk the record headers of a symbol buffer without decoding the records.
+
+    :return: An iterator of the offset of each record header in the buffer, its RecordLen and its RecordKind.
+    """
+    data, base, unpack_from = buffer.unpacker(RecordHeaderStruct)
+    size = len(buffer)
+    end = size - RecordHeaderStruct.size
+    offset = 0
+    while offset <= end:
+        RecordLen, RecordKind = unpack_from(data, base + offset)
+        yield offset, RecordLen, RecordKind
+        offset += RecordLen + 2
+    if offset < size:
+        log.info("Incomplete record at the end of the symbol stream")
+
+
+def iter_records(buffer: Union[bytes, MSFStream], kinds: Optional[Container[int]] = None) -> Iterator[CodeView]:
+    """Decode the records of a symbol buffer one at a time without indexing the buffer first.
+
+    :param buffer: The symbol records.
+    :param kinds: If given only records of these kinds are returned. The other records are skipped without being copied.
+    """
+    buffer = as_stream(buffer)
+    if buffer.contiguous_range() is None:
+        # Copy a fragmented buffer once rather than once per record.
+        buffer = MSFStream.from_bytes(buffer.tobytes())
+    data, base = buffer.contiguous_range()
+    stop = base + len(buffer)
+    for offset, RecordLen, RecordKind in record_headers(buffer):
+        if kinds is None or RecordKind in kinds:
+            offset += base
+            yield CodeView(RecordKind, data[offset + 4:min(offset + 2 + RecordLen, stop)])
+
+
+def kind_histogram(buffer: Union[bytes, MSFStream]) -> Dict[int, int]:
+    """Count the records of each kind in a symbol buffer. Only the record headers are read."""
+    return dict(Counter(RecordKind for _, _, RecordKind in record_headers(as_stream(buffer))))
+
+
+class SymbolTable(Sequence[CodeView]):
+    """The records of a symbol stream.
+
+    The offset, length and kind of each record are stored in parallel arrays over the stream buffer.
+    CodeView objects are only created when a record is accessed and are not kept.
+    """
+
+    __slots__ = ("buffer", "offsets", "lengths", "kinds")
+
+    def __init__(self, buffer: MSFStream, offsets: array, lengths: array, kinds: array):
+        """
+        :param buffer: The symbol stream.
+        :param offsets: The offset of each record header in the buffer.
+        :param lengths: The RecordLen field of each record. This includes the kind but not the length field.
+        :param kinds: The RecordKind of each record.
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+        self.lengths = lengths
+        self.kinds = kinds
+
     @classmethod
-    def from_file_all(cls, stream: BytesIO):
-        stream_len = len(stream.getvalue())
-        items = []
-        while stream.tell() < stream_len:
-            items.append(cls.from_file(stream))
-        return items
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        """Index the records in a symbol stream without decoding them."""
+        buffer = as_stream(buffer)
+        offsets = array("I")
+        lengths = array("H")
+        kinds = array("H")
+        for offset, RecordLen, RecordKind in record_headers(buffer):
+            offsets.append(offset)
+            lengths.append(RecordLen)
+            kinds.append(RecordKind)
+        return cls(buffer, offsets, lengths, kinds)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def record(self, index: int) -> bytes:
+        """Get the data of a record excluding the length and kind."""
+        offset = self.offsets[index]
+        return self.buffer.tobytes(offset + 4, offset + 2 + self.lengths[index])
+
+    def record_data(self, index: int) -> CodeViewData:
+        """Decode a record in place without creating a CodeView."""
+        offset = self.offsets[index]
+        contiguous = self.buffer.contiguous_range()
+        if contiguous is None:
+            return decode_record(self.kinds[index], self.record(index))
+        data, base = contiguous
+        offset += base
+        return decode_record(self.kinds[index], data, offset + 4, offset + 2 + self.lengths[index])
+
+    def kind_histogram(self) -> Dict[int, int]:
+        """Count the records of each kind."""
+        return dict(Counter(self.kinds))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SymbolTable(self.buffer, self.offsets[index], self.lengths[index], self.kinds[index])
+        return CodeView(self.kinds[index], self.record(index))
+
+    def __iter__(self) -> Iterator[CodeView]:
+        contiguous = self.buffer.contiguous_range()
+        if contiguous is None:
+            tobytes = self.buffer.tobytes
+            for offset, length, kind in zip(self.offsets, self.lengths, self.kinds):
+                yield CodeView(kind, tobytes(offset + 4, offset + 2 + length))
+        else:
+            data, base = contiguous
+            for offset, length, kind in zip(self.offsets, self.lengths, self.kinds):
+                offset += base
+                yield CodeView(kind, data[offset + 4:offset + 2 + length])
+
+    def filter(self, kinds: Iterable[int]) -> SymbolTable:
+        """Get a table of the records with one of the given kinds without decoding any records."""
+        kinds = set(kinds)
+        indexes = [index for index, kind in enumerate(self.kinds) if kind in kinds]
+        return SymbolTable(
+            self.buffer,
+            array("I", [self.offsets[index] for index in indexes]),
+            array("H", [self.lengths[index] for index in indexes]),
+            array("H", [self.kinds[index] for index in indexes]),
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} records)"
 
 
 @dataclass
 class ModuleStream(BaseStream):
     module_info: Optional[DBIModuleInfo] = None
     modi_stream: Optional[ModiStream] = None
-    symbols: List[CodeView] = field(default_factory=list)
+    symbols: Optional[SymbolTable] = None
+    _line_table: Optional[C13LineTable] = field(default=None, repr=False)
+
+    @property
+    def line_table(self) -> C13LineTable:
+        """The C13 line information. Decoded on first access."""
+        if self._line_table is None:
+            self._line_table = C13LineTable.from_bytes(self.modi_stream.C13LineInfo)
+        return self._line_table
+
+    def iter_symbols(self, kinds: Optional[Iterable[int]] = None) -> Iterator[CodeView]:
+        """Decode the symbol records one at a time.
+
+        :param kinds: If given only records of these kinds are returned.
+        """
+        return iter_records(self.modi_stream.Symbols, None if kinds is None else frozenset(kinds))
+
+    def kind_histogram(self) -> Dict[int, int]:
+        """Count the symbol records of each kind."""
+        return self.symbols.kind_histogram()
 
     @classmethod
-    def from_bytes(cls, buffer: bytes, module_info: DBIModuleInfo):
+    def from_bytes(
+        cls,
+        buffer: Union[bytes, MSFStream],
+        module_info: DBIModuleInfo,
+        symbol_index: Optional[Tuple[array, array, array]] = None,
+    ):
+        """Parse a module stream.
+
+        :param buffer: The module stream.
+        :param module_info: The DBI module info of the stream.
+        :param symbol_index: The offsets, lengths and kinds of the symbol records if they have already been found.
+        """
+        buffer = as_stream(buffer)
         self = cls(buffer, module_info)
-        stream = BytesIO(buffer)
+        stream = Reader(buffer)
 
-        Signature = Struct("<I").read(stream)[0]
-        if Signature != 4:
+        Signature = stream.unpack(SignatureStruct)[0]
+        if Signature != CV_SIGNATURE_C13:
             raise NotImplementedError
-        Symbols = stream.read(module_info.SymByteSize-4)
-        C11LineInfo = stream.read(module_info.C11ByteSize)
-        C13LineInfo = stream.read(module_info.C13ByteSize)
-        GlobalRefsSize = Struct("<I").read(stream)[0]
+        Symbols = stream.read_view(module_info.SymByteSize-4)
+        C11LineInfo = stream.read_view(module_info.C11ByteSize)
+        C13LineInfo = stream.read_view(module_info.C13ByteSize)
+        GlobalRefsSize = stream.unpack(Struct("<I"))[0]
         GlobalRefsCount = GlobalRefsSize // 4
-        GlobalRefs = Struct(f"<{GlobalRefsCount}I").read(stream)
+        GlobalRefs = stream.unpack(Struct(f"<{GlobalRefsCount}I"))
 
         self.modi_stream = ModiStream(
             Signature,
@@ -181,9 +899,12 @@ class ModuleStream(BaseStream):
             GlobalRefs,
         )
 
-        if stream.read():
+        if stream.remaining:
             log.info("more data in stream")
 
-        self.symbols = CodeView.from_file_all(BytesIO(Symbols))
+        if symbol_index is None:
+            self.symbols = SymbolTable.from_bytes(Symbols)
+        else:
+            self.symbols = SymbolTable(Symbols, *symbol_index)
 
         return self
@@ -0,0 +1,72 @@
+from typing import Union, Optional, Dict
+from dataclasses import dataclass, field
+from array import array
+
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader, unpack_array
+from pdblib._hash import hash_string_v1, hash_string_v2
+from .base import BaseStream
+
+# https://llvm.org/docs/PDB/StringTable.html
+
+StringTableHeaderStruct = Struct("<III")
+StringTableSignature = 0xEFFEEFFE
+U32Struct = Struct("<I")
+
+
+@dataclass
+class StringTableStream(BaseStream):
+    """The /names string table.
+
+    Strings are referenced by their offset in the string buffer and are only decoded when they are accessed.
+    The hash table maps a string back to its offset.
+    """
+    HashVersion: int = 0
+    strings: Optional[MSFStream] = None
+    buckets: Optional[array] = None     # The string offset in each hash bucket. 0 if the bucket is empty.
+    NameCount: int = 0
+    _cache: Dict[int, bytes] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
+        self = cls(buffer)
+        reader = Reader(buffer)
+        signature, self.HashVersion, byte_size = reader.unpack(StringTableHeaderStruct)
+        if signature != StringTableSignature:
+            raise ValueError("String table signature is incorrect.")
+        if self.HashVersion not in (1, 2):
+            raise NotImplementedError(f"String table hash version {self.HashVersion} is not supported.")
+        self.strings = reader.read_view(byte_size)
+        bucket_count = reader.unpack(U32Struct)[0]
+        self.buckets = unpack_array("I", reader.read_bytes(4 * bucket_count))
+        self.NameCount = reader.unpack(U32Struct)[0]
+        return self
+
+    def string_at(self, offset: int) -> bytes:
+        """Get the null terminated string at an offset in the string buffer."""
+        string = self._cache.get(offset)
+        if string is None:
+            end = self.strings.find(b"\0", offset)
+            if end == -1:
+                raise ValueError(f"String at offset {offset} is not terminated.")
+            string = self._cache[offset] = self.strings.tobytes(offset, end)
+        return string
+
+    def find_offset(self, string: Union[str, bytes]) -> Optional[int]:
+        """Find the offset of a string using the hash table. Returns None if the string is not in the table."""
+        if isinstance(string, str):
+            string = string.encode()
+        buckets = self.buckets
+        if not buckets:
+            return None
+        hash_string = hash_string_v1 if self.HashVersion == 1 else hash_string_v2
+        start = hash_string(string) % len(buckets)
+        # Collisions are resolved by linear probing.
+        for index in range(len(buckets)):
+            offset = buckets[(start + index) % len(buckets)]
+            if offset == 0:
+                return None
+            if self.string_at(offset) == string:
+                return offset
+        return None
@@ -0,0 +1,37 @@
+from typing import List, Union
+from dataclasses import dataclass, field
+
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader
+from .base import BaseStream
+
+ImageSectionHeaderStruct = Struct("<8sIIIIIIHHI")
+
+
+@dataclass
+class ImageSectionHeader:
+    Name: bytes
+    VirtualSize: int
+    VirtualAddress: int
+    SizeOfRawData: int
+    PointerToRawData: int
+    PointerToRelocations: int
+    PointerToLinenumbers: int
+    NumberOfRelocations: int
+    NumberOfLinenumbers: int
+    Characteristics: int
+
+
+@dataclass
+class SectionHeaderStream(BaseStream):
+    """A copy of the section headers of the executable. Referenced from the DBI optional debug header."""
+    sections: List[ImageSectionHeader] = field(default_factory=list)
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        buffer = as_stream(buffer)
+        self = cls(buffer)
+        reader = Reader(buffer)
+        while reader.remaining >= ImageSectionHeaderStruct.size:
+            self.sections.append(ImageSectionHeader(*reader.unpack(ImageSectionHeaderStruct)))
+        return self
@@ -1,39 +1,277 @@
-from dataclasses import dataclass
+from typing import Union, Optional, Dict, Tuple, Iterator, Callable
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from array import array
+from bisect import bisect_right
 import logging
 
-from pdblib._struct import Struct
+from pdblib._msf import MSFStream, as_stream
+from pdblib._struct import Struct, Reader, unpack_array
+from pdblib._hash import hash_string_v1, read_hash_table
 from .base import BaseStream
+from .types import TypeLeaf, SimpleType, TagLeaf, parse_leaf
 
 log = logging.getLogger(__name__)
 
-TpiStreamHeader = Struct("<IIIIHHIIiIiIiI")
+# https://llvm.org/docs/PDB/TpiStream.html
+
+TpiStreamHeader = Struct("<IIIIIHHIIiIiIiI")
+TypeRecordHeaderStruct = Struct("<HH")
+HashValueStruct = Struct("<I")
+UnknownOffset = 0xFFFFFFFF
+TagLeafKinds = frozenset((0x1504, 0x1505, 0x1506, 0x1507, 0x1519))
+FoundTypeCacheSize = 256
+
+
+@dataclass
+class TPIHeader:
+    Version: int
+    HeaderSize: int
+    TypeIndexBegin: int
+    TypeIndexEnd: int
+    TypeRecordBytes: int
+    HashStreamIndex: int
+    HashAuxStreamIndex: int
+    HashKeySize: int
+    NumHashBuckets: int
+    HashValueBufferOffset: int
+    HashValueBufferLength: int
+    IndexOffsetBufferOffset: int
+    IndexOffsetBufferLength: int
+    HashAdjBufferOffset: int
+    HashAdjBufferLength: int
 
 
 @dataclass
 class TPIIPIStream(BaseStream):
+    """The type records of the TPI or IPI stream.
+
+    The offset of each type record is stored in an array indexed by TypeIndex - TypeIndexBegin.
+    Offsets are found on demand by scanning forward from the nearest entry of the index offset buffer in the hash stream.
+    Records are decoded when they are first accessed.
+    """
+    header: Optional[TPIHeader] = None
+    type_records: Optional[MSFStream] = None
+    hash_stream: Optional[MSFStream] = None
+    hash_adjusters: Dict[int, int] = field(default_factory=dict)  # String table offset of a name to its type index.
+    _offsets: Optional[array] = field(default=None, repr=False)
+    _seed_indexes: array = field(default_factory=lambda: array("I"), repr=False)
+    _seed_offsets: array = field(default_factory=lambda: array("I"), repr=False)
+    _types: Dict[int, TypeLeaf] = field(default_factory=dict, repr=False)
+    _hash_values: Optional[bytes] = field(default=None, repr=False)  # The little endian hash value of each record.
+    _adjusted_names: Optional[Dict[bytes, int]] = field(default=None, repr=False)
+    _found_types: OrderedDict = field(default_factory=OrderedDict, repr=False)
+
     @classmethod
-    def from_bytes(cls, buffer: bytes):
+    def from_bytes(cls, buffer: Union[bytes, MSFStream], hash_stream: Union[bytes, MSFStream, None] = None):
+        buffer = as_stream(buffer)
         self = cls(buffer)
-        Version = Struct("<I").unpack_from(buffer)[0]
-        if Version != 20040203:  # V80
+        self.header = header = TPIHeader(*buffer.unpack_from(TpiStreamHeader))
+        if header.Version != 20040203:  # V80
             raise NotImplementedError("Only V80 is supported.")
-        (
-            HeaderSize,
-            TypeIndexBegin,
-            TypeIndexEnd,
-            TypeRecordBytes,
-            HashStreamIndex,
-            HashAuxStreamIndex,
-            HashKeySize,
-            NumHashBuckets,
-            HashValueBufferOffset,
-            HashValueBufferLength,
-            IndexOffsetBufferOffset,
-            IndexOffsetBufferLength,
-            HashAdjBufferOffset,
-            HashAdjBufferLength,
-        ) = TpiStreamHeader.unpack_from(buffer, 4)
-        if TypeRecordBytes:
-            log.info("TPI/IPI only support header. No extra data found in test examples")
+        self.type_records = buffer[header.HeaderSize:header.HeaderSize + header.TypeRecordBytes]
+        if len(self.type_records) != header.TypeRecordBytes:
+            log.info("Type record data is truncated")
 
+        self._offsets = array("I", [UnknownOffset]) * max(header.TypeIndexEnd - header.TypeIndexBegin, 0)
+        # Without an index offset buffer the records are scanned from the start.
+        self._seed_indexes.append(header.TypeIndexBegin)
+        self._seed_offsets.append(0)
+        if hash_stream is not None:
+            self.load_hash_stream(hash_stream)
         return self
+
+    def load_hash_stream(self, buffer: Union[bytes, MSFStream]):
+        """Read the index offset buffer, hash values and hash adjusters from the hash stream."""
+        self.hash_stream = buffer = as_stream(buffer)
+        header = self.header
+        if header.HashKeySize == 4 and header.HashValueBufferLength == 4 * len(self._offsets):
+            self._hash_values = buffer.tobytes(
+                header.HashValueBufferOffset,
+                header.HashValueBufferOffset + header.HashValueBufferLength,
+            )
+        else:
+            log.info("Unsupported hash value buffer")
+        if header.HashAdjBufferLength:
+            reader = Reader(buffer[header.HashAdjBufferOffset:header.HashAdjBufferOffset + header.HashAdjBufferLength])
+            self.hash_adjusters = dict(read_hash_table(reader))
+
+        index_offsets = unpack_array("I", buffer.tobytes(
+            header.IndexOffsetBufferOffset,
+            header.IndexOffsetBufferOffset + header.IndexOffsetBufferLength,
+        ))
+        seed_indexes = array("I", [header.TypeIndexBegin])
+        seed_offsets = array("I", [0])
+        for type_index, offset in zip(index_offsets[::2], index_offsets[1::2]):
+            if type_index > seed_indexes[-1] and offset > seed_offsets[-1] and type_index < header.TypeIndexEnd:
+                seed_indexes.append(type_index)
+                seed_offsets.append(offset)
+                self._offsets[type_index - header.TypeIndexBegin] = offset
+        self._seed_indexes = seed_indexes
+        self._seed_offsets = seed_offsets
+
+    @property
+    def type_count(self) -> int:
+        return len(self._offsets)
+
+    def _scan(self, type_index: int):
+        """Find the offsets of all records between the closest known record before type_index and the next known record."""
+        seed = bisect_right(self._seed_indexes, type_index) - 1
+        begin = self.header.TypeIndexBegin
+        index = self._seed_indexes[seed] - begin
+        stop = self._seed_indexes[seed + 1] - begin if seed + 1 < len(self._seed_indexes) else len(self._offsets)
+        offset = self._seed_offsets[seed]
+
+        buffer = self.type_records
+        data, base, unpack_from = buffer.unpacker(TypeRecordHeaderStruct)
+        offsets = self._offsets
+        end = len(buffer) - TypeRecordHeaderStruct.size
+        while index < stop and offset <= end:
+            offsets[index] = offset
+            offset += unpack_from(data, base + offset)[0] + 2
+            index += 1
+        if index < stop:
+            raise ValueError(f"Type record {index + begin:X} is outside of the type record data.")
+
+    def type_offset(self, type_index: int) -> int:
+        """Get the offset of a type record in type_records."""
+        index = type_index - self.header.TypeIndexBegin
+        if not 0 <= index < len(self._offsets):
+            raise IndexError(f"Type index {type_index:X} is out of range.")
+        offset = self._offsets[index]
+        if offset == UnknownOffset:
+            self._scan(type_index)
+            offset = self._offsets[index]
+        return offset
+
+    def type_record(self, type_index: int) -> Tuple[int, bytes]:
+        """Get the leaf kind and the data after the kind of a type record without decoding it."""
+        offset = self.type_offset(type_index)
+        RecordLen, RecordKind = self.type_records.unpack_from(TypeRecordHeaderStruct, offset)
+        return RecordKind, self.type_records.tobytes(offset + 4, offset + 2 + RecordLen)
+
+    def get_type(self, type_index: int) -> TypeLeaf:
+        """Get the decoded type record of a type index.
+
+        Indexes below TypeIndexBegin are built in types.
+        """
+        leaf = self._types.get(type_index)
+        if leaf is None:
+            if type_index < self.header.TypeIndexBegin:
+                leaf = SimpleType(type_index)
+            else:
+                leaf = parse_leaf(*self.type_record(type_index))
+            self._types[type_index] = leaf
+        return leaf
+
+    def type_kind(self, type_index: int) -> int:
+        """Get the leaf kind of a type record without reading the rest of the record."""
+        return self.type_records.unpack_from(TypeRecordHeaderStruct, self.type_offset(type_index))[1]
+
+    def _hash_bucket_types(self, bucket: int) -> Iterator[int]:
+        """Get the type indexes of all records in a hash bucket.
+
+        If there is no hash value buffer every type index is returned.
+        """
+        begin = self.header.TypeIndexBegin
+        hash_values = self._hash_values
+        if hash_values is None:
+            yield from range(begin, begin + len(self._offsets))
+            return
+        # Searching the raw buffer is much faster than comparing the values one by one.
+        key = HashValueStruct.pack(bucket)
+        offset = hash_values.find(key)
+        while offset != -1:
+            if offset % 4 == 0:
+                yield begin + offset // 4
+                offset = hash_values.find(key, offset + 4)
+            else:
+                offset = hash_values.find(key, offset + 1)
+
+    def _name_types(self, name: bytes) -> Iterator[int]:
+        """Get the type indexes of all records in the hash bucket of a name.
+
+        Without hash buckets every record is a candidate.
+        """
+        if not self.header.NumHashBuckets:
+            begin = self.header.TypeIndexBegin
+            return iter(range(begin, begin + len(self._offsets)))
+        return self._hash_bucket_types(hash_string_v1(name) % self.header.NumHashBuckets)
+
+    def resolve_forward_ref(self, type_index: int) -> int:
+        """Get the type index of the definition of a forward referenced class, structure, union or enum.
+
+        Definitions are hashed by their unique name if they are scoped and by their name otherwise.
+        Returns type_index if it is not a forward reference or the definition is not found.
+        """
+        leaf = self.get_type(type_index)
+        if not isinstance(leaf, TagLeaf) or not leaf.is_forward_ref:
+            return type_index
+        use_unique_name = leaf.has_unique_name and leaf.is_scoped
+        key = leaf.unique_name if use_unique_name else leaf.name
+        for candidate_index in self._name_types(key):
+            if self.type_kind(candidate_index) != self.type_kind(type_index):
+                continue
+            candidate = self.get_type(candidate_index)
+            if candidate.is_forward_ref:
+                continue
+            if leaf.has_unique_name and candidate.has_unique_name:
+                if candidate.unique_name == leaf.unique_name:
+                    return candidate_index
+            elif candidate.name == leaf.name:
+                return candidate_index
+        return type_index
+
+    def find_type(self, name: Union[str, bytes], string_at: Optional[Callable[[int], bytes]] = None) -> Optional[int]:
+        """Find the type index of a class, structure, union or enum by name.
+
+        Scoped types with a unique name are hashed by their unique name and must be found by it.
+        Only records in the hash bucket of the name are decoded.
+        Forward references are resolved to their definition.
+
+        :param name: The name of the type.
+        :param string_at: A function to get a string from the string table by offset. Used to read the hash adjusters.
+        :return: The type index or None if no type has the name.
+        """
+        if isinstance(name, str):
+            name = name.encode()
+        found_types = self._found_types
+        try:
+            type_index = found_types[name]
+            found_types.move_to_end(name)
+            return type_index
+        except KeyError:
+            # Not found yet or evicted by another thread.
+            pass
+
+        type_index = None
+        if string_at is not None and self.hash_adjusters:
+            # The hash adjusters select the preferred record for a name.
+            if self._adjusted_names is None:
+                self._adjusted_names = {string_at(offset): index for offset, index in self.hash_adjusters.items()}
+            type_index = self._adjusted_names.get(name)
+        if type_index is None:
+            forward_ref = None
+            for candidate_index in self._name_types(name):
+                if self.type_kind(candidate_index) not in TagLeafKinds:
+                    continue
+                candidate = self.get_type(candidate_index)
+                if candidate.name != name and candidate.unique_name != name:
+                    continue
+                if not candidate.is_forward_ref:
+                    type_index = candidate_index
+                    break
+                if forward_ref is None:
+                    forward_ref = candidate_index
+            else:
+                type_index = forward_ref
+        if type_index is not None:
+            type_index = self.resolve_forward_ref(type_index)
+
+        found_types[name] = type_index
+        while len(found_types) > FoundTypeCacheSize:
+            try:
+                found_types.popitem(last=False)
+            except KeyError:
+                break
+        return type_index
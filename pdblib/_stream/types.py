@@ -0,0 +1,725 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple, List, Dict, Type, Union
+import logging
+
+from pdblib._struct import Struct, Reader
+
+log = logging.getLogger(__name__)
+
+# https://github.com/microsoft/microsoft-pdb/blob/master/include/cvinfo.h
+# https://llvm.org/docs/PDB/CodeViewTypes.html
+
+NumericKindStruct = Struct("<H")
+PadStruct = Struct("<B")
+U16Struct = Struct("<H")
+U32Struct = Struct("<I")
+NumericStructs = {
+    0x8000: Struct("<b"),   # LF_CHAR
+    0x8001: Struct("<h"),   # LF_SHORT
+    0x8002: Struct("<H"),   # LF_USHORT
+    0x8003: Struct("<i"),   # LF_LONG
+    0x8004: Struct("<I"),   # LF_ULONG
+    0x8009: Struct("<q"),   # LF_QUADWORD
+    0x800A: Struct("<Q"),   # LF_UQUADWORD
+}
+
+# Class property flags
+ForwardReference = 0x0080
+Scoped = 0x0100
+HasUniqueName = 0x0200
+
+
+def read_numeric(reader: Reader) -> int:
+    """Read a numeric leaf. Values below 0x8000 are stored directly, otherwise a leaf kind precedes the value."""
+    value = reader.unpack(NumericKindStruct)[0]
+    if value < 0x8000:
+        return value
+    struct = NumericStructs.get(value)
+    if struct is None:
+        raise NotImplementedError(f"Numeric leaf {value:04X} is not supported")
+    return reader.unpack(struct)[0]
+
+
+@dataclass
+class TypeLeaf:
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls()
+
+
+@dataclass
+class SimpleType(TypeLeaf):
+    """A built in type with an index below TypeIndexBegin."""
+    index: int
+
+    @property
+    def kind(self) -> int:
+        return self.index & 0xFF
+
+    @property
+    def mode(self) -> int:
+        return (self.index >> 8) & 0xF
+
+
+@dataclass
+class UnknownLeaf(TypeLeaf):
+    kind: int
+    data: bytes
+
+
+lfModifierStruct = Struct("<IH")
+
+
+@dataclass
+class lfModifier(TypeLeaf):  # 0x1001
+    type: int
+    attr: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfModifierStruct))
+
+
+class Modifier(lfModifier):
+    pass
+
+
+lfPointerStruct = Struct("<II")
+
+
+@dataclass
+class lfPointer(TypeLeaf):  # 0x1002
+    utype: int
+    attr: int
+
+    @property
+    def ptrtype(self) -> int:
+        return self.attr & 0x1F
+
+    @property
+    def ptrmode(self) -> int:
+        return (self.attr >> 5) & 0x7
+
+    @property
+    def size(self) -> int:
+        return (self.attr >> 13) & 0x3F
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfPointerStruct))
+
+
+class Pointer(lfPointer):
+    pass
+
+
+lfProcStruct = Struct("<IBBHI")
+
+
+@dataclass
+class lfProc(TypeLeaf):  # 0x1008
+    rvtype: int
+    calltype: int
+    funcattr: int
+    parmcount: int
+    arglist: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfProcStruct))
+
+
+class Procedure(lfProc):
+    pass
+
+
+lfMFuncStruct = Struct("<IIIBBHIi")
+
+
+@dataclass
+class lfMFunc(TypeLeaf):  # 0x1009
+    rvtype: int
+    classtype: int
+    thistype: int
+    calltype: int
+    funcattr: int
+    parmcount: int
+    arglist: int
+    thisadjust: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfMFuncStruct))
+
+
+class MemberFunction(lfMFunc):
+    pass
+
+
+@dataclass
+class lfArgList(TypeLeaf):  # 0x1201
+    arg: Tuple[int, ...]
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count = reader.unpack(U32Struct)[0]
+        return cls(reader.unpack(Struct(f"<{count}I")))
+
+
+class ArgList(lfArgList):
+    pass
+
+
+lfBitfieldStruct = Struct("<IBB")
+
+
+@dataclass
+class lfBitfield(TypeLeaf):  # 0x1205
+    type: int
+    length: int
+    position: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfBitfieldStruct))
+
+
+class Bitfield(lfBitfield):
+    pass
+
+
+def is_introducing_virtual(attr: int) -> bool:
+    return (attr >> 2) & 0x7 in (4, 6)
+
+
+@dataclass
+class MethodListEntry:
+    attr: int
+    index: int
+    vbaseoff: int
+
+
+lfMethodListStruct = Struct("<H2xI")
+
+
+@dataclass
+class lfMethodList(TypeLeaf):  # 0x1206
+    methods: List[MethodListEntry]
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        methods = []
+        while reader.remaining >= 8:
+            attr, index = reader.unpack(lfMethodListStruct)
+            vbaseoff = reader.unpack(U32Struct)[0] if is_introducing_virtual(attr) else 0
+            methods.append(MethodListEntry(attr, index, vbaseoff))
+        return cls(methods)
+
+
+class MethodList(lfMethodList):
+    pass
+
+
+lfArrayStruct = Struct("<II")
+
+
+@dataclass
+class lfArray(TypeLeaf):  # 0x1503
+    elemtype: int
+    idxtype: int
+    size: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfArrayStruct), read_numeric(reader), reader.read_str())
+
+
+class Array(lfArray):
+    pass
+
+
+@dataclass
+class TagLeaf(TypeLeaf):
+    """The common part of class, structure, union and enum records."""
+    count: int
+    property: int
+    field: int
+    name: bytes
+    unique_name: bytes
+
+    @property
+    def is_forward_ref(self) -> bool:
+        return bool(self.property & ForwardReference)
+
+    @property
+    def is_scoped(self) -> bool:
+        return bool(self.property & Scoped)
+
+    @property
+    def has_unique_name(self) -> bool:
+        return bool(self.property & HasUniqueName)
+
+
+def read_tag_names(reader: Reader, prop: int) -> Tuple[bytes, bytes]:
+    name = reader.read_str()
+    unique_name = reader.read_str() if prop & HasUniqueName else b""
+    return name, unique_name
+
+
+lfClassStruct = Struct("<HHIII")
+
+
+@dataclass
+class lfClass(TagLeaf):  # 0x1504, 0x1505, 0x1519
+    derived: int
+    vshape: int
+    size: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count, prop, field, derived, vshape = reader.unpack(lfClassStruct)
+        size = read_numeric(reader)
+        return cls(count, prop, field, *read_tag_names(reader, prop), derived, vshape, size)
+
+
+class Class(lfClass):
+    pass
+
+
+class Structure(lfClass):
+    pass
+
+
+class Interface(lfClass):
+    pass
+
+
+lfUnionStruct = Struct("<HHI")
+
+
+@dataclass
+class lfUnion(TagLeaf):  # 0x1506
+    size: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count, prop, field = reader.unpack(lfUnionStruct)
+        size = read_numeric(reader)
+        return cls(count, prop, field, *read_tag_names(reader, prop), size)
+
+
+class Union_(lfUnion):
+    pass
+
+
+lfEnumStruct = Struct("<HHII")
+
+
+@dataclass
+class lfEnum(TagLeaf):  # 0x1507
+    utype: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count, prop, utype, field = reader.unpack(lfEnumStruct)
+        return cls(count, prop, field, *read_tag_names(reader, prop), utype)
+
+
+class Enum(lfEnum):
+    pass
+
+
+@dataclass
+class lfVTShape(TypeLeaf):  # 0x000A
+    count: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(U16Struct)[0])
+
+
+class VTShape(lfVTShape):
+    pass
+
+
+lfFuncIdStruct = Struct("<II")
+
+
+@dataclass
+class lfFuncId(TypeLeaf):  # 0x1601
+    scopeId: int
+    type: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfFuncIdStruct), reader.read_str())
+
+
+class FunctionId(lfFuncId):
+    pass
+
+
+lfMFuncIdStruct = Struct("<II")
+
+
+@dataclass
+class lfMFuncId(TypeLeaf):  # 0x1602
+    parentType: int
+    type: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfMFuncIdStruct), reader.read_str())
+
+
+class MemberFunctionId(lfMFuncId):
+    pass
+
+
+@dataclass
+class lfBuildInfo(TypeLeaf):  # 0x1603
+    arg: Tuple[int, ...]
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count = reader.unpack(U16Struct)[0]
+        return cls(reader.unpack(Struct(f"<{count}I")))
+
+
+class BuildInfo(lfBuildInfo):
+    pass
+
+
+@dataclass
+class lfStringList(TypeLeaf):  # 0x1604
+    arg: Tuple[int, ...]
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        count = reader.unpack(U32Struct)[0]
+        return cls(reader.unpack(Struct(f"<{count}I")))
+
+
+class SubstringList(lfStringList):
+    pass
+
+
+@dataclass
+class lfStringId(TypeLeaf):  # 0x1605
+    id: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(U32Struct)[0], reader.read_str())
+
+
+class StringId(lfStringId):
+    pass
+
+
+lfUdtSrcLineStruct = Struct("<III")
+
+
+@dataclass
+class lfUdtSrcLine(TypeLeaf):  # 0x1606
+    type: int
+    src: int
+    line: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfUdtSrcLineStruct))
+
+
+class UdtSourceLine(lfUdtSrcLine):
+    pass
+
+
+lfUdtModSrcLineStruct = Struct("<IIIH")
+
+
+@dataclass
+class lfUdtModSrcLine(TypeLeaf):  # 0x1607
+    type: int
+    src: int
+    line: int
+    imod: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfUdtModSrcLineStruct))
+
+
+class UdtModSourceLine(lfUdtModSrcLine):
+    pass
+
+
+# Field list members
+
+lfMemberStruct = Struct("<HI")
+
+
+@dataclass
+class lfMember(TypeLeaf):  # 0x150D
+    attr: int
+    index: int
+    offset: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfMemberStruct), read_numeric(reader), reader.read_str())
+
+
+class Member(lfMember):
+    pass
+
+
+lfSTMemberStruct = Struct("<HI")
+
+
+@dataclass
+class lfSTMember(TypeLeaf):  # 0x150E
+    attr: int
+    index: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfSTMemberStruct), reader.read_str())
+
+
+class StaticMember(lfSTMember):
+    pass
+
+
+lfBClassStruct = Struct("<HI")
+
+
+@dataclass
+class lfBClass(TypeLeaf):  # 0x1400
+    attr: int
+    index: int
+    offset: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfBClassStruct), read_numeric(reader))
+
+
+class BaseClass(lfBClass):
+    pass
+
+
+lfVBClassStruct = Struct("<HII")
+
+
+@dataclass
+class lfVBClass(TypeLeaf):  # 0x1401, 0x1402
+    attr: int
+    index: int
+    vbptr: int
+    vbpoff: int
+    vboff: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfVBClassStruct), read_numeric(reader), read_numeric(reader))
+
+
+class VirtualBaseClass(lfVBClass):
+    pass
+
+
+class IndirectVirtualBaseClass(lfVBClass):
+    pass
+
+
+lfVFuncTabStruct = Struct("<2xI")
+
+
+@dataclass
+class lfVFuncTab(TypeLeaf):  # 0x1409
+    type: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(lfVFuncTabStruct)[0])
+
+
+class VFuncTab(lfVFuncTab):
+    pass
+
+
+lfIndexStruct = Struct("<2xI")
+
+
+@dataclass
+class lfIndex(TypeLeaf):  # 0x1404
+    index: int
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(lfIndexStruct)[0])
+
+
+class ListContinuation(lfIndex):
+    pass
+
+
+lfMethodStruct = Struct("<HI")
+
+
+@dataclass
+class lfMethod(TypeLeaf):  # 0x150F
+    count: int
+    mList: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(*reader.unpack(lfMethodStruct), reader.read_str())
+
+
+class OverloadedMethod(lfMethod):
+    pass
+
+
+lfNestTypeStruct = Struct("<2xI")
+
+
+@dataclass
+class lfNestType(TypeLeaf):  # 0x1510
+    index: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(lfNestTypeStruct)[0], reader.read_str())
+
+
+class NestedType(lfNestType):
+    pass
+
+
+lfOneMethodStruct = Struct("<HI")
+
+
+@dataclass
+class lfOneMethod(TypeLeaf):  # 0x1511
+    attr: int
+    index: int
+    vbaseoff: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        attr, index = reader.unpack(lfOneMethodStruct)
+        vbaseoff = reader.unpack(U32Struct)[0] if is_introducing_virtual(attr) else 0
+        return cls(attr, index, vbaseoff, reader.read_str())
+
+
+class OneMethod(lfOneMethod):
+    pass
+
+
+@dataclass
+class lfEnumerate(TypeLeaf):  # 0x1502
+    attr: int
+    value: int
+    name: bytes
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        return cls(reader.unpack(U16Struct)[0], read_numeric(reader), reader.read_str())
+
+
+class Enumerate(lfEnumerate):
+    pass
+
+
+MemberLeafKinds: Dict[int, Type[TypeLeaf]] = {
+    0x1400: BaseClass,
+    0x1401: VirtualBaseClass,
+    0x1402: IndirectVirtualBaseClass,
+    0x1404: ListContinuation,
+    0x1409: VFuncTab,
+    0x1502: Enumerate,
+    0x150D: Member,
+    0x150E: StaticMember,
+    0x150F: OverloadedMethod,
+    0x1510: NestedType,
+    0x1511: OneMethod,
+}
+
+
+@dataclass
+class lfFieldList(TypeLeaf):  # 0x1203
+    members: List[TypeLeaf]
+
+    @classmethod
+    def from_reader(cls, reader: Reader):
+        members = []
+        while reader.remaining >= 2:
+            pad = reader.peek(PadStruct)[0]
+            if pad >= 0xF0:
+                # LF_PAD bytes align the next member.
+                reader.skip(pad & 0x0F)
+                continue
+            kind = reader.peek(NumericKindStruct)[0]
+            leaf_class = MemberLeafKinds.get(kind)
+            if leaf_class is None:
+                log.info(f"Unknown field list member {kind:04X}")
+                break
+            reader.skip(2)
+            members.append(leaf_class.from_reader(reader))
+        return cls(members)
+
+
+class FieldList(lfFieldList):
+    pass
+
+
+LeafKinds: Dict[int, Type[TypeLeaf]] = {
+    0x000A: VTShape,
+    0x1001: Modifier,
+    0x1002: Pointer,
+    0x1008: Procedure,
+    0x1009: MemberFunction,
+    0x1201: ArgList,
+    0x1203: FieldList,
+    0x1205: Bitfield,
+    0x1206: MethodList,
+    0x1503: Array,
+    0x1504: Class,
+    0x1505: Structure,
+    0x1506: Union_,
+    0x1507: Enum,
+    0x1519: Interface,
+    0x1601: FunctionId,
+    0x1602: MemberFunctionId,
+    0x1603: BuildInfo,
+    0x1604: SubstringList,
+    0x1605: StringId,
+    0x1606: UdtSourceLine,
+    0x1607: UdtModSourceLine,
+}
+
+
+def parse_leaf(leaf_kind: int, record: Union[bytes, Reader]) -> TypeLeaf:
+    """Decode a type record given its kind and the data after the kind."""
+    leaf_class = LeafKinds.get(leaf_kind)
+    if leaf_class is None:
+        log.info(f"Unknown leaf type {leaf_kind:04X}")
+        if isinstance(record, Reader):
+            record = record.read_bytes(record.remaining)
+        return UnknownLeaf(leaf_kind, record)
+    if not isinstance(record, Reader):
+        record = Reader(record)
+    return leaf_class.from_reader(record)
@@ -1,11 +1,13 @@
+from typing import Union
 from dataclasses import dataclass
 
+from pdblib._msf import MSFStream, as_stream
 from .base import BaseStream
 
 
 @dataclass
 class UnknownStream(BaseStream):
     @classmethod
-    def from_bytes(cls, buffer: bytes):
-        self = cls(buffer)
+    def from_bytes(cls, buffer: Union[bytes, MSFStream]):
+        self = cls(as_stream(buffer))
         return self
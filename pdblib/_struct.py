@@ -1,6 +1,9 @@
-from struct import Struct as Struct_
-from typing import BinaryIO
-from io import BytesIO
+from struct import Struct as Struct_, error as StructError
+from typing import BinaryIO, Union, Sequence, Tuple, List
+from array import array
+import sys
+
+from ._msf import MSFStream, Buffer
 
 
 class Struct(Struct_):
@@ -8,8 +11,135 @@ class Struct(Struct_):
         return self.unpack(f.read(self.size))
 
 
-def read_str(f: BytesIO):
-    """Read a null terminated string."""
-    s = f.getvalue()[f.tell():].split(b"\x00", 1)[0]
-    f.seek(len(s)+1, 1)
-    return s
+_unpack_from = Struct_.unpack_from
+
+
+def unpack_array(typecode: str, data: bytes) -> array:
+    """Unpack a little endian array."""
+    values = array(typecode, data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def unpack_columns(data: bytes, record_size: int, fields: Sequence[Tuple[str, int]]) -> List[array]:
+    """Decode a table of fixed size little endian records into one array per field.
+
+    Each column is copied out of the buffer with a strided view so no per-record objects are created.
+
+    :param data: The records. Trailing bytes that do not make up a whole record are ignored.
+    :param record_size: The size of each record in bytes.
+    :param fields: The array typecode and byte offset in the record of each field.
+        The record size and offset must be multiples of the field size.
+    """
+    count = len(data) // record_size
+    view = memoryview(data)[:count * record_size]
+    columns = []
+    for typecode, offset in fields:
+        column = array(typecode)
+        itemsize = column.itemsize
+        if record_size % itemsize or offset % itemsize:
+            raise ValueError(f"Field at offset {offset} of size {itemsize} is not aligned in a record of {record_size} bytes.")
+        column.frombytes(view.cast(typecode)[offset // itemsize::record_size // itemsize].tobytes())
+        if sys.byteorder == "big":
+            column.byteswap()
+        columns.append(column)
+    return columns
+
+
+class Reader:
+    """A cursor over a region of a buffer or stream view.
+
+    Values are unpacked in place and strings are located with find so nothing is copied
+    except the values that are returned.
+    Positions are relative to the start of the region.
+    """
+
+    __slots__ = ("_data", "_base", "_fragmented", "pos", "size")
+
+    def __init__(self, buffer: Union[Buffer, memoryview, MSFStream], pos: int = 0):
+        if isinstance(buffer, memoryview):
+            # memoryview has no find method
+            buffer = buffer.tobytes()
+        self.size = len(buffer)
+        self._base = 0
+        if isinstance(buffer, MSFStream):
+            contiguous = buffer.contiguous_range()
+            if contiguous is not None:
+                buffer, self._base = contiguous
+        self._data = buffer
+        self._fragmented = isinstance(buffer, MSFStream)
+        self.pos = pos
+
+    @property
+    def remaining(self) -> int:
+        return self.size - self.pos
+
+    def _advance(self, size: int) -> int:
+        """Move the cursor forward and return the old absolute position."""
+        pos = self.pos
+        end = pos + size
+        if end > self.size:
+            raise StructError(f"Reading {size} bytes at {pos} overruns the buffer of {self.size} bytes")
+        self.pos = end
+        return self._base + pos
+
+    def unpack(self, struct: Struct_) -> tuple:
+        """Unpack a struct at the cursor."""
+        offset = self._advance(struct.size)
+        if self._fragmented:
+            return self._data.unpack_from(struct, offset)
+        return _unpack_from(struct, self._data, offset)
+
+    def peek(self, struct: Struct_) -> tuple:
+        """Unpack a struct at the cursor without moving it."""
+        pos = self.pos
+        try:
+            return self.unpack(struct)
+        finally:
+            self.pos = pos
+
+    def read_bytes(self, size: int) -> bytes:
+        offset = self._advance(size)
+        if self._fragmented:
+            return self._data.tobytes(offset, offset + size)
+        return self._data[offset:offset + size]
+
+    def read_str(self) -> bytes:
+        """Read a null terminated string."""
+        start = self._base + self.pos
+        stop = self._base + self.size
+        end = self._data.find(b"\x00", start, stop)
+        if end == -1:
+            end = stop
+        if self._fragmented:
+            s = self._data.tobytes(start, end)
+        else:
+            s = self._data[start:end]
+        self.pos = min(end + 1 - self._base, self.size)
+        return s
+
+    def read_view(self, size: int) -> MSFStream:
+        """Get a view of the next size bytes without copying them."""
+        offset = self._advance(size)
+        if self._fragmented:
+            return self._data[offset:offset + size]
+        return MSFStream(self._data, (0,), (offset,), size)
+
+    def read_reader(self, size: int) -> "Reader":
+        """Get a reader over the next size bytes."""
+        offset = self._advance(size)
+        reader = Reader.__new__(Reader)
+        reader._data = self._data
+        reader._base = offset
+        reader._fragmented = self._fragmented
+        reader.pos = 0
+        reader.size = size
+        return reader
+
+    def skip(self, size: int):
+        self._advance(size)
+
+    def align(self, alignment: int):
+        """Move the cursor to the next multiple of alignment."""
+        self.pos = min(-(-self.pos // alignment) * alignment, self.size)
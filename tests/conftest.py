@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.synth import generate
+
+# The generate arguments of the synthetic PDB used by the tests.
+# Module 4 has no line information. Every fifth class is found through the TPI hash adjusters.
+SynthArgs = dict(n_modules=6, n_symbols=40, n_files=3, n_types=12)
+
+
+@pytest.fixture(scope="session", params=[(4096, False), (512, True)], ids=["contiguous", "shuffled"])
+def pdb_path(request, tmp_path_factory) -> str:
+    """The path of a synthetic PDB file.
+
+    The shuffled file uses small blocks written in a random order so that no stream is contiguous.
+    """
+    block_size, shuffle = request.param
+    path = tmp_path_factory.mktemp("pdb") / "synth.pdb"
+    path.write_bytes(generate(**SynthArgs, block_size=block_size, shuffle=shuffle))
+    return str(path)
@@ -0,0 +1,70 @@
+import os
+
+import pdblib
+
+
+def locations(pdb: pdblib.PDB7):
+    index = pdb.address_index
+    return [pdb.symbol_at(start) for start in index.starts]
+
+
+def test_parse_cache(pdb_path, tmp_path):
+    cache = pdblib.ParseCache(tmp_path)
+    stats = pdblib.ParseStats()
+    reference = pdblib.parse(pdb_path)
+
+    # The first parse misses and stores the indexes.
+    first = pdblib.parse(pdb_path, cache=cache, stats=stats)
+    phases = {phase for phase, _ in stats.phases}
+    assert "cache_store" in phases
+    assert "cache_load" in phases
+    info = first.info_stream
+    assert os.path.isfile(cache.path(info.guid, info.age))
+
+    # The second parse maps the indexes instead of scanning the streams.
+    stats = pdblib.ParseStats()
+    second = pdblib.parse(pdb_path, cache=str(tmp_path), stats=stats)
+    phases = {phase for phase, _ in stats.phases}
+    assert "cache_load" in phases
+    assert "cache_store" not in phases
+    assert list(second.SymRecordStream.offsets) == list(reference.SymRecordStream.offsets)
+    assert [len(module.symbols) for module in second.modules] == [len(module.symbols) for module in reference.modules]
+    assert list(second.address_index.starts) == list(reference.address_index.starts)
+    assert locations(second) == locations(reference)
+
+
+def test_parse_cache_rejects_other_file(pdb_path, tmp_path):
+    cache = pdblib.ParseCache(tmp_path)
+    pdb = pdblib.parse(pdb_path, cache=cache)
+    info = pdb.info_stream
+    assert cache.load(info.guid, info.age, pdb.msf.size) is not None
+    assert cache.load(info.guid, info.age + 1, pdb.msf.size) is None
+    assert cache.load(info.guid, info.age, pdb.msf.size + 1) is None
+
+
+def test_parse_cache_stores_only_built_indexes(pdb_path, tmp_path):
+    cache = pdblib.ParseCache(tmp_path)
+    stats = pdblib.ParseStats()
+    pdb = pdblib.parse(pdb_path, lazy=True, cache=cache, stats=stats)
+    phases = {phase for phase, _ in stats.phases}
+    assert "index_modules" not in phases
+    assert "cache_store" not in phases
+    assert pdb._modules is None
+
+    # A symbols load stores the symbol table only.
+    pdb = pdblib.parse(pdb_path, cache=cache, streams="symbols")
+    assert pdb._modules is None
+    info = pdb.info_stream
+    arrays = cache.load(info.guid, info.age, pdb.msf.size)
+    assert "sym_offsets" in arrays
+    assert "module_counts" not in arrays
+    del arrays
+
+    # A full load adds the module indexes to the entry.
+    reference = pdblib.parse(pdb_path)
+    stats = pdblib.ParseStats()
+    pdblib.parse(pdb_path, cache=cache, stats=stats)
+    assert "cache_store" in {phase for phase, _ in stats.phases}
+    arrays = cache.load(info.guid, info.age, reference.msf.size)
+    assert list(arrays["sym_offsets"]) == list(reference.SymRecordStream.offsets)
+    assert list(arrays["module_counts"]) == [len(module.symbols) for module in reference.modules]
@@ -0,0 +1,55 @@
+from array import array
+
+import pdblib
+from pdblib._stream.dbi import SectionContributionTable
+
+from .test_pdb import ProcedureKinds
+
+
+def contribution_table(*contributions) -> SectionContributionTable:
+    """Build a table from (section, offset, size, module index) tuples."""
+    columns = list(zip(*contributions))
+    count = len(contributions)
+    return SectionContributionTable(
+        array("H", columns[0]),
+        array("i", columns[1]),
+        array("i", columns[2]),
+        array("I", [0] * count),
+        array("H", columns[3]),
+        array("I", [0] * count),
+        array("I", [0] * count),
+    )
+
+
+def brute_force_find(table: SectionContributionTable, section: int, offset: int) -> int:
+    for index, entry in enumerate(table):
+        if entry.Section == section and entry.Offset <= offset < entry.Offset + entry.Size:
+            return index
+    return -1
+
+
+def test_find():
+    # The entries are not sorted and there are gaps between them.
+    table = contribution_table((2, 0x100, 0x10, 5), (1, 0x20, 0x10, 3), (1, 0, 0x10, 4), (2, 0, 0x40, 6))
+    for section in range(4):
+        for offset in range(0, 0x120, 4):
+            assert table.find(section, offset) == brute_force_find(table, section, offset), (section, offset)
+    assert table.find(1, 0x2F) == 1
+    assert table.find(1, 0x30) == -1
+    assert table.find(0, 0) == -1
+
+
+def test_module_for_address(pdb_path):
+    pdb = pdblib.parse(pdb_path)
+    dbi = pdb.dbi_steam
+    contributions = dbi.section_contributions
+    for index, entry in enumerate(contributions):
+        assert contributions.find(entry.Section, entry.Offset) == index
+        assert contributions.find(entry.Section, entry.Offset + entry.Size - 1) == index
+    # Each procedure is in the contribution of its module.
+    for module_index, symbol in pdb.iter_symbols(ProcedureKinds):
+        record = symbol.RecordData
+        assert dbi.module_for_address(record.seg, record.off) == module_index
+        assert dbi.module_for_address(record.seg, record.off + record.len - 1) == module_index
+    assert dbi.module_for_address(0, 0) is None
+    assert dbi.module_for_address(1, 0x7FFFFFFF) is None
@@ -0,0 +1,94 @@
+import ast
+import csv
+import struct
+import zipfile
+from array import array
+
+import pytest
+
+import pdblib
+from pdblib._export import ExportTables, symbol_table
+from pdblib._stream.module import SymbolTable
+from benchmarks.synth import symbol_record
+
+S_GDATA32 = 0x110D
+NpyTypecodes = {"i1": "b", "u1": "B", "i2": "h", "u2": "H", "i4": "i", "u4": "I", "i8": "q", "u8": "Q"}
+
+
+def read_npz(path) -> dict:
+    """Read the arrays of an npz file written by write_npz without numpy."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            data = zf.read(name)
+            assert data[:8] == b"\x93NUMPY\x01\x00"
+            header_size = int.from_bytes(data[8:10], "little")
+            assert (10 + header_size) % 64 == 0
+            header = ast.literal_eval(data[10:10 + header_size].decode("latin1"))
+            values = array(NpyTypecodes[header["descr"][1:]])
+            values.frombytes(data[10 + header_size:])
+            assert header["shape"] == (len(values),)
+            arrays[name[:-len(".npy")]] = values
+    return arrays
+
+
+def string_column(arrays: dict, name: str) -> list:
+    blob = arrays[f"{name}_blob"].tobytes()
+    offsets = arrays[f"{name}_offsets"]
+    return [blob[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_npz_round_trip(pdb_path, tmp_path, compress):
+    pdb = pdblib.parse(pdb_path, lazy=True)
+    paths = pdblib.export(pdb, tmp_path, "npz", compress=compress)
+    assert sorted(paths) == sorted(str(tmp_path / f"{name}.npz") for name in ExportTables)
+    for name, get_table in ExportTables.items():
+        arrays = read_npz(tmp_path / f"{name}.npz")
+        for column_name, column in get_table(pdb).items():
+            if isinstance(column, pdblib.StringColumn):
+                assert string_column(arrays, column_name) == list(column)
+            else:
+                assert list(arrays[column_name]) == list(column)
+
+
+def test_csv_round_trip(pdb_path, tmp_path):
+    pdb = pdblib.parse(pdb_path, lazy=True)
+    pdblib.export(pdb, tmp_path, "csv", ["symbols", "modules"])
+    assert not (tmp_path / "contributions.csv").exists()
+    for name in ("symbols", "modules"):
+        table = ExportTables[name](pdb)
+        with open(tmp_path / f"{name}.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == list(table)
+        assert len(rows) == len(next(iter(table.values()))) + 1
+        for column_index, column in enumerate(table.values()):
+            values = [row[column_index] for row in rows[1:]]
+            if isinstance(column, pdblib.StringColumn):
+                assert values == [value.decode() for value in column]
+            else:
+                assert values == [str(value) for value in column]
+
+
+def test_symbol_table(pdb_path):
+    pdb = pdblib.parse(pdb_path)
+    table = symbol_table(pdb)
+    procedures = sum(len(module.symbols.filter({0x1110})) for module in pdb.modules)
+    assert sum(1 for length in table["length"] if length) >= procedures
+    assert set(table["module"]) >= {-1, 0}
+
+
+def test_symbol_table_skips_undecoded_records(pdb_path):
+    pdb = pdblib.parse(pdb_path)
+    valid = symbol_record(S_GDATA32, struct.pack("<IIH", 0x1000, 0x10, 1) + b"data\0")
+    truncated = symbol_record(S_GDATA32, struct.pack("<I", 0x1000))
+    pdb._SymRecordStream = SymbolTable.from_bytes(valid + truncated)
+    table = symbol_table(pdb)
+    names = list(table["name"])
+    assert names.count(b"data") == 1
+    assert len(table["kind"]) == len(names) == len(table["segment"]) == len(table["offset"])
+
+
+def test_unsupported_format(pdb_path, tmp_path):
+    with pytest.raises(ValueError):
+        pdblib.export(pdblib.parse(pdb_path, lazy=True), tmp_path, "parquet")
@@ -0,0 +1,42 @@
+import os
+
+import pdblib
+from pdblib.__main__ import main
+from pdblib._header import create_headers, demangle
+
+
+def read_headers(path) -> dict:
+    headers = {}
+    for name in os.listdir(path):
+        with open(os.path.join(path, name)) as f:
+            headers[name] = f.read()
+    return headers
+
+
+def test_demangle():
+    group_name, declaration = demangle("?func0_0@Class0@@QEAAXXZ")
+    assert group_name == "Class0"
+    assert "Class0::func0_0" in declaration
+    assert demangle("not_mangled") == (None, None)
+
+
+def test_create_headers(pdb_path, tmp_path):
+    pdb = pdblib.parse(pdb_path)
+    create_headers(pdb, str(tmp_path / "serial"))
+    headers = read_headers(tmp_path / "serial")
+    assert "Class0.hpp" in headers
+    assert "Class0::func0_0" in headers["Class0.hpp"]
+
+    # Demangling in worker processes writes the same files.
+    create_headers(pdb, str(tmp_path / "parallel"), jobs=2)
+    assert read_headers(tmp_path / "parallel") == headers
+
+    # Existing files are replaced.
+    create_headers(pdb, str(tmp_path / "serial"))
+    assert read_headers(tmp_path / "serial") == headers
+
+
+def test_header_cli(pdb_path, tmp_path):
+    main(["header", pdb_path, str(tmp_path / "cli"), "--jobs", "2"])
+    create_headers(pdblib.parse(pdb_path), str(tmp_path / "expected"))
+    assert read_headers(tmp_path / "cli") == read_headers(tmp_path / "expected")
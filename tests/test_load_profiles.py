@@ -0,0 +1,46 @@
+import mmap
+
+import pytest
+
+import pdblib
+from pdblib._pdb import LoadProfiles, StreamAttributes, resolve_load_profile
+
+
+def loaded(pdb: pdblib.PDB7) -> set:
+    """The names of the streams that have been parsed."""
+    return {name for name, attribute in StreamAttributes.items() if getattr(pdb, f"_{attribute}") is not None}
+
+
+@pytest.mark.parametrize("profile", sorted(LoadProfiles))
+def test_load_profile(pdb_path, profile):
+    pdb = pdblib.parse(pdb_path, streams=profile)
+    assert loaded(pdb) == LoadProfiles[profile]
+    # Streams outside the profile are still parsed when they are first used.
+    reference = pdblib.parse(pdb_path)
+    assert len(pdb.modules) == len(reference.modules)
+    assert list(pdb.SymRecordStream.offsets) == list(reference.SymRecordStream.offsets)
+    assert pdb.tpi_stream.header == reference.tpi_stream.header
+
+
+def test_partial_profile_maps_file(pdb_path):
+    assert isinstance(pdblib.parse(pdb_path, streams="full").msf.data, bytes)
+    assert isinstance(pdblib.parse(pdb_path, streams="symbols").msf.data, mmap.mmap)
+
+
+def test_lazy_loads_nothing(pdb_path):
+    assert loaded(pdblib.parse(pdb_path, lazy=True)) == set()
+    assert loaded(pdblib.parse(pdb_path, lazy=True, streams=["names"])) == {"info", "names"}
+
+
+def test_from_source_profile(pdb_path):
+    with pdblib.FileRangeReader(pdb_path) as reader:
+        assert loaded(pdblib.PDB7.from_source(reader, streams="minimal")) == LoadProfiles["minimal"]
+
+
+def test_resolve_load_profile():
+    assert resolve_load_profile("minimal") == LoadProfiles["minimal"]
+    assert resolve_load_profile(["dbi", "names"]) == frozenset({"dbi", "names"})
+    with pytest.raises(ValueError):
+        resolve_load_profile("everything")
+    with pytest.raises(ValueError):
+        resolve_load_profile(["dbi", "unknown"])
@@ -0,0 +1,44 @@
+import io
+
+import pdblib
+from pdblib.__main__ import main, read_addresses, symbolize
+
+
+def test_read_addresses(capsys):
+    f = io.StringIO("1000 1004\nzz 0x1008 -5\n100c 1010 1014 1018\n")
+    assert list(read_addresses(f, 2)) == [[0x1000, 0x1004], [0x1008, 0x100C], [0x1010, 0x1014], [0x1018]]
+    err = capsys.readouterr().err
+    assert "'zz' on line 2" in err
+    assert "'-5' on line 2" in err
+
+
+def test_read_addresses_long_line():
+    # Batches are split inside a line.
+    f = io.StringIO(" ".join(f"{rva:x}" for rva in range(10)))
+    assert [len(batch) for batch in read_addresses(f, 4)] == [4, 4, 2]
+
+
+def test_symbolize(pdb_path):
+    pdb = pdblib.parse(pdb_path, lazy=True)
+    start = pdb.address_index.starts[0]
+    rvas = [start + 4, 0, start]
+    output = symbolize(pdb, rvas, {})
+    name = pdb.symbol_at(start).symbol.RecordData.name.decode()
+    line = pdb.line_at(start + 4)
+    assert output[0] == f"0x{start + 4:x} {name}+0x4 {line.file.decode()}:{line.line}\n"
+    assert output[1] == "0x0 ? ?\n"
+    assert output[2].startswith(f"0x{start:x} {name}+0x0 ")
+
+
+def test_symbolize_cli(pdb_path, tmp_path, capsys):
+    pdb = pdblib.parse(pdb_path)
+    starts = list(pdb.address_index.starts[:5])
+    addresses = tmp_path / "addresses.txt"
+    addresses.write_text(" ".join(f"{rva:x}" for rva in starts) + "\nnot-an-address\n")
+    main(["symbolize", pdb_path, str(addresses), "--batch-size", "2"])
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert [int(line.split()[0], 16) for line in lines] == starts
+    assert all("+0x0 " in line for line in lines)
+    assert "Resolved 5 addresses" in captured.err
+    assert "'not-an-address' on line 2" in captured.err
@@ -0,0 +1,87 @@
+import re
+
+import pytest
+
+import pdblib
+from pdblib._name_index import required_literals
+
+
+@pytest.fixture(scope="module")
+def pdb(pdb_path) -> pdblib.PDB7:
+    return pdblib.parse(pdb_path)
+
+
+def brute_force(index: pdblib.NameIndex, pattern: str):
+    search = re.compile(pattern).search
+    return [
+        name_id for name_id, (name, demangled) in enumerate(zip(index.names, index.demangled))
+        if search(name) or (demangled and search(demangled))
+    ]
+
+
+@pytest.mark.parametrize("pattern", [
+    r"func3_5@",
+    r"^\?func1_",
+    r"func\d_1\d@Class[0-3]",
+    r"Class(1|2)@@",
+    r"func2_(3|30)@",
+    r"func0_3.?@",
+    r"func(4)_2\d@",
+    r"Class\d::func",
+    r"func5_39@Class5@@QEAAXXZ$",
+    r"nothing_matches",
+    # Escapes must be decoded rather than taken as literal text.
+    r"func3_5\x40Class3",
+    r"func3_5\100Class3",
+    r"\u0066unc2_1\U00000030@",
+    r"\N{LATIN SMALL LETTER F}unc1_3",
+    r"func0_1\.?",
+    # Repeats and nested groups.
+    r"func1_1{1,2}@",
+    r"func1_1{0,2}@",
+    r"func(2_(1(0|1)))@",
+    r"((func)4_3)9@",
+    r"(func)+5_2(0)*@",
+    # Flags.
+    r"(?i)FUNC0_1@",
+    r"(?i:FUNC)0_2@",
+    r"(?x) func 3_ 7 @",
+])
+def test_find_regex(pdb, pattern):
+    index = pdb.name_index
+    assert index.find_regex(pattern) == brute_force(index, pattern)
+
+
+@pytest.mark.parametrize("pattern, literals", [
+    (r"func3_5\x40Class3", ["func3_5@Class3"]),
+    (r"a\101\u0042\N{LATIN SMALL LETTER C}", ["aABc"]),
+    (r"ab{2,3}c", ["a", "b", "c"]),
+    (r"ab?c", ["a", "c"]),
+    (r"x(y(z+)?w)v", ["x", "y", "w", "v"]),
+    (r"a|b", []),
+    (r"(?i:ab)c", ["c"]),
+    (r"[ab]c\d", ["c"]),
+])
+def test_required_literals(pattern, literals):
+    assert required_literals(pattern) == literals
+
+
+def test_find_substring_and_prefix(pdb):
+    index = pdb.name_index
+    assert index.find_substring("func2_1") == [
+        name_id for name_id, (name, demangled) in enumerate(zip(index.names, index.demangled))
+        if "func2_1" in name or "func2_1" in demangled
+    ]
+    assert sorted(index.find_prefix("?func3_")) == [
+        name_id for name_id, name in enumerate(index.names) if name.startswith("?func3_")
+    ]
+
+
+def test_save_and_load(pdb, tmp_path):
+    index = pdb.name_index
+    path = tmp_path / "names.idx"
+    index.save(path, pdb)
+    loaded = pdblib.NameIndex.load(path, pdb)
+    assert loaded is not None
+    assert loaded.names == index.names
+    assert loaded.find_regex(r"func1_\d@") == index.find_regex(r"func1_\d@")
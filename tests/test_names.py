@@ -0,0 +1,52 @@
+import pytest
+
+import pdblib
+from pdblib._stream.names import StringTableStream
+from benchmarks.synth import file_name, generate, names_stream
+
+from .conftest import SynthArgs
+
+
+def file_names():
+    return [
+        file_name(module_index, file_index)
+        for module_index in range(SynthArgs["n_modules"])
+        for file_index in range(SynthArgs["n_files"])
+    ]
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_find_offset(version):
+    strings = file_names() + [b"Class0", b"Class5"]
+    data, offsets = names_stream(strings, version)
+    table = StringTableStream.from_bytes(data)
+    assert table.HashVersion == version
+    assert table.NameCount == len(offsets)
+    for string, offset in offsets.items():
+        assert table.find_offset(string) == offset
+        assert table.find_offset(string.decode()) == offset
+        assert table.string_at(offset) == string
+    assert table.find_offset(b"missing.cpp") is None
+
+
+def test_find_offset_without_buckets():
+    data, _ = names_stream([b"name"])
+    table = StringTableStream.from_bytes(data)
+    table.buckets = table.buckets[:0]
+    assert table.find_offset(b"name") is None
+
+
+def test_pdb_names(pdb_path):
+    names = pdblib.parse(pdb_path, lazy=True).names
+    for string in file_names():
+        offset = names.find_offset(string)
+        assert offset is not None
+        assert names.string_at(offset) == string
+
+
+def test_names_version_2(tmp_path):
+    path = tmp_path / "names2.pdb"
+    path.write_bytes(generate(**SynthArgs, names_version=2))
+    names = pdblib.parse(str(path), lazy=True).names
+    assert names.HashVersion == 2
+    assert all(names.find_offset(string) is not None for string in file_names())
@@ -0,0 +1,140 @@
+from array import array
+import re
+
+import pytest
+
+import pdblib
+from pdblib._lines import ModuleLines
+from pdblib._stream.module import PROCSYM32
+from pdblib._stream.types import TagLeaf
+
+from .conftest import SynthArgs
+
+ProcedureKinds = (0x110F, 0x1110)
+ProcedureName = re.compile(rb"\?func(\d+)_(\d+)@")
+
+
+def procedures(pdb: pdblib.PDB7):
+    """Get the RVA, length, name, module index and symbol index of every procedure in the module streams."""
+    result = []
+    for module_index, symbol in pdb.iter_symbols(ProcedureKinds):
+        record = symbol.RecordData
+        assert isinstance(record, PROCSYM32)
+        match = ProcedureName.match(record.name)
+        assert int(match.group(1)) == module_index
+        rva = pdb.section_offset_to_rva(record.seg, record.off)
+        result.append((rva, record.len, record.name, module_index, int(match.group(2))))
+    return result
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def pdb(request, pdb_path) -> pdblib.PDB7:
+    return pdblib.parse(pdb_path, lazy=request.param)
+
+
+def test_symbol_at(pdb):
+    found = procedures(pdb)
+    assert len(found) == SynthArgs["n_modules"] * SynthArgs["n_symbols"]
+    for rva, length, name, _, _ in found:
+        for address in (rva, rva + length // 2, rva + length - 1):
+            location = pdb.symbol_at(address)
+            assert location is not None
+            assert location.rva == rva
+            assert location.offset == address - rva
+            assert location.symbol.RecordData.name == name
+    last_rva, last_length = max(found)[:2]
+    assert pdb.symbol_at(found[0][0] - 1) is None
+    assert pdb.symbol_at(last_rva + last_length) is None
+
+
+def test_symbols_at(pdb):
+    found = procedures(pdb)
+    rvas = sorted(rva + length - 1 for rva, length, _, _, _ in found)
+    assert [location.rva + location.offset for location in pdb.symbols_at(rvas)] == rvas
+    with pytest.raises(ValueError):
+        pdb.symbols_at(rvas[::-1])
+
+
+def test_line_at(pdb):
+    for rva, length, _, module_index, symbol_index in procedures(pdb):
+        for offset in range(0, length, 5):
+            line = pdb.line_at(rva + offset)
+            if module_index % 5 == 4:
+                # The synthetic writer omits line information from these modules.
+                assert line is None
+                continue
+            assert line is not None
+            assert line.line == 10 + symbol_index * 100 + offset // 8
+            assert line.rva == rva + offset // 8 * 8
+            assert line.file == f"c:\\src\\file{module_index}_{symbol_index % SynthArgs['n_files']}.cpp".encode()
+
+
+def test_lines_at(pdb):
+    rvas = [rva for rva, _, _, _, _ in procedures(pdb)]
+    assert pdb.lines_at(rvas) == [pdb.line_at(rva) for rva in rvas]
+
+
+def test_line_before_first_entry_of_range():
+    # The second range starts at 100 but its first line entry is at 120.
+    module_lines = ModuleLines(
+        array("I", [0, 100]),
+        array("I", [50, 200]),
+        array("I", [0, 2, 3]),
+        array("I", [0, 10, 120]),
+        array("I", [1, 2, 3]),
+        array("I", [0, 0, 0]),
+    )
+    assert module_lines.find(40) == 1
+    assert module_lines.find(60) == -1
+    assert module_lines.find(105) == -1
+    assert module_lines.find(130) == 2
+
+
+def test_find_type(pdb):
+    tpi = pdb.tpi_stream
+    begin = tpi.header.TypeIndexBegin
+    definitions = {}
+    for type_index in range(begin, begin + tpi.type_count):
+        leaf = tpi.get_type(type_index)
+        if isinstance(leaf, TagLeaf) and not leaf.is_forward_ref:
+            definitions.setdefault(leaf.name, type_index)
+    assert definitions
+    for name, type_index in definitions.items():
+        assert pdb.find_type(name) == type_index
+        assert pdb.find_type(name.decode()) == type_index
+    assert pdb.find_type("NotAType") is None
+
+
+def test_find_symbol(pdb):
+    for _, _, name, _, _ in procedures(pdb)[::7]:
+        symbol = pdb.find_symbol(name)
+        assert symbol is not None
+        assert symbol.RecordData.name == name
+    assert pdb.find_symbol("?missing@@YAXXZ") is None
+
+
+def test_iter_symbols_matches_modules(pdb):
+    modules = pdb.modules
+    expected = {}
+    for module in modules:
+        for kind, count in module.kind_histogram().items():
+            expected[kind] = expected.get(kind, 0) + count
+    assert pdb.symbol_kind_histogram() == expected
+    records = [(symbol.RecordKind, symbol.Record) for _, symbol in pdb.iter_symbols()]
+    assert records == [(symbol.RecordKind, symbol.Record) for module in modules for symbol in module.symbols]
+    assert all(module_index == 2 for module_index, _ in pdb.iter_symbols(modules=[2]))
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_workers_match_serial(pdb_path, lazy):
+    serial = pdblib.parse(pdb_path, lazy=lazy)
+    stats = pdblib.ParseStats()
+    parallel = pdblib.parse(pdb_path, lazy=lazy, workers=2, stats=stats)
+    assert len(parallel.modules) == len(serial.modules)
+    # The module streams were indexed in worker processes.
+    assert ("index_modules", None) in stats.phases
+    for parallel_module, serial_module in zip(parallel.modules, serial.modules):
+        assert list(parallel_module.symbols.offsets) == list(serial_module.symbols.offsets)
+        assert list(parallel_module.symbols.kinds) == list(serial_module.symbols.kinds)
+        assert list(parallel_module.symbols.lengths) == list(serial_module.symbols.lengths)
+    assert procedures(parallel) == procedures(serial)
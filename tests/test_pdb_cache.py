@@ -0,0 +1,102 @@
+import os
+import shutil
+import sys
+import threading
+
+import pdblib
+
+
+def test_get(pdb_path):
+    cache = pdblib.PDBCache()
+    pdb = cache.get(pdb_path)
+    assert cache.get(pdb_path) is pdb
+    assert pdb_path in cache
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+    assert cache.size > 0
+
+
+def test_estimate_size(pdb_path):
+    eager = pdblib.parse(pdb_path)
+    assert pdblib.estimate_size(eager) >= eager.msf.size
+
+    # A mapped file is only charged for the streams that are referenced.
+    lazy = pdblib.parse(pdb_path, lazy=True)
+    size = pdblib.estimate_size(lazy)
+    assert size < lazy.msf.size
+    lazy.modules
+    module_size = sum(
+        lazy.msf.stream_sizes[module.ModuleSymStream]
+        for module in lazy.dbi_steam.modules
+        if module.ModuleSymStream != 0xFFFF
+    )
+    assert pdblib.estimate_size(lazy) >= size + module_size
+
+
+def test_evict(pdb_path, tmp_path):
+    copy = str(tmp_path / "copy.pdb")
+    shutil.copyfile(pdb_path, copy)
+    cache = pdblib.PDBCache(max_size=1)
+    cache.get(pdb_path)
+    cache.get(copy)
+    # The most recently loaded PDB is kept even though it is larger than max_size.
+    assert cache.paths() == [os.path.normcase(os.path.abspath(copy))]
+    assert cache.stats.evictions == 1
+
+
+def test_add_paths(pdb_path, tmp_path):
+    not_a_pdb = tmp_path / "not_a.pdb"
+    not_a_pdb.write_bytes(b"not a pdb")
+    cache = pdblib.PDBCache()
+    cache.add_paths([pdb_path, not_a_pdb, tmp_path / "missing.pdb"])
+    info = pdblib.probe(pdb_path)
+    assert cache.get_by_id(info.guid, info.age) is cache.get(pdb_path)
+
+
+def test_probe_many(pdb_path, tmp_path):
+    results = pdblib.probe_many([pdb_path, tmp_path / "missing.pdb"])
+    assert isinstance(results[0], pdblib.ProbeResult)
+    assert results[0].module_count == len(pdblib.parse(pdb_path).dbi_steam.modules)
+    assert isinstance(results[1], OSError)
+
+
+def concurrent_first_access(pdb_path: str, rvas, thread_count: int):
+    """Start threads together that each get the PDB from a new cache and look up a share of the addresses."""
+    cache = pdblib.PDBCache()
+    barrier = threading.Barrier(thread_count)
+    errors = []
+    results = []
+
+    def lookup(index: int):
+        try:
+            barrier.wait()
+            pdb = cache.get(pdb_path)
+            expected = list(rvas[index::thread_count])
+            found = [pdb.symbol_at(rva).rva for rva in expected]
+            pdb.lines_at(expected)
+            pdb.find_type("Class3")
+            results.append(found == expected)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup, args=(index,)) for index in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == [True] * thread_count
+    assert cache.stats.misses == 1
+
+
+def test_concurrent_first_access(pdb_path):
+    # Every thread gets the same lazily loaded PDB and races to parse its streams and build its indexes.
+    rvas = pdblib.parse(pdb_path).address_index.starts
+    switch_interval = sys.getswitchinterval()
+    # Switch threads often so that they interleave inside the lazy parsing.
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(20):
+            concurrent_first_access(pdb_path, rvas, 8)
+    finally:
+        sys.setswitchinterval(switch_interval)
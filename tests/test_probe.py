@@ -0,0 +1,34 @@
+import pytest
+
+import pdblib
+from benchmarks.synth import generate
+
+from .conftest import SynthArgs
+
+
+def test_probe(pdb_path):
+    result = pdblib.probe(pdb_path)
+    pdb = pdblib.parse(pdb_path)
+    assert result.guid == pdb.info_stream.guid
+    assert result.age == pdb.info_stream.age
+    assert result.timestamp == pdb.info_stream.timestamp
+    assert result.machine == pdb.dbi_steam.header.Machine == 0x8664
+    assert result.module_count == len(pdb.dbi_steam.modules) == SynthArgs["n_modules"]
+
+
+@pytest.mark.parametrize("n_modules", [1, 40])
+def test_probe_module_count(tmp_path, n_modules):
+    # Enough modules that the module info substream spans several blocks.
+    path = tmp_path / "modules.pdb"
+    path.write_bytes(generate(n_modules=n_modules, n_symbols=2, block_size=512, shuffle=True))
+    assert pdblib.probe(path).module_count == n_modules
+
+
+def test_probe_invalid(tmp_path):
+    path = tmp_path / "not_a.pdb"
+    path.write_bytes(b"not a pdb" * 10)
+    with pytest.raises(ValueError):
+        pdblib.probe(path)
+    results = pdblib.probe_many([path, tmp_path / "missing.pdb"])
+    assert isinstance(results[0], ValueError)
+    assert isinstance(results[1], OSError)
@@ -0,0 +1,36 @@
+import struct
+
+from benchmarks.synth import symbol_record
+
+from pdblib._stream.module import SymbolTable, Constant, UnknownRecord, decode_record, iter_records, kind_histogram
+
+S_CONSTANT = 0x1107
+S_UDT = 0x1108
+LF_REAL32 = 0x8005
+LF_ULONG = 0x8004
+
+
+def test_constant():
+    record = symbol_record(S_CONSTANT, struct.pack("<IHI", 0x74, LF_ULONG, 0x12345678) + b"value\0")
+    constant = decode_record(S_CONSTANT, record, 4, len(record))
+    assert isinstance(constant, Constant)
+    assert constant.value == 0x12345678
+    assert constant.name == b"value"
+
+
+def test_unsupported_numeric_leaf():
+    # A valid record whose value uses a numeric leaf that is not decoded must not stop the table from being read.
+    unsupported = symbol_record(S_CONSTANT, struct.pack("<IHf", 0x40, LF_REAL32, 1.5) + b"real\0")
+    udt = symbol_record(S_UDT, struct.pack("<I", 0x1000) + b"Class\0")
+    table = SymbolTable.from_bytes(unsupported + udt)
+    assert list(table.kinds) == [S_CONSTANT, S_UDT]
+    assert isinstance(table[0].RecordData, UnknownRecord)
+    assert isinstance(table.record_data(0), UnknownRecord)
+    assert table[1].RecordData.name == b"Class"
+    assert [symbol.RecordKind for symbol in iter_records(unsupported + udt)] == [S_CONSTANT, S_UDT]
+    assert kind_histogram(unsupported + udt) == {S_CONSTANT: 1, S_UDT: 1}
+
+
+def test_truncated_record():
+    record = symbol_record(S_UDT, struct.pack("<I", 0x1000) + b"Class\0")
+    assert isinstance(decode_record(S_UDT, record[4:6]), UnknownRecord)
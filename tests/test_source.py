@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pdblib
+from pdblib._source import coalesce_blocks
+
+
+class Recorder:
+    """A read_range function over bytes that records each call."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, offset: int, size: int) -> bytes:
+        self.calls.append((offset, size))
+        return self.data[offset:offset + size]
+
+
+def test_coalesce_blocks():
+    assert coalesce_blocks([5, 1, 2, 3, 7, 2, 8]) == [(1, 3), (5, 1), (7, 2)]
+    assert coalesce_blocks([]) == []
+
+
+def test_block_source_coalesces_and_caches():
+    data = bytes(range(256)) * 4
+    reader = Recorder(data)
+    source = pdblib.BlockSource(reader, cache_size=1024)
+    source.block_size = 16
+    assert source.read_blocks([3, 4, 5, 9], 60) == data[48:96] + data[144:156]
+    assert reader.calls == [(48, 48), (144, 16)]
+    assert source.misses == 4
+
+    # Cached blocks are not read again and the missing blocks are fetched in one call.
+    assert source.read_blocks([4, 5, 6], 48) == data[64:112]
+    assert reader.calls[2:] == [(96, 16)]
+    assert source.hits == 2
+
+
+def test_block_source_evicts_least_recently_used():
+    data = bytes(range(256))
+    reader = Recorder(data)
+    source = pdblib.BlockSource(reader, cache_size=32)
+    source.block_size = 16
+    source.read_blocks([0], 16)
+    source.read_blocks([1], 16)
+    source.read_blocks([0], 16)
+    source.read_blocks([2], 16)
+    # Block 1 was the least recently used so it was evicted.
+    assert source._cached_size == 32
+    assert list(source._blocks) == [0, 2]
+    reader.calls.clear()
+    assert source.read_blocks([1], 16) == data[16:32]
+    assert reader.calls == [(16, 16)]
+
+
+def test_block_source_threads():
+    data = bytes(range(256)) * 64
+    source = pdblib.BlockSource(Recorder(data), cache_size=256)
+    source.block_size = 16
+    reads = [list(range(start, start + 8)) for start in range(0, 1000, 5) if start + 8 <= len(data) // 16]
+
+    def read(blocks):
+        return source.read_blocks(blocks, len(blocks) * 16) == data[blocks[0] * 16:(blocks[-1] + 1) * 16]
+
+    with ThreadPoolExecutor(8) as executor:
+        assert all(executor.map(read, reads * 4))
+    assert source._cached_size <= source.cache_size
+    assert source._cached_size == sum(map(len, source._blocks.values()))
+
+
+def test_from_source(pdb_path):
+    reference = pdblib.parse(pdb_path)
+    with pdblib.FileRangeReader(pdb_path) as reader:
+        source = pdblib.BlockSource(reader, cache_size=1 << 16)
+        pdb = pdblib.PDB7.from_source(source)
+        assert pdb.info_stream.guid == reference.info_stream.guid
+        assert [len(module.symbols) for module in pdb.modules] == [len(module.symbols) for module in reference.modules]
+        assert list(pdb.SymRecordStream.offsets) == list(reference.SymRecordStream.offsets)
+        assert source._cached_size <= source.cache_size
+        # Streams spanning several blocks are read in fewer calls than blocks.
+        assert source.requests < source.misses
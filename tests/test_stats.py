@@ -0,0 +1,66 @@
+import pdblib
+from pdblib.__main__ import main
+from pdblib._stats import NullTimer
+
+
+def test_parse_stats(pdb_path):
+    measurements = []
+    stats = pdblib.ParseStats(measurements.append)
+    pdb = pdblib.parse(pdb_path, stats=stats)
+    phases = [stats.phase for stats in stats.totals()]
+    assert phases[:2] == ["read_file", "directory"]
+    assert "modules" in phases
+    assert "symbols" in phases
+    assert len(measurements) == sum(phase.calls for phase in stats.phases.values())
+
+    read_file = stats.phases[("read_file", None)]
+    assert read_file.size == pdb.msf.size
+    modules = sum(phase.records for (name, _), phase in stats.phases.items() if name == "modules")
+    assert modules == sum(len(module.symbols) for module in pdb.modules)
+    symbols = stats.phases[("symbols", pdb.dbi_steam.header.SymRecordStream)]
+    assert symbols.records == len(pdb.SymRecordStream)
+
+    report = stats.report()
+    assert report.splitlines()[0].split() == ["phase", "stream", "calls", "seconds", "bytes", "MB/s", "records"]
+    assert report.splitlines()[-1].startswith("total")
+    assert len(stats.report(per_stream=True).splitlines()) == len(stats.phases) + 2
+
+
+def test_parse_stats_lazy(pdb_path):
+    stats = pdblib.ParseStats()
+    pdb = pdblib.parse(pdb_path, lazy=True, stats=stats)
+    assert ("symbols", pdb.dbi_steam.header.SymRecordStream) not in stats.phases
+    # Streams parsed on first access are recorded too.
+    pdb.SymRecordStream
+    assert ("symbols", pdb.dbi_steam.header.SymRecordStream) in stats.phases
+
+
+def test_parse_stats_add():
+    stats = pdblib.ParseStats()
+    stats.add("phase", 1, 1.0, 10, 2)
+    stats.add("phase", 1, 2.0, 20, 3)
+    stats.add("phase", 2, 1.0, 5, 1)
+    assert stats.phases[("phase", 1)] == pdblib.PhaseStats("phase", 1, 3.0, 30, 5, 2)
+    assert stats.totals() == [pdblib.PhaseStats("phase", None, 4.0, 35, 6, 3)]
+
+
+def test_null_timer():
+    with NullTimer as timer:
+        timer.size = 10
+        timer.records = 2
+    assert NullTimer.size == 0
+    assert NullTimer.records == 0
+    assert pdblib.PDB7()._time("phase") is NullTimer
+
+
+def test_profile(pdb_path, tmp_path, capsys):
+    addresses = tmp_path / "addresses.txt"
+    addresses.write_text("1000\n")
+    main(["--profile", "symbolize", pdb_path, str(addresses)])
+    err = capsys.readouterr().err
+    assert "read_file" in err
+    assert "directory" in err
+    assert err.splitlines()[-1].startswith("total")
+
+    main(["symbolize", pdb_path, str(addresses)])
+    assert "read_file" not in capsys.readouterr().err
@@ -0,0 +1,30 @@
+import struct
+
+import pytest
+
+from benchmarks.synth import build_types, type_stream
+
+from pdblib import TPIIPIStream
+
+# The offset of NumHashBuckets in the TPI stream header.
+NumHashBucketsOffset = 28
+
+
+@pytest.mark.parametrize("with_hash_stream", [True, False], ids=["hash_stream", "no_hash_stream"])
+@pytest.mark.parametrize("bucket_count", [None, 0], ids=["buckets", "no_buckets"])
+def test_find_type_without_hash(with_hash_stream, bucket_count):
+    records, hashes, _, _, _ = build_types(8)
+    stream, hash_stream = type_stream(records, hashes, 5 if with_hash_stream else 0xFFFF)
+    if bucket_count is not None:
+        stream = bytearray(stream)
+        struct.pack_into("<I", stream, NumHashBucketsOffset, bucket_count)
+    tpi = TPIIPIStream.from_bytes(bytes(stream), hash_stream if with_hash_stream else None)
+
+    for class_index in range(8):
+        name = f"Class{class_index}".encode()
+        type_index = tpi.find_type(name)
+        assert type_index is not None
+        leaf = tpi.get_type(type_index)
+        assert leaf.name == name
+        assert not leaf.is_forward_ref
+    assert tpi.find_type("Missing") is None